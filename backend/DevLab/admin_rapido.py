@@ -0,0 +1,45 @@
+"""
+Ajustes de desempenho para as listagens do admin.
+
+Em tabelas grandes o changelist padrão faz dois COUNT(*) completos por página
+(um do filtro e outro do total) e o paginador precisa do total exato. Aqui:
+
+- PaginadorEstimado: sem filtro no PostgreSQL usa a estimativa do planner
+  (pg_class.reltuples), que não lê a tabela; nos outros casos conta no máximo
+  ADMIN_LIMITE_CONTAGEM linhas (COUNT sobre um SELECT com LIMIT). Acima do
+  limite o admin mostra só as primeiras páginas, o que basta para navegar; para
+  achar algo específico a busca é o caminho.
+- AdminRapidoMixin: liga o paginador e desliga o segundo COUNT do total.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class PaginadorEstimado(Paginator):
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limite = settings.ADMIN_LIMITE_CONTAGEM
+        conexao = connections[queryset.db]
+
+        if conexao.vendor == 'postgresql' and not queryset.query.where:
+            with conexao.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table],
+                )
+                linha = cursor.fetchone()
+            # reltuples é -1 numa tabela nunca analisada; tabelas pequenas contam normalmente
+            if linha and linha[0] > limite:
+                return linha[0]
+
+        return queryset.order_by()[:limite].count()
+
+
+class AdminRapidoMixin:
+    paginator = PaginadorEstimado
+    # O total sem filtros ("x de y") seria um COUNT(*) completo a cada página
+    show_full_result_count = False
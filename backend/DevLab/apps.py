@@ -0,0 +1,23 @@
+from django.apps import AppConfig
+
+
+class DevLabConfig(AppConfig):
+    """App do pacote de configuração: liga os ajustes de infraestrutura (banco, comandos)"""
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'DevLab'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from DevLab.sqlite import configurar_conexao
+        from DevLab.instrumentacao import registrar_coletor, estatisticas_pool
+
+        connection_created.connect(configurar_conexao, dispatch_uid='devlab_sqlite_pragmas')
+        from usuarios.throttles import estatisticas_throttle
+        from DevLab.coalescencia import estatisticas_coalescencia
+        from DevLab.db_router import verificar_cache_replica
+
+        verificar_cache_replica()
+
+        registrar_coletor('pool_conexoes', estatisticas_pool)
+        registrar_coletor('throttle', estatisticas_throttle)
+        registrar_coletor('coalescencia', estatisticas_coalescencia)
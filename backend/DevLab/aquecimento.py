@@ -0,0 +1,97 @@
+"""
+Aquecimento do processo antes de atender requisições.
+
+A primeira requisição de cada worker do gunicorn pagava custos que só
+acontecem uma vez por processo: montar o resolver de URLs (e compilar as
+regex), importar o simplejwt e montar os campos de cada serializer (o
+ModelSerializer lê o _meta dos modelos e importa os validators na primeira
+vez). Com preload_app o gunicorn carrega o app no processo mestre e o
+aquecer() roda ali, antes do fork: os workers já nascem com tudo isso pronto
+e compartilham essa memória (copy-on-write).
+
+Nada aqui toca no banco. Uma conexão aberta no mestre seria herdada por todos
+os workers depois do fork.
+"""
+import importlib
+import logging
+import time
+
+from django.apps import apps
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _percorrer(padroes):
+    """Compila a regex de todas as rotas e devolve as views encontradas"""
+    views = []
+    for padrao in padroes:
+        padrao.pattern.regex
+        if isinstance(padrao, URLResolver):
+            views.extend(_percorrer(padrao.url_patterns))
+        elif isinstance(padrao, URLPattern):
+            views.append(padrao.callback)
+    return views
+
+
+def aquecer_rotas():
+    resolver = get_resolver()
+    # Preenche os dicionários do reverse() (também usados pelo resolve())
+    resolver.reverse_dict
+    return _percorrer(resolver.url_patterns)
+
+
+def _subclasses(classe):
+    for subclasse in classe.__subclasses__():
+        yield subclasse
+        yield from _subclasses(subclasse)
+
+
+def aquecer_serializers():
+    from rest_framework import serializers
+
+    # Garante que os serializers de todos os apps foram importados
+    for app in apps.get_app_configs():
+        try:
+            importlib.import_module(f'{app.name}.serializers')
+        except ModuleNotFoundError as erro:
+            if erro.name != f'{app.name}.serializers':
+                raise
+
+    total = 0
+    for classe in set(_subclasses(serializers.Serializer)):
+        if classe.__module__.startswith('rest_framework'):
+            continue
+        try:
+            # .fields monta (e cacheia no módulo do DRF) o mapeamento dos campos do modelo
+            classe().fields
+        except Exception:
+            # Serializer que exige argumentos no __init__: fica para a primeira requisição
+            logger.debug('Serializer %s não foi aquecido', classe, exc_info=True)
+            continue
+        total += 1
+    return total
+
+
+def aquecer_autenticacao():
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    JWTAuthentication()
+    api_settings.USER_ID_CLAIM
+    AccessToken.lifetime
+
+
+def aquecer():
+    """Roda todos os aquecimentos e devolve quanto tempo levou (em segundos)"""
+    inicio = time.perf_counter()
+    views = aquecer_rotas()
+    aquecer_autenticacao()
+    serializers = aquecer_serializers()
+    # Por garantia: nenhuma conexão do mestre pode ir para os workers
+    connections.close_all()
+    duracao = time.perf_counter() - inicio
+    logger.info('Aquecimento: %s rotas, %s serializers em %.0f ms', len(views), serializers, duracao * 1000)
+    return duracao
@@ -0,0 +1,21 @@
+"""
+Cache compartilhado entre os workers.
+
+Sem CACHES configurado o Django usa o LocMemCache, que é de cada processo:
+com vários workers do gunicorn (gunicorn.conf.py) cada um enxerga só o que ele
+mesmo gravou. Para o que precisa valer entre workers (fixação no primário da
+réplica, buckets dos throttles) ligue CACHE_BANCO=True (tabela no próprio
+banco, criada com python manage.py createcachetable).
+"""
+from django.conf import settings
+
+# Backends que guardam os dados no próprio processo (ou não guardam nada)
+BACKENDS_LOCAIS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_compartilhado(alias='default'):
+    """Se o cache `alias` é visto por todos os workers"""
+    return settings.CACHES[alias]['BACKEND'] not in BACKENDS_LOCAIS
@@ -0,0 +1,135 @@
+"""
+Coalescência (single-flight) das leituras caras: relatórios e dashboard.
+
+Quando vários coordenadores abrem a página de relatórios ao mesmo tempo, cada
+requisição calculava o relatório inteiro. Com coalescer(chave, funcao):
+
+- no worker, a primeira requisição de uma chave calcula; as que chegam com a
+  mesma chave enquanto ela roda esperam (até COALESCENCIA_ESPERA segundos) e
+  recebem o mesmo resultado;
+- com COALESCENCIA_COMPARTILHADA=True a mesma ideia vale entre workers, usando
+  o cache do Django: quem consegue a trava (cache.add) calcula e publica o
+  resultado por alguns segundos; os outros workers esperam por ele. Só faz
+  sentido com um cache compartilhado (Redis, banco); com o LocMemCache cada
+  worker tem o seu.
+
+Só o cálculo é compartilhado: a autenticação e a permissão continuam sendo
+checadas em cada requisição, antes do coalescer. A chave (chave_requisicao)
+junta a rota, os parâmetros e o escopo de permissão, então só requisições
+que veriam a mesma resposta se juntam. Se o cálculo falhar, quem esperava
+calcula por conta própria.
+
+Os contadores aparecem em /api/instrumentacao/ (coletor "coalescencia").
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Intervalo entre as checagens de quem espera outro worker (segundos)
+INTERVALO_CONSULTA = 0.05
+
+_em_andamento = {}
+_lock = threading.Lock()
+_contadores = defaultdict(int)
+
+
+def _contar(nome):
+    with _lock:
+        _contadores[nome] += 1
+
+
+def estatisticas_coalescencia():
+    with _lock:
+        contadores = dict(_contadores)
+        em_andamento = len(_em_andamento)
+    # Cada requisição que reaproveitou um cálculo é um cálculo economizado
+    contadores['economizados'] = contadores.get('coalescidas', 0) + contadores.get('coalescidas_compartilhadas', 0)
+    contadores['em_andamento'] = em_andamento
+    return contadores
+
+
+def chave_requisicao(request, escopo):
+    """Rota + parâmetros (em ordem) + escopo de permissão de quem pede"""
+    parametros = sorted((nome, sorted(valores)) for nome, valores in request.query_params.lists())
+    return hashlib.sha256(repr((request.path, parametros, escopo)).encode()).hexdigest()
+
+
+class _Calculo:
+    def __init__(self):
+        self.pronto = threading.Event()
+        self.ok = False
+        self.resultado = None
+
+
+def coalescer(chave, funcao):
+    """Devolve funcao(), dividindo o cálculo com as chamadas simultâneas de mesma chave"""
+    if not settings.COALESCENCIA:
+        return funcao()
+
+    with _lock:
+        calculo = _em_andamento.get(chave)
+        lider = calculo is None
+        if lider:
+            calculo = _em_andamento[chave] = _Calculo()
+
+    if not lider:
+        if calculo.pronto.wait(settings.COALESCENCIA_ESPERA) and calculo.ok:
+            _contar('coalescidas')
+            return calculo.resultado
+        # Demorou demais ou falhou: calcula por conta própria
+        _contar('esperas_sem_resultado')
+        return funcao()
+
+    try:
+        calculo.resultado = _calcular_compartilhado(chave, funcao)
+        calculo.ok = True
+        return calculo.resultado
+    finally:
+        with _lock:
+            _em_andamento.pop(chave, None)
+        calculo.pronto.set()
+
+
+def _calcular_compartilhado(chave, funcao):
+    if not settings.COALESCENCIA_COMPARTILHADA:
+        _contar('calculos')
+        return funcao()
+
+    trava = f'coalescencia:trava:{chave}'
+    espera = settings.COALESCENCIA_ESPERA
+    geracao = uuid.uuid4().hex
+    # A trava expira sozinha se o worker morrer no meio do cálculo
+    if cache.add(trava, geracao, timeout=espera):
+        try:
+            _contar('calculos')
+            resultado = funcao()
+            # Publicado com a geração da trava: quem espera não pega o resultado de um cálculo anterior
+            cache.set(f'coalescencia:resultado:{geracao}', resultado, timeout=espera)
+            return resultado
+        finally:
+            cache.delete(trava)
+
+    # Outro worker está calculando: espera o resultado da geração dele
+    geracao_outro = cache.get(trava)
+    limite = time.monotonic() + espera
+    while geracao_outro is not None and time.monotonic() < limite:
+        resultado = cache.get(f'coalescencia:resultado:{geracao_outro}')
+        if resultado is not None:
+            _contar('coalescidas_compartilhadas')
+            return resultado
+        if cache.get(trava) != geracao_outro:
+            # Terminou (ou expirou) sem publicar: uma última olhada e desiste
+            resultado = cache.get(f'coalescencia:resultado:{geracao_outro}')
+            if resultado is not None:
+                _contar('coalescidas_compartilhadas')
+                return resultado
+            break
+        time.sleep(INTERVALO_CONSULTA)
+
+    _contar('calculos')
+    return funcao()
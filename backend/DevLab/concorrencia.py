@@ -0,0 +1,121 @@
+"""
+Controle de concorrência otimista.
+
+Os modelos editáveis pela API (Projeto, Tarefas, Equipe) herdam de
+ModeloVersionado e ganham a coluna `versao`, que sobe a cada save.
+
+Quando o cliente manda `If-Match: "<versao>"`, o save vira um único
+UPDATE ... WHERE id = ? AND versao = ?. Se outra escrita passou na frente,
+nenhuma linha casa e a view responde 412 com a versão atual, sem sobrescrever
+nada. A versão vai no JSON de listagem/detalhe e no header ETag, então o
+cliente não precisa fazer um GET antes de escrever.
+Sem If-Match o comportamento continua o de antes (a última escrita vence).
+"""
+from django.db import models
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+
+
+class ConflitoDeVersao(Exception):
+    def __init__(self, modelo, pk, versao_esperada):
+        self.versao_atual = modelo._default_manager.filter(pk=pk).values_list('versao', flat=True).first()
+        self.versao_esperada = versao_esperada
+        super().__init__(f'{modelo.__name__} #{pk}: esperada versão {versao_esperada}, atual {self.versao_atual}')
+
+
+class ModeloVersionado(models.Model):
+    versao = models.PositiveIntegerField(default=1, editable=False, help_text="Versão para controle de concorrência")
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # A versão esperada vale para um único save (é definida pela view a partir do If-Match)
+        versao_esperada = self.__dict__.pop('_versao_esperada', None)
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'versao'}
+
+        if versao_esperada is None:
+            self.versao += 1
+            return super().save(*args, **kwargs)
+
+        self._versao_condicional = versao_esperada
+        self.versao = versao_esperada + 1
+        kwargs['force_update'] = True
+        try:
+            return super().save(*args, **kwargs)
+        except ConflitoDeVersao:
+            self.versao = versao_esperada
+            raise
+        finally:
+            self._versao_condicional = None
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        versao = getattr(self, '_versao_condicional', None)
+        if versao is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        # Mesmo UPDATE do Django, só com o "AND versao = ?" a mais
+        atualizou = super()._do_update(
+            base_qs.filter(versao=versao), using, pk_val, values, update_fields, forced_update
+        )
+        if not atualizou:
+            raise ConflitoDeVersao(type(self), pk_val, versao)
+        return atualizou
+
+
+def ler_if_match(request):
+    """Versão pedida no If-Match ("3", W/"3" ou 3). None sem header ou com "*" """
+    valor = request.headers.get('If-Match', '').strip()
+    if not valor or valor == '*':
+        return None
+    valor = valor.removeprefix('W/').strip('"')
+    try:
+        return int(valor)
+    except ValueError:
+        raise ParseError('If-Match inválido: use a versão do objeto, ex.: If-Match: "3".')
+
+
+class ConcorrenciaOtimistaMixin:
+    """
+    Mixin para ViewSets de modelos versionados: passa o If-Match para o objeto
+    do get_object(), converte o conflito em 412 e devolve o ETag nas actions
+    de `acoes_com_etag`.
+    """
+    acoes_com_etag = ('retrieve', 'update', 'partial_update')
+
+    def get_object(self):
+        objeto = super().get_object()
+        if self.request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            versao = ler_if_match(self.request)
+            if versao is not None:
+                objeto._versao_esperada = versao
+        self._objeto_versionado = objeto
+        return objeto
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConflitoDeVersao):
+            response = Response(
+                {
+                    'detail': 'O objeto foi alterado por outra requisição. Recarregue e tente de novo.',
+                    'versao_atual': exc.versao_atual,
+                },
+                status=status.HTTP_412_PRECONDITION_FAILED
+            )
+            if exc.versao_atual is not None:
+                response['ETag'] = f'"{exc.versao_atual}"'
+            return response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        objeto = getattr(self, '_objeto_versionado', None)
+        if (
+            objeto is not None
+            and getattr(self, 'action', None) in self.acoes_com_etag
+            and 200 <= response.status_code < 300
+        ):
+            response['ETag'] = f'"{objeto.versao}"'
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,111 @@
+"""
+Roteamento de leituras para a réplica.
+
+O middleware marca cada requisição GET/HEAD como "pode ler da réplica" e o
+router manda as consultas para o alias configurado em DATABASE_REPLICA_ALIAS.
+Escritas sempre vão para o `default`. Depois que um cliente escreve, ele fica
+preso no primário por REPLICA_JANELA_PRIMARIO segundos, pra não ler da réplica
+um dado que ainda não chegou lá.
+
+Essa fixação fica no cache e a próxima requisição do cliente pode cair em
+outro worker, então com réplica o cache precisa ser compartilhado
+(CACHE_BANCO=True): verificar_cache_replica() impede a subida sem isso. As
+consultas do próprio cache no banco (DatabaseCache) vão sempre para o
+primário e não contam como escrita da requisição.
+"""
+import contextvars
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from DevLab.cache import cache_compartilhado
+
+_estado_requisicao = contextvars.ContextVar('devlab_estado_replica', default=None)
+
+METODOS_LEITURA = ('GET', 'HEAD')
+
+
+class _EstadoRequisicao:
+    def __init__(self, usar_replica):
+        self.usar_replica = usar_replica
+        self.escreveu = False
+
+
+def replica_configurada():
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+    return bool(alias) and alias in settings.DATABASES
+
+
+def verificar_cache_replica():
+    """Chamado no ready(): réplica com cache por processo quebra o read-your-writes"""
+    if replica_configurada() and not cache_compartilhado():
+        raise ImproperlyConfigured(
+            'A réplica de leitura precisa de um cache compartilhado entre os workers '
+            '(CACHE_BANCO=True e python manage.py createcachetable).'
+        )
+
+
+def _do_cache(model):
+    # Modelo interno do DatabaseCache
+    return model._meta.app_label == 'django_cache'
+
+
+def chave_cliente(request):
+    """
+    Identifica o cliente sem autenticar (a autenticação JWT só roda na view):
+    usa o header Authorization e, se não tiver, o IP.
+    """
+    credencial = request.META.get('HTTP_AUTHORIZATION') or request.META.get('REMOTE_ADDR', '')
+    return hashlib.sha256(credencial.encode()).hexdigest()[:32]
+
+
+class ReplicaRouter:
+    """Router que manda leituras de requisições seguras para a réplica"""
+
+    def db_for_read(self, model, **hints):
+        estado = _estado_requisicao.get()
+        if estado and estado.usar_replica and not estado.escreveu and not _do_cache(model):
+            return settings.DATABASE_REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        estado = _estado_requisicao.get()
+        if estado and not _do_cache(model):
+            # A partir daqui a requisição lê do primário (read-your-writes)
+            estado.escreveu = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e primário têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaMiddleware:
+    """Define, por requisição, se as leituras podem ir para a réplica"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_configurada():
+            return self.get_response(request)
+
+        chave = f'replica:primario:{chave_cliente(request)}'
+        fixado_no_primario = cache.get(chave) is not None
+        usar_replica = request.method in METODOS_LEITURA and not fixado_no_primario
+
+        estado = _EstadoRequisicao(usar_replica)
+        token = _estado_requisicao.set(estado)
+        try:
+            response = self.get_response(request)
+        finally:
+            _estado_requisicao.reset(token)
+
+        if estado.escreveu or request.method not in METODOS_LEITURA:
+            cache.set(chave, True, getattr(settings, 'REPLICA_JANELA_PRIMARIO', 5))
+        return response
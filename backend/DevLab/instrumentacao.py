@@ -0,0 +1,63 @@
+"""
+Instrumentação da aplicação.
+
+Cada subsistema registra um coletor (função sem argumentos que devolve um dict)
+e o endpoint /api/instrumentacao/ junta tudo. Os números são do processo
+(worker) que atendeu a requisição.
+"""
+import os
+
+from django.db import connections
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+_coletores = {}
+
+
+def registrar_coletor(nome, funcao):
+    _coletores[nome] = funcao
+
+
+def coletar():
+    return {nome: funcao() for nome, funcao in _coletores.items()}
+
+
+def estatisticas_pool():
+    """Estatísticas do pool de conexões (psycopg_pool) de cada banco que usa pool"""
+    resultado = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        filas = stats.get('requests_queued', 0)
+        espera_ms = stats.get('requests_wait_ms', 0)
+        resultado[alias] = {
+            'tamanho': stats.get('pool_size', 0),
+            'minimo': stats.get('pool_min'),
+            'maximo': stats.get('pool_max'),
+            'em_uso': stats.get('pool_size', 0) - stats.get('pool_available', 0),
+            'disponiveis': stats.get('pool_available', 0),
+            'aguardando': stats.get('requests_waiting', 0),
+            'requisicoes': stats.get('requests_num', 0),
+            'requisicoes_enfileiradas': filas,
+            'tempo_espera_total_ms': espera_ms,
+            'tempo_espera_medio_ms': round(espera_ms / filas, 2) if filas else 0,
+            'timeouts': stats.get('requests_errors', 0),
+        }
+    return resultado
+
+
+class PodeVerInstrumentacao(permissions.BasePermission):
+    """Apenas staff e coordenadores"""
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_staff or user.tipo_usuario == 'coordenador'))
+
+
+class InstrumentacaoView(APIView):
+    permission_classes = [PodeVerInstrumentacao]
+
+    def get(self, request):
+        return Response({'pid': os.getpid(), **coletar()})
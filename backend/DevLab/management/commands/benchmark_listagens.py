@@ -0,0 +1,112 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from equipe.models import Equipe
+from projetos.models import ParticipacaoProjeto, Projeto
+from projetos.projecoes import ProjecaoProjeto
+from projetos.serializers import ProjetoSerializer
+from projetos.views import com_relacionados
+from tarefas.models import Tarefas
+from tarefas.projecoes import ProjecaoTarefa
+from tarefas.serializers import TarefaSerializer
+from tarefas.views import TarefaViewSet
+from usuarios.models import Usuario
+from usuarios.projecoes import ProjecaoUsuario
+from usuarios.serializers import UsuarioSerializer
+
+
+class Desfazer(Exception):
+    pass
+
+
+def _criar_dados(linhas):
+    usuarios = Usuario.objects.bulk_create([
+        Usuario(username=f'bench{i}', email=f'bench{i}@bench.local', cpf=f'bench-{i}',
+                nome=f'Bench {i}', tipo_usuario='estudante')
+        for i in range(max(linhas, 20))
+    ])
+    projetos = []
+    for i in range(linhas):
+        projeto = Projeto(nome=f'Bench {i}', descricao='x' * 200, is_public=True, data_inicio=timezone.localdate())
+        projeto.save(validate=False)
+        projetos.append(projeto)
+    ParticipacaoProjeto.objects.bulk_create([
+        ParticipacaoProjeto(projeto=projeto, usuario=usuarios[(i + j) % len(usuarios)], is_leader=j == 0)
+        for i, projeto in enumerate(projetos) for j in range(5)
+    ])
+    equipes = [
+        Equipe.objects.create(nome=f'Bench {i}', projeto=projetos[i], lider=usuarios[i]) for i in range(10)
+    ]
+    for i, equipe in enumerate(equipes):
+        equipe.membros.add(*usuarios[i:i + 5])
+    Tarefas.objects.bulk_create([
+        Tarefas(titulo=f'Bench {i}', descricao='x' * 200, projeto=projetos[i % len(projetos)],
+                equipe=equipes[i % len(equipes)], responsavel=usuarios[i % len(usuarios)])
+        for i in range(linhas)
+    ])
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a CPU por linha das listagens de tarefas, projetos e usuários: "
+        "serializer do DRF x projeção com .values() (DevLab/projecao.py)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=100, help='Linhas por página medida (padrão: 100)')
+        parser.add_argument('--repeticoes', type=int, default=20, help='Vezes que cada página é serializada')
+        parser.add_argument('--usar-dados', action='store_true',
+                            help='Mede com os dados do banco em vez de criar dados temporários')
+
+    def _medir(self, funcao, repeticoes):
+        funcao()  # aquece (imports, cache de campos do DRF)
+        cpu = time.process_time()
+        for _ in range(repeticoes):
+            conteudo = funcao()
+        return time.process_time() - cpu, conteudo
+
+    def handle(self, *args, **options):
+        linhas = options['linhas']
+        repeticoes = options['repeticoes']
+        renderer = JSONRenderer()
+
+        casos = [
+            ('tarefas', TarefaViewSet.queryset.order_by('-prioridade', 'data_fim_prevista', 'id'),
+             TarefaSerializer, ProjecaoTarefa),
+            ('projetos/publicos', com_relacionados(Projeto.objects.filter(is_public=True).order_by('-data_inicio', 'id')),
+             ProjetoSerializer, ProjecaoProjeto),
+            ('usuarios', Usuario.objects.order_by('id'), UsuarioSerializer, ProjecaoUsuario),
+        ]
+
+        try:
+            with transaction.atomic():
+                if not options['usar_dados']:
+                    _criar_dados(linhas)
+
+                self.stdout.write(f'{linhas} linhas por página, {repeticoes} repetições (CPU do processo, com as consultas)')
+                for nome, queryset, serializer, projecao in casos:
+                    pagina = queryset[:linhas]
+                    total = len(pagina)
+                    if not total:
+                        self.stdout.write(f'{nome:>18}: sem dados')
+                        continue
+                    tempo_serializer, saida_serializer = self._medir(
+                        lambda: renderer.render(serializer(list(pagina.all()), many=True).data), repeticoes
+                    )
+                    tempo_projecao, saida_projecao = self._medir(
+                        lambda: renderer.render(projecao().serializar(pagina.all())), repeticoes
+                    )
+                    por_linha = 1e6 / (repeticoes * total)
+                    self.stdout.write(
+                        f'{nome:>18}: serializer {tempo_serializer * por_linha:7.1f} µs/linha | '
+                        f'projeção {tempo_projecao * por_linha:7.1f} µs/linha | '
+                        f'{tempo_serializer / tempo_projecao:4.1f}x | '
+                        f'saída idêntica: {"sim" if saida_serializer == saida_projecao else "NÃO"}'
+                    )
+                raise Desfazer
+        except Desfazer:
+            pass
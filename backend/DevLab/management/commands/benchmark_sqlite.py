@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from DevLab.sqlite import aplicar_pragmas, banco_ocupado
+
+PROPORCAO_ESCRITA = 0.2
+
+
+def _preparar_banco(caminho, otimizado):
+    conexao = sqlite3.connect(caminho)
+    if otimizado:
+        aplicar_pragmas(conexao.cursor(), settings.SQLITE_PRAGMAS)
+    conexao.execute(
+        'CREATE TABLE tarefa (id INTEGER PRIMARY KEY, titulo TEXT, status TEXT, prioridade INTEGER)'
+    )
+    conexao.executemany(
+        'INSERT INTO tarefa (titulo, status, prioridade) VALUES (?, ?, ?)',
+        [(f'Tarefa {i}', 'nao_iniciado', i % 3 + 1) for i in range(5000)]
+    )
+    conexao.commit()
+    conexao.close()
+
+
+def _worker(caminho, otimizado, segundos, pragmas, fila):
+    # Mesmo timeout padrão do Django para sqlite3 (5s)
+    conexao = sqlite3.connect(caminho, timeout=5, isolation_level=None)
+    if otimizado:
+        aplicar_pragmas(conexao.cursor(), pragmas)
+
+    leituras = escritas = erros = 0
+    fim = time.perf_counter() + segundos
+    while time.perf_counter() < fim:
+        try:
+            if random.random() < PROPORCAO_ESCRITA:
+                conexao.execute('BEGIN IMMEDIATE' if otimizado else 'BEGIN')
+                conexao.execute(
+                    'UPDATE tarefa SET status = ? WHERE id = ?',
+                    (random.choice(['em_andamento', 'concluida']), random.randint(1, 5000))
+                )
+                conexao.execute('COMMIT')
+                escritas += 1
+            else:
+                conexao.execute(
+                    'SELECT status, COUNT(*) FROM tarefa WHERE prioridade = ? GROUP BY status',
+                    (random.randint(1, 3),)
+                ).fetchall()
+                leituras += 1
+        except sqlite3.OperationalError as erro:
+            if conexao.in_transaction:
+                conexao.execute('ROLLBACK')
+            if not banco_ocupado(erro):
+                raise
+            erros += 1
+    conexao.close()
+    fila.put((leituras, escritas, erros))
+
+
+def _rodar(workers, otimizado, segundos):
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'benchmark.sqlite3')
+        _preparar_banco(caminho, otimizado)
+
+        fila = multiprocessing.Queue()
+        processos = [
+            multiprocessing.Process(
+                target=_worker, args=(caminho, otimizado, segundos, settings.SQLITE_PRAGMAS, fila)
+            )
+            for _ in range(workers)
+        ]
+        for processo in processos:
+            processo.start()
+        resultados = [fila.get() for _ in processos]
+        for processo in processos:
+            processo.join()
+
+    leituras = sum(r[0] for r in resultados)
+    escritas = sum(r[1] for r in resultados)
+    erros = sum(r[2] for r in resultados)
+    return leituras / segundos, escritas / segundos, erros
+
+
+class Command(BaseCommand):
+    help = "Compara a vazão de leitura/escrita do SQLite com PRAGMAs padrão e no modo otimizado"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, nargs='+', default=[4, 8],
+                            help='Quantidades de processos concorrentes (padrão: 4 8)')
+        parser.add_argument('--segundos', type=float, default=5.0,
+                            help='Duração de cada rodada')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'workers':>8} {'modo':>10} {'leituras/s':>12} {'escritas/s':>12} {'locked':>8}")
+        for workers in options['workers']:
+            for otimizado in (False, True):
+                leituras, escritas, erros = _rodar(workers, otimizado, options['segundos'])
+                modo = 'otimizado' if otimizado else 'padrao'
+                self.stdout.write(f'{workers:>8} {modo:>10} {leituras:>12.0f} {escritas:>12.0f} {erros:>8}')
@@ -0,0 +1,107 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+ROTAS_PADRAO = ['/api/projetos/', '/api/tarefas/', '/api/equipes/', '/api/usuarios/perfil/']
+
+# Roda num interpretador novo: mede o que um worker recém-criado pagaria
+SCRIPT_FILHO = r'''
+import json, sys, time
+inicio = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - inicio
+
+parametros = json.loads(sys.argv[1])
+aquecimento = 0.0
+if parametros['aquecer']:
+    from DevLab.aquecimento import aquecer
+    aquecimento = aquecer()
+
+from django.test import Client
+cliente = Client()
+headers = {'HTTP_HOST': parametros['host']}
+if parametros['usuario']:
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import AccessToken
+    usuario = get_user_model().objects.get(username=parametros['usuario'])
+    headers['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(usuario)}'
+
+def medir():
+    tempos = {}
+    for rota in parametros['rotas']:
+        antes = time.perf_counter()
+        resposta = cliente.get(rota, **headers)
+        tempos[rota] = [(time.perf_counter() - antes) * 1000, resposta.status_code]
+    return tempos
+
+primeira = medir()
+segunda = medir()
+print(json.dumps({'setup': setup * 1000, 'aquecimento': aquecimento * 1000, 'primeira': primeira, 'segunda': segunda}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a latência da primeira requisição de um processo novo, com e sem o "
+        "aquecimento do gunicorn (DevLab.aquecimento)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rotas', nargs='*', default=ROTAS_PADRAO, metavar='ROTA',
+                            help='Rotas GET medidas (padrão: listagens principais)')
+        parser.add_argument('--usuario', default=None,
+                            help='Username usado para autenticar (sem ele as rotas respondem 401)')
+        parser.add_argument('--rodadas', type=int, default=3,
+                            help='Processos medidos em cada modo (vale a mediana)')
+        parser.add_argument('--limite-ms', type=float, default=None,
+                            help='Falha se a primeira requisição aquecida passar disso')
+
+    def _rodar_filho(self, aquecer, opcoes):
+        parametros = json.dumps({
+            'aquecer': aquecer,
+            'rotas': opcoes['rotas'],
+            'usuario': opcoes['usuario'],
+            'host': settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost',
+        })
+        ambiente = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'DevLab.settings')}
+        resultado = subprocess.run(
+            [sys.executable, '-c', SCRIPT_FILHO, parametros],
+            cwd=settings.BASE_DIR, env=ambiente, capture_output=True, text=True,
+        )
+        if resultado.returncode != 0:
+            raise CommandError(f'O processo de medição falhou:\n{resultado.stderr[-2000:]}')
+        return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        medianas = {}
+        for aquecer, nome in ((False, 'frio'), (True, 'aquecido')):
+            rodadas = [self._rodar_filho(aquecer, options) for _ in range(options['rodadas'])]
+            primeira = statistics.median(sum(t for t, _ in r['primeira'].values()) for r in rodadas)
+            segunda = statistics.median(sum(t for t, _ in r['segunda'].values()) for r in rodadas)
+            aquecimento = statistics.median(r['aquecimento'] for r in rodadas)
+            medianas[nome] = primeira
+            status_http = sorted({s for r in rodadas for _, s in r['primeira'].values()})
+
+            self.stdout.write(
+                f'{nome:>9}: setup {statistics.median(r["setup"] for r in rodadas):6.0f} ms | '
+                f'aquecimento {aquecimento:5.0f} ms | 1ª rodada {primeira:6.1f} ms | '
+                f'2ª rodada {segunda:6.1f} ms | status {status_http}'
+            )
+
+        self.stdout.write(
+            f'Primeira requisição: {medianas["frio"]:.1f} ms sem aquecimento, '
+            f'{medianas["aquecido"]:.1f} ms com aquecimento '
+            f'({len(options["rotas"])} rotas, mediana de {options["rodadas"]} processos)'
+        )
+
+        limite = options['limite_ms']
+        if limite is not None and medianas['aquecido'] > limite:
+            raise CommandError(
+                f'Primeira requisição aquecida levou {medianas["aquecido"]:.1f} ms (limite: {limite:.0f} ms)'
+            )
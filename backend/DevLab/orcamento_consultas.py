@@ -0,0 +1,225 @@
+"""
+Orçamento de consultas por rota, para os testes (projetos/tests.py, equipe/tests.py, ...).
+
+Cada rota tem um máximo fixo de consultas SQL. O teste roda todas as rotas
+com o banco em duas escalas (ESCALAS: projetos com N participantes, uma equipe
+com N membros e N tarefas cada) e falha se:
+
+- a rota passar do máximo;
+- o número de consultas mudar entre as escalas (consulta por linha: N+1);
+- a mesma consulta (SQL e parâmetros idênticos) rodar duas vezes na mesma
+  requisição.
+
+As escritas rodam dentro de um savepoint desfeito no final, então a ordem das
+rotas não importa. Quem mexe numa view e muda o número de consultas de
+propósito atualiza o máximo da rota no tests.py do app.
+
+Todas as rotas da API têm orçamento, com duas exceções: o /admin/ (páginas do
+Django, fora da API do SPA) e as variantes com sufixo de formato
+(/api/tarefas.json), que caem na mesma view da rota sem sufixo.
+
+ListagemRapidaMixin compara, nas mesmas listagens, a saída da listagem rápida
+(DevLab/projecao.py) com a do serializer.
+"""
+import datetime
+from collections import Counter
+
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from equipe.models import Equipe
+from fila.models import Job
+from projetos.arquivamento import arquivar_projetos
+from projetos.models import ParticipacaoProjeto, Projeto, ProjetoArquivado
+from tarefas.calendario import gerar_token
+from tarefas.models import Tarefas
+from usuarios.models import Usuario
+
+ESCALAS = (2, 5)
+
+# Sem limite de taxa: o teste faz muitas requisições seguidas ao mesmo endpoint
+SEM_THROTTLE = {nome: '100000/min' for nome in ('login_ip', 'login_usuario', 'relatorios', 'importacao')}
+
+
+def rota(metodo, url, maximo, dados=None, usuario='coordenador', **configuracoes):
+    """
+    Rota com orçamento. url e dados aceitam {projeto}, {equipe}, {tarefa},
+    {estudante}, {outro_estudante}, {novo}, {coordenador}, {professor},
+    {arquivado} e {job} (ids), {calendario} (token do .ics do estudante),
+    {refresh} (refresh token do coordenador) e {desde} (cursor de
+    sincronização de uma hora atrás). usuario=None faz a requisição sem
+    login; configuracoes vai para o override_settings da requisição.
+    """
+    return {
+        'metodo': metodo, 'url': url, 'maximo': maximo, 'dados': dados or {},
+        'usuario': usuario, 'configuracoes': configuracoes,
+    }
+
+
+def semear(escala, coordenador, professor):
+    """
+    Cria `escala` projetos públicos, cada um com `escala` estudantes (o primeiro
+    é o líder), uma equipe com todos eles, uma tarefa para cada e mais um
+    participante sem equipe (para o formar-equipes). Cria também um projeto
+    arquivado do mesmo tamanho e um job do coordenador. Devolve os objetos
+    usados nas rotas (do primeiro projeto).
+    """
+    hoje = timezone.localdate()
+    base = Usuario.objects.count()
+    estudantes = [
+        Usuario.objects.create_user(
+            f'orc{base + i}', f'orc{base + i}@devlab.com', 'senha', nome=f'Estudante {base + i}',
+            cpf=f'orc-{base + i}', tipo_usuario='estudante'
+        )
+        for i in range(escala * escala + 1)
+    ]
+    novo = estudantes.pop()
+    projetos = []
+    for i in range(escala):
+        projeto = Projeto.objects.create(
+            nome=f'Projeto {base}-{i}', descricao='Descrição', created_by=coordenador, professor=professor,
+            is_public=True, data_inicio=hoje,
+        )
+        projetos.append(projeto)
+        do_projeto = estudantes[i * escala:(i + 1) * escala]
+        for j, estudante in enumerate(do_projeto):
+            ParticipacaoProjeto.objects.create(projeto=projeto, usuario=estudante, is_leader=j == 0)
+        sem_equipe = Usuario.objects.create_user(
+            f'orc{base}-{i}', f'orc{base}-{i}@devlab.com', 'senha', nome=f'Sem equipe {base}-{i}',
+            cpf=f'orc-{base}-{i}', tipo_usuario='estudante'
+        )
+        ParticipacaoProjeto.objects.create(projeto=projeto, usuario=sem_equipe)
+        equipe = Equipe.objects.create(nome=f'Equipe {i}', projeto=projeto, lider=do_projeto[0])
+        equipe.membros.add(*do_projeto)
+        for estudante in do_projeto:
+            Tarefas.objects.create(
+                titulo=f'Tarefa {estudante.id}', projeto=projeto, equipe=equipe, responsavel=estudante,
+                data_inicio=hoje, data_fim_prevista=hoje + datetime.timedelta(days=2),
+            )
+
+    # Projeto concluído há mais de um ano, com o mesmo grafo, que vai para o arquivo
+    velho = Projeto.objects.create(
+        nome=f'Arquivado {base}', descricao='Descrição', created_by=coordenador, status=Projeto.STATUS_CONCLUIDO,
+        data_inicio=hoje,
+    )
+    Projeto.objects.filter(pk=velho.pk).update(data_inicio=hoje - datetime.timedelta(days=800))
+    do_velho = estudantes[:escala]
+    for estudante in do_velho:
+        ParticipacaoProjeto.objects.create(projeto=velho, usuario=estudante)
+    equipe_velha = Equipe.objects.create(nome='Equipe arquivada', projeto=velho)
+    equipe_velha.membros.add(*do_velho)
+    for estudante in do_velho:
+        Tarefas.objects.create(
+            titulo=f'Tarefa arquivada {estudante.id}', projeto=velho, equipe=equipe_velha, responsavel=estudante,
+            data_inicio=hoje,
+        )
+    arquivar_projetos()
+
+    projeto = projetos[0]
+    return {
+        'projeto': projeto,
+        'equipe': projeto.equipes.get(),
+        'tarefa': projeto.tarefas.get(responsavel=estudantes[0]),
+        'estudante': estudantes[0],
+        'outro_estudante': estudantes[1],
+        'novo': novo,
+        'coordenador': coordenador,
+        'professor': professor,
+        'arquivado': ProjetoArquivado.objects.get(id_original=velho.pk),
+        'job': Job.objects.create(
+            tipo='importar_usuarios', criado_por=coordenador, status=Job.STATUS_CONCLUIDO,
+            progresso=100, resultado={'criados': escala},
+        ),
+        'calendario': gerar_token(estudantes[0]),
+        'refresh': str(RefreshToken.for_user(coordenador)),
+    }
+
+
+class OrcamentoConsultasMixin:
+    """Mixin de TestCase: a subclasse define `rotas` (lista de rota(...))"""
+
+    rotas = []
+
+    def _requisitar(self, objetos, item):
+        ids = {nome: getattr(objeto, 'id', objeto) for nome, objeto in objetos.items()}
+        ids['desde'] = (timezone.now() - datetime.timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        url = item['url'].format(**ids)
+        dados = {
+            campo: valor.format(**ids) if isinstance(valor, str) else valor
+            for campo, valor in item['dados'].items()
+        }
+        cliente = APIClient()
+        if item['usuario'] is not None:
+            # Instância nova a cada requisição: a view pode mexer no request.user (editar-perfil)
+            # e o savepoint desfaz só o banco
+            cliente.force_authenticate(Usuario.objects.get(pk=objetos[item['usuario']].pk))
+
+        ponto = transaction.savepoint()
+        try:
+            with override_settings(**item['configuracoes']), CaptureQueriesContext(connection) as consultas:
+                resposta = getattr(cliente, item['metodo'])(url, dados, format='json')
+        finally:
+            transaction.savepoint_rollback(ponto)
+        return url, resposta, [consulta['sql'] for consulta in consultas.captured_queries]
+
+    def test_orcamento_de_consultas(self):
+        coordenador = Usuario.objects.create_user(
+            'orc-coord', 'orc-coord@devlab.com', 'senha', nome='Coordenação', cpf='orc-coord',
+            tipo_usuario='coordenador'
+        )
+        professor = Usuario.objects.create_user(
+            'orc-prof', 'orc-prof@devlab.com', 'senha', nome='Professora', cpf='orc-prof',
+            tipo_usuario='professor'
+        )
+        contagens = {}
+        with override_settings(DEVLAB_THROTTLE_TAXAS=SEM_THROTTLE):
+            for escala in ESCALAS:
+                objetos = semear(escala, coordenador, professor)
+                for indice, item in enumerate(self.rotas):
+                    nome = f"{item['metodo'].upper()} {item['url']} {item['configuracoes'] or ''}".rstrip()
+                    with self.subTest(rota=nome, escala=escala):
+                        url, resposta, sqls = self._requisitar(objetos, item)
+                        self.assertLess(resposta.status_code, 400, f'{url}: {resposta.content[:300]}')
+                        self.assertLessEqual(
+                            len(sqls), item['maximo'], f'{url} passou do orçamento:\n' + '\n'.join(sqls)
+                        )
+                        repetidas = [
+                            sql for sql, vezes in Counter(sqls).items()
+                            if vezes > 1 and not sql.startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))
+                        ]
+                        self.assertEqual(repetidas, [], f'{url} repetiu consultas idênticas')
+                        # Pelo índice: a mesma rota pode aparecer com dados diferentes
+                        contagens.setdefault((indice, nome), []).append(len(sqls))
+
+        for (_, nome), por_escala in contagens.items():
+            with self.subTest(rota=nome):
+                # Mesmo número de consultas com mais linhas: nada de consulta por linha
+                self.assertEqual(len(set(por_escala)), 1, f'{nome}: {por_escala} consultas em {ESCALAS}')
+
+
+class ListagemRapidaMixin:
+    """
+    Mixin de TestCase: a listagem rápida (DevLab/projecao.py) tem que sair
+    igual, byte a byte, à do serializer. A subclasse define `urls_listagem` e
+    cria `cls.usuario_listagem` (quem faz as requisições) no setUpTestData.
+    """
+
+    urls_listagem = []
+
+    def listar(self, rapida, url):
+        cliente = APIClient()
+        cliente.force_authenticate(self.usuario_listagem)
+        with override_settings(LISTAGEM_RAPIDA=rapida):
+            resposta = cliente.get(url)
+        self.assertEqual(resposta.status_code, 200, f'{url}: {resposta.content[:300]}')
+        return resposta.content
+
+    def test_listagens_identicas_ao_serializer(self):
+        for url in self.urls_listagem:
+            with self.subTest(url=url):
+                self.assertEqual(self.listar(True, url), self.listar(False, url))
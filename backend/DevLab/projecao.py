@@ -0,0 +1,82 @@
+"""
+Listagens rápidas (somente leitura) direto de .values().
+
+Nas listagens grandes (100 itens por página) o ModelSerializer gasta mais CPU
+que o banco: cria um objeto do modelo por linha e passa por todos os campos do
+DRF, inclusive os aninhados. Aqui a view declara uma Projecao, que:
+
+- busca só as colunas usadas com .values(), já com os JOINs dos relacionamentos
+  de um para um (ex.: responsavel__nome);
+- busca os relacionamentos de muitos (membros, participantes) em uma consulta
+  por página, também com .values();
+- monta os dicionários na mesma ordem de chaves e com os mesmos formatos do
+  serializer, então o JSON sai idêntico byte a byte (os testes de cada app
+  comparam as duas saídas).
+
+Só vale para o GET da listagem; detalhe e escrita continuam no serializer.
+Se um campo mudar no serializer, a projeção precisa mudar junto (o teste pega).
+LISTAGEM_RAPIDA=False volta todas as listagens para o serializer.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# Os mesmos campos do DRF formatam datas (fuso, "Z" no UTC), para não divergir do serializer
+_campo_data = serializers.DateField()
+_campo_data_hora = serializers.DateTimeField()
+
+
+def data(valor):
+    return None if valor is None else _campo_data.to_representation(valor)
+
+
+def data_hora(valor):
+    return None if valor is None else _campo_data_hora.to_representation(valor)
+
+
+def agrupar(linhas, chave):
+    """{valor da chave: [linhas]} mantendo a ordem em que as linhas vieram"""
+    grupos = defaultdict(list)
+    for linha in linhas:
+        grupos[linha[chave]].append(linha)
+    return grupos
+
+
+class Projecao:
+    """
+    Base das projeções. `colunas` vai para o .values(); `montar` recebe as
+    linhas de uma página e devolve a lista de dicionários da resposta.
+    """
+    colunas = ()
+
+    def linhas(self, queryset):
+        # select/prefetch_related do caminho do serializer não servem para o .values()
+        return queryset.select_related(None).prefetch_related(None).values(*self.colunas)
+
+    def montar(self, linhas):
+        raise NotImplementedError
+
+    def serializar(self, queryset):
+        return self.montar(list(self.linhas(queryset)))
+
+
+class ListagemRapidaMixin:
+    """
+    Mixin para ViewSets: o list() usa `projecao_listagem` em vez do serializer.
+    A paginação, os filtros e a ordenação da view continuam os mesmos.
+    """
+    projecao_listagem = None
+
+    def responder_projecao(self, queryset, projecao):
+        page = self.paginate_queryset(projecao.linhas(queryset))
+        if page is not None:
+            return self.get_paginated_response(projecao.montar(page))
+        return Response(projecao.serializar(queryset))
+
+    def list(self, request, *args, **kwargs):
+        if self.projecao_listagem is None or not settings.LISTAGEM_RAPIDA:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.responder_projecao(queryset, self.projecao_listagem())
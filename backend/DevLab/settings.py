@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,21 +44,29 @@ INSTALLED_APPS = [
     'django_extensions',
     'django_filters',
     'corsheaders',
+    'DevLab',
     'equipe',
     'tarefas',
     'usuarios',
     'projetos',
+    'atividades',
+    'idempotencia',
+    'sincronizacao',
+    'fila',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'DevLab.db_router.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware', 
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'idempotencia.middleware.IdempotenciaMiddleware',
+    'DevLab.sqlite.SQLiteRetryMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -84,7 +93,32 @@ WSGI_APPLICATION = 'DevLab.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-if os.environ.get('DATABASE_URL'):
+# Pool de conexões do PostgreSQL (psycopg 3). Com o pool ligado cada worker
+# mantém entre DB_POOL_MIN e DB_POOL_MAX conexões e as requisições excedentes
+# esperam na fila até DB_POOL_TIMEOUT segundos.
+DB_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+
+if os.environ.get('DATABASE_URL') and DB_POOL:
+    # Produção: PostgreSQL com pool
+    DATABASES = {
+        'default': dj_database_url.config(
+            default=os.environ.get('DATABASE_URL'),
+            # O pool não funciona junto com conexões persistentes
+            conn_max_age=0,
+            # Com pool, o Django testa a conexão ao pegá-la (ConnectionPool.check_connection)
+            conn_health_checks=True,
+        )
+    }
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DB_POOL_MIN', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX', '10')),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+            'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '3600')),
+        }
+    }
+elif os.environ.get('DATABASE_URL'):
     # Produção: PostgreSQL
     DATABASES = {
         'default': dj_database_url.config(
@@ -102,6 +136,59 @@ else:
         }
     }
 
+# Modo SQLite otimizado (WAL + PRAGMAs + retry de escrita), ver DevLab/sqlite.py
+SQLITE_OTIMIZADO = os.environ.get('SQLITE_OTIMIZADO', 'True') == 'True'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 134217728,   # 128 MB
+    'cache_size': -20000,     # ~20 MB (valor negativo = KiB)
+    'busy_timeout': 5000,     # ms esperando o lock antes de dar "database is locked"
+    'temp_store': 'MEMORY',
+}
+SQLITE_RETRY_TENTATIVAS = 5
+SQLITE_RETRY_ESPERA_BASE = 0.05  # segundos
+
+if SQLITE_OTIMIZADO and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # BEGIN IMMEDIATE pega o lock de escrita no início da transação, assim o
+    # busy_timeout funciona (com DEFERRED o upgrade do lock falha na hora)
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+
+# Cache: sem configuração é o LocMemCache, um por processo. Com CACHE_BANCO=True
+# vira uma tabela no banco (python manage.py createcachetable), compartilhada por
+# todos os workers: obrigatório com réplica de leitura (ver DevLab/cache.py)
+if os.environ.get('CACHE_BANCO', 'False') == 'True':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'devlab_cache',
+        }
+    }
+
+# Réplica de leitura (opcional): GET/HEAD leem da réplica, escritas vão para o default.
+# Em produção use DATABASE_REPLICA_URL; localmente dá pra testar com uma cópia do SQLite
+# (ex: cp db.sqlite3 db_replica.sqlite3 e SQLITE_REPLICA_PATH=db_replica.sqlite3)
+DATABASE_REPLICA_ALIAS = 'replica'
+# Segundos que um cliente fica lendo do primário depois de escrever
+REPLICA_JANELA_PRIMARIO = int(os.environ.get('REPLICA_JANELA_PRIMARIO', '5'))
+
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES[DATABASE_REPLICA_ALIAS] = dj_database_url.parse(
+        os.environ.get('DATABASE_REPLICA_URL'),
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+elif os.environ.get('SQLITE_REPLICA_PATH'):
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / os.environ.get('SQLITE_REPLICA_PATH'),
+    }
+
+if DATABASE_REPLICA_ALIAS in DATABASES:
+    # Nos testes a réplica aponta para o mesmo banco do default
+    DATABASES[DATABASE_REPLICA_ALIAS]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['DevLab.db_router.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,6 +210,63 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = 'usuarios.Usuario'
 
+# Log de atividades: eventos vão para o banco em lote quando o buffer do worker
+# atinge esse tamanho ou quando o evento mais antigo passa do intervalo (segundos)
+ATIVIDADES_BUFFER_TAMANHO = int(os.environ.get('ATIVIDADES_BUFFER_TAMANHO', '100'))
+ATIVIDADES_BUFFER_INTERVALO = float(os.environ.get('ATIVIDADES_BUFFER_INTERVALO', '2'))
+# Limite do buffer com o banco fora do ar (acima disso os eventos mais antigos são descartados)
+ATIVIDADES_BUFFER_MAXIMO = int(os.environ.get('ATIVIDADES_BUFFER_MAXIMO', '5000'))
+
+# Importação de turmas: a partir de quantos usuários o hash das senhas vai para
+# um pool de processos, e quantos processos usar (0 = número de CPUs)
+IMPORTACAO_LIMIAR_PROCESSOS = 20
+IMPORTACAO_PROCESSOS = int(os.environ.get('IMPORTACAO_PROCESSOS', '0'))
+
+# Idempotency-Key: por quanto tempo a resposta fica guardada (segundos), quanto
+# uma repetição espera pela requisição original, o maior corpo guardado (bytes)
+# e o máximo de registros mantidos na tabela
+IDEMPOTENCIA_TTL = int(os.environ.get('IDEMPOTENCIA_TTL', str(60 * 60 * 24)))
+IDEMPOTENCIA_ESPERA = float(os.environ.get('IDEMPOTENCIA_ESPERA', '10'))
+IDEMPOTENCIA_MAX_BYTES = 256 * 1024
+IDEMPOTENCIA_MAX_REGISTROS = int(os.environ.get('IDEMPOTENCIA_MAX_REGISTROS', '50000'))
+# Rotas cuja resposta leva credenciais (tokens JWT, senhas temporárias da
+# importação): a Idempotency-Key é ignorada e nada é guardado
+IDEMPOTENCIA_ROTAS_EXCLUIDAS = ('/api/token/', '/api/token/refresh/', '/api/usuarios/importar/')
+
+# Sincronização incremental (?updated_since=): por quantos dias os tombstones
+# ficam guardados (cursor mais velho que isso recebe 410) e a margem, em
+# segundos, descontada do cursor devolvido para não perder commits atrasados
+SINCRONIZACAO_RETENCAO_DIAS = int(os.environ.get('SINCRONIZACAO_RETENCAO_DIAS', '30'))
+SINCRONIZACAO_MARGEM = 5
+
+# Fila de jobs (python manage.py rodar_fila): jobs simultâneos por worker,
+# espera com a fila vazia (s), prazo da reserva de um job (s), tentativas,
+# espera base do retry (s, dobra a cada tentativa) e retenção dos jobs terminados.
+# FILA_SINCRONA roda o job logo após o commit, sem worker (desenvolvimento).
+FILA_CONCORRENCIA = int(os.environ.get('FILA_CONCORRENCIA', '2'))
+FILA_INTERVALO = float(os.environ.get('FILA_INTERVALO', '1'))
+FILA_TEMPO_LIMITE = int(os.environ.get('FILA_TEMPO_LIMITE', '600'))
+FILA_MAX_TENTATIVAS = int(os.environ.get('FILA_MAX_TENTATIVAS', '3'))
+FILA_RETRY_ESPERA_BASE = 5
+FILA_RETENCAO_DIAS = int(os.environ.get('FILA_RETENCAO_DIAS', '7'))
+# Segredos de job (senhas temporárias da importação) não retirados são apagados depois disso
+FILA_SEGREDOS_HORAS = int(os.environ.get('FILA_SEGREDOS_HORAS', '24'))
+FILA_SINCRONA = os.environ.get('FILA_SINCRONA', 'False') == 'True'
+
+# Relatório de carga dos estudantes (projetos/carga.py): peso de cada item na carga
+CARGA_PESOS = {
+    'projetos': int(os.environ.get('CARGA_PESO_PROJETO', '3')),
+    'equipes': int(os.environ.get('CARGA_PESO_EQUIPE', '2')),
+    'tarefas': int(os.environ.get('CARGA_PESO_TAREFA', '1')),
+}
+
+# Listagens de tarefas, projetos e usuários direto do .values() (DevLab/projecao.py).
+# False volta para o serializer (mesma saída, mais CPU por linha)
+LISTAGEM_RAPIDA = os.environ.get('LISTAGEM_RAPIDA', 'True') == 'True'
+
+# Admin: até quantas linhas as listagens contam (acima disso o total é estimado/limitado)
+ADMIN_LIMITE_CONTAGEM = int(os.environ.get('ADMIN_LIMITE_CONTAGEM', '10000'))
+
 
 # CORS: adicionar origem de produção via variável de ambiente
 CORS_ALLOWED_ORIGINS = os.environ.get(
@@ -131,13 +275,54 @@ CORS_ALLOWED_ORIGINS = os.environ.get(
 ).split(',')
 
 CORS_ALLOW_CREDENTIALS = True  
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'if-match')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed', 'ETag']
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    # Proxies na frente do gunicorn (o Render tem um): só então o X-Forwarded-For
+    # é usado para achar o IP do cliente, e só a entrada que o proxy colocou
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '0')),
 }
 
+# Throttling por token bucket (usuarios/throttles.py). Taxas no formato "N/periodo".
+# Backend "local" guarda o estado no processo; "cache" usa o cache do Django;
+# "auto" usa o cache quando ele é compartilhado entre workers (CACHE_BANCO=True).
+DEVLAB_THROTTLE_BACKEND = os.environ.get('DEVLAB_THROTTLE_BACKEND', 'auto')
+DEVLAB_THROTTLE_TAXAS = {
+    'login_ip': os.environ.get('THROTTLE_LOGIN_IP', '20/min'),
+    'login_usuario': os.environ.get('THROTTLE_LOGIN_USUARIO', '5/min'),
+    'relatorios': os.environ.get('THROTTLE_RELATORIOS', '30/min'),
+    'importacao': os.environ.get('THROTTLE_IMPORTACAO', '10/h'),
+}
+
+# Coalescência das leituras caras (DevLab/coalescencia.py): requisições iguais e
+# simultâneas dividem um cálculo. COALESCENCIA_COMPARTILHADA estende isso entre
+# workers pelo cache (precisa de um cache compartilhado). ESPERA em segundos.
+COALESCENCIA = os.environ.get('COALESCENCIA', 'True') == 'True'
+COALESCENCIA_COMPARTILHADA = os.environ.get('COALESCENCIA_COMPARTILHADA', 'False') == 'True'
+COALESCENCIA_ESPERA = int(os.environ.get('COALESCENCIA_ESPERA', '10'))
+
+# E-mail: sem EMAIL_BACKEND os e-mails saem no console (local). Em produção,
+# django.core.mail.backends.smtp.EmailBackend com as variáveis EMAIL_*;
+# o filebased (EMAIL_FILE_PATH) grava os e-mails em arquivos.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '587'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', '30'))
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', str(BASE_DIR / 'emails'))
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'DevLab <nao-responda@devlab.local>')
+
+# Resumo de prazos (python manage.py enviar_lembretes_prazos, ver tarefas/lembretes.py)
+LEMBRETES_DIAS_ANTECEDENCIA = int(os.environ.get('LEMBRETES_DIAS_ANTECEDENCIA', '3'))
+LEMBRETES_LOTE = int(os.environ.get('LEMBRETES_LOTE', '100'))
+LEMBRETES_INTERVALO_HORAS = int(os.environ.get('LEMBRETES_INTERVALO_HORAS', '20'))
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -0,0 +1,84 @@
+"""
+Modo SQLite para produção.
+
+Quando não existe DATABASE_URL o projeto roda em SQLite. Com vários workers do
+gunicorn, o modo padrão (journal em rollback, sem busy_timeout) gera
+"database is locked" e faz leitores esperarem os escritores. Aqui ficam:
+
+- os PRAGMAs aplicados em toda conexão nova (WAL, synchronous=NORMAL, mmap,
+  cache e busy_timeout), via sinal connection_created;
+- um retry com backoff e jitter para transações de escrita que encontram o
+  banco ocupado, usado pelo SQLiteRetryMiddleware.
+"""
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def modo_otimizado_ativo(conexao=None):
+    conexao = conexao or connection
+    return conexao.vendor == 'sqlite' and getattr(settings, 'SQLITE_OTIMIZADO', False)
+
+
+def aplicar_pragmas(cursor, pragmas=None):
+    """Aplica os PRAGMAs num cursor (serve para conexões do Django ou sqlite3 puro)"""
+    pragmas = settings.SQLITE_PRAGMAS if pragmas is None else pragmas
+    for nome, valor in pragmas.items():
+        cursor.execute(f'PRAGMA {nome}={valor}')
+
+
+def configurar_conexao(sender, connection, **kwargs):
+    """Receiver de connection_created"""
+    if modo_otimizado_ativo(connection):
+        with connection.cursor() as cursor:
+            aplicar_pragmas(cursor)
+
+
+def banco_ocupado(erro):
+    mensagem = str(erro).lower()
+    return 'database is locked' in mensagem or 'database is busy' in mensagem
+
+
+def executar_com_retry(funcao, tentativas=None, espera_base=None):
+    """
+    Executa `funcao` dentro de uma transação e repete se o SQLite estiver ocupado.
+    A espera cresce exponencialmente e tem jitter pra os workers não baterem juntos de novo.
+    """
+    tentativas = tentativas or settings.SQLITE_RETRY_TENTATIVAS
+    espera_base = espera_base or settings.SQLITE_RETRY_ESPERA_BASE
+
+    for tentativa in range(tentativas):
+        try:
+            with transaction.atomic():
+                return funcao()
+        except OperationalError as erro:
+            if not banco_ocupado(erro) or tentativa == tentativas - 1:
+                raise
+            time.sleep(espera_base * (2 ** tentativa) * random.uniform(0.5, 1.5))
+
+
+class SQLiteRetryMiddleware:
+    """
+    Roda as views de escrita (POST/PUT/PATCH/DELETE) numa transação com retry
+    quando o banco é SQLite no modo otimizado.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in METODOS_SEGUROS or not modo_otimizado_ativo():
+            return None
+
+        # Lê o corpo agora para ele ficar em memória: numa segunda tentativa
+        # o DRF precisa reler os dados e o stream original já teria sido consumido
+        request.body
+
+        return executar_com_retry(lambda: view_func(request, *view_args, **view_kwargs))
@@ -0,0 +1,271 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from DevLab import coalescencia, db_router
+from DevLab.concorrencia import ConflitoDeVersao
+from tarefas.models import HistoricoStatusTarefa, Tarefas
+from usuarios.models import Usuario
+
+CACHE_BANCO = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'devlab_cache_teste'}}
+
+
+class ReplicaTest(TestCase):
+    """Fixação no primário depois de uma escrita (DevLab/db_router.py)"""
+
+    def setUp(self):
+        patcher = mock.patch.object(db_router, 'replica_configurada', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def usa_replica(self, metodo):
+        """Roda a requisição pelo middleware e devolve se as leituras iam para a réplica"""
+        visto = {}
+
+        def view(request):
+            visto['replica'] = db_router._estado_requisicao.get().usar_replica
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), metodo)('/api/tarefas/', HTTP_AUTHORIZATION='Bearer abc')
+        db_router.ReplicaMiddleware(view)(request)
+        return visto['replica']
+
+    def test_sem_cache_compartilhado_nao_sobe(self):
+        with self.assertRaises(ImproperlyConfigured):
+            db_router.verificar_cache_replica()
+        with override_settings(CACHES=CACHE_BANCO):
+            db_router.verificar_cache_replica()
+
+    @override_settings(CACHES=CACHE_BANCO)
+    def test_leitura_depois_da_escrita_vai_para_o_primario(self):
+        call_command('createcachetable', verbosity=0)
+        cache = caches['default']
+        self.assertIsInstance(cache, DatabaseCache)
+        self.assertTrue(self.usa_replica('get'))
+        self.assertFalse(self.usa_replica('post'))
+        # A fixação está no banco: qualquer worker vê
+        self.assertFalse(self.usa_replica('get'))
+        cache.clear()
+        self.assertTrue(self.usa_replica('get'))
+
+    def test_cache_no_banco_nao_conta_como_escrita(self):
+        router = db_router.ReplicaRouter()
+        estado = db_router._EstadoRequisicao(usar_replica=True)
+        token = db_router._estado_requisicao.set(estado)
+        try:
+            cache_model = DatabaseCache('tabela', {}).cache_model_class
+            self.assertEqual(router.db_for_read(cache_model), 'default')
+            router.db_for_write(cache_model)
+            self.assertFalse(estado.escreveu)
+            self.assertEqual(router.db_for_read(Usuario), 'replica')
+            router.db_for_write(Usuario)
+            self.assertTrue(estado.escreveu)
+            self.assertEqual(router.db_for_read(Usuario), 'default')
+        finally:
+            db_router._estado_requisicao.reset(token)
+
+
+class _EventoContado(threading.Event):
+    """Event que avisa (semáforo) cada thread que começa a esperar"""
+
+    def __init__(self, esperando):
+        super().__init__()
+        self.esperando = esperando
+
+    def wait(self, timeout=None):
+        self.esperando.release()
+        return super().wait(timeout)
+
+
+@override_settings(COALESCENCIA=True, COALESCENCIA_COMPARTILHADA=False, COALESCENCIA_ESPERA=5)
+class CoalescenciaTest(SimpleTestCase):
+    """Single-flight dos relatórios (DevLab/coalescencia.py), com threads de verdade"""
+
+    SEGUIDORES = 4
+
+    def setUp(self):
+        cache.clear()
+        self.antes = coalescencia.estatisticas_coalescencia()
+
+    def contado(self, nome):
+        return coalescencia.estatisticas_coalescencia().get(nome, 0) - self.antes.get(nome, 0)
+
+    def rodar_juntos(self, chave, lider, seguidor):
+        """
+        Roda `lider` numa thread e, com o cálculo dele em andamento, SEGUIDORES
+        threads com `seguidor`; `lider` recebe o Event que libera o fim do cálculo.
+        Devolve os resultados (ou exceções) na ordem: líder, seguidores.
+        """
+        liberar = threading.Event()
+        resultados = [None] * (self.SEGUIDORES + 1)
+
+        def rodar(i, funcao):
+            try:
+                resultados[i] = coalescencia.coalescer(chave, funcao)
+            except Exception as erro:
+                resultados[i] = erro
+
+        threads = [threading.Thread(target=rodar, args=(0, lambda: lider(liberar)))]
+        threads[0].start()
+        while chave not in coalescencia._em_andamento:
+            time.sleep(0.001)
+        esperando = threading.Semaphore(0)
+        coalescencia._em_andamento[chave].pronto = _EventoContado(esperando)
+
+        threads += [threading.Thread(target=rodar, args=(i, seguidor)) for i in range(1, self.SEGUIDORES + 1)]
+        for thread in threads[1:]:
+            thread.start()
+        for _ in range(self.SEGUIDORES):
+            self.assertTrue(esperando.acquire(timeout=5))
+        liberar.set()
+        for thread in threads:
+            thread.join(5)
+        return resultados
+
+    def test_um_calculo_para_requisicoes_simultaneas(self):
+        chamadas = []
+
+        def calcular(liberar):
+            chamadas.append('lider')
+            liberar.wait(5)
+            return {'total': 42}
+
+        resultados = self.rodar_juntos('relatorio', calcular, lambda: chamadas.append('seguidor'))
+        self.assertEqual(resultados, [{'total': 42}] * (self.SEGUIDORES + 1))
+        self.assertEqual(chamadas, ['lider'])
+        self.assertEqual((self.contado('calculos'), self.contado('coalescidas')), (1, self.SEGUIDORES))
+        self.assertEqual(coalescencia.estatisticas_coalescencia()['em_andamento'], 0)
+
+        # Terminado o cálculo, a próxima chamada calcula de novo
+        self.assertEqual(coalescencia.coalescer('relatorio', lambda: {'total': 43}), {'total': 43})
+        self.assertEqual(self.contado('calculos'), 2)
+
+    def test_falha_do_lider(self):
+        def falhar(liberar):
+            liberar.wait(5)
+            raise RuntimeError('banco caiu')
+
+        resultados = self.rodar_juntos('relatorio', falhar, lambda: 'por conta própria')
+        self.assertIsInstance(resultados[0], RuntimeError)
+        # Quem esperava não recebe o erro: calcula sozinho
+        self.assertEqual(resultados[1:], ['por conta própria'] * self.SEGUIDORES)
+        self.assertEqual(self.contado('esperas_sem_resultado'), self.SEGUIDORES)
+        self.assertEqual(self.contado('coalescidas'), 0)
+        self.assertEqual(coalescencia.estatisticas_coalescencia()['em_andamento'], 0)
+
+    @override_settings(COALESCENCIA_COMPARTILHADA=True)
+    def test_resultado_de_outro_worker(self):
+        trava = 'coalescencia:trava:relatorio'
+        # Outro worker pegou a trava e publica o resultado daqui a pouco
+        cache.add(trava, 'geracao-outro')
+
+        def publicar():
+            time.sleep(0.1)
+            cache.set('coalescencia:resultado:geracao-outro', {'total': 7})
+            cache.delete(trava)
+
+        thread = threading.Thread(target=publicar)
+        thread.start()
+        resultado = coalescencia.coalescer('relatorio', lambda: self.fail('não devia calcular'))
+        thread.join()
+        self.assertEqual(resultado, {'total': 7})
+        self.assertEqual((self.contado('coalescidas_compartilhadas'), self.contado('calculos')), (1, 0))
+
+    @override_settings(COALESCENCIA_COMPARTILHADA=True)
+    def test_outro_worker_sem_resultado_e_trava_propria(self):
+        trava = 'coalescencia:trava:relatorio'
+        cache.add(trava, 'geracao-outro')
+        # O outro worker some sem publicar (a trava expira)
+        threading.Timer(0.1, cache.delete, args=(trava,)).start()
+        self.assertEqual(coalescencia.coalescer('relatorio', lambda: {'total': 1}), {'total': 1})
+        self.assertEqual(self.contado('calculos'), 1)
+
+        # Com a trava livre este worker calcula, publica e solta a trava
+        self.assertEqual(coalescencia.coalescer('relatorio', lambda: {'total': 2}), {'total': 2})
+        self.assertEqual(self.contado('calculos'), 2)
+        self.assertIsNone(cache.get(trava))
+
+
+class ConcorrenciaOtimistaTest(TestCase):
+    """If-Match / versao (DevLab/concorrencia.py), pela API de tarefas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.estudante = Usuario.objects.create_user(
+            'aluno', 'aluno@devlab.com', 'senha', nome='Aluno', cpf='111', tipo_usuario='estudante'
+        )
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.estudante)
+        self.tarefa = Tarefas.objects.create(titulo='Original', responsavel=self.estudante)
+        self.url = f'/api/tarefas/{self.tarefa.id}/'
+
+    def editar(self, if_match=None, **dados):
+        extras = {'HTTP_IF_MATCH': if_match} if if_match is not None else {}
+        return self.cliente.patch(self.url, dados, format='json', **extras)
+
+    def test_etag_com_a_versao(self):
+        resposta = self.cliente.get(self.url)
+        self.assertEqual(resposta['ETag'], '"1"')
+        self.assertEqual(resposta.data['versao'], 1)
+
+    def test_escrita_com_a_versao_atual(self):
+        resposta = self.editar('"1"', titulo='Nova')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['ETag'], '"2"')
+        self.assertEqual(resposta.data['versao'], 2)
+        # Formas aceitas: W/"2" e só o número
+        self.assertEqual(self.editar('W/"2"', titulo='De novo').status_code, 200)
+        self.assertEqual(self.editar('3', titulo='Outra').status_code, 200)
+        self.tarefa.refresh_from_db()
+        self.assertEqual((self.tarefa.titulo, self.tarefa.versao), ('Outra', 4))
+
+    def test_escrita_com_versao_velha(self):
+        self.editar(titulo='Outra requisição passou na frente')
+        resposta = self.editar('"1"', titulo='Atrasada', status='concluida')
+        self.assertEqual(resposta.status_code, 412)
+        self.assertEqual(resposta.data['versao_atual'], 2)
+        self.assertEqual(resposta['ETag'], '"2"')
+        # Nada foi gravado, nem o histórico da transição
+        self.tarefa.refresh_from_db()
+        self.assertEqual((self.tarefa.titulo, self.tarefa.status, self.tarefa.versao),
+                         ('Outra requisição passou na frente', 'nao_iniciado', 2))
+        self.assertFalse(HistoricoStatusTarefa.objects.filter(tarefa=self.tarefa, status_novo='concluida').exists())
+
+        # Também nas actions que gravam pelo get_object
+        resposta = self.cliente.post(
+            f'{self.url}change_status/', {'status': 'concluida'}, format='json', HTTP_IF_MATCH='"1"'
+        )
+        self.assertEqual(resposta.status_code, 412)
+
+    def test_sem_precondicao(self):
+        # Sem If-Match (ou com "*") a última escrita vence e a versão sobe
+        self.assertEqual(self.editar(titulo='A').data['versao'], 2)
+        self.assertEqual(self.editar('*', titulo='B').data['versao'], 3)
+        self.assertEqual(self.editar('"abc"', titulo='C').status_code, 400)
+        self.tarefa.refresh_from_db()
+        self.assertEqual((self.tarefa.titulo, self.tarefa.versao), ('B', 3))
+
+    def test_save_direto_no_modelo(self):
+        self.tarefa._versao_esperada = 5
+        # Como nas views: o save com versão esperada roda dentro de um atomic
+        with self.assertRaises(ConflitoDeVersao) as conflito, transaction.atomic():
+            self.tarefa.save()
+        self.assertEqual((conflito.exception.versao_atual, conflito.exception.versao_esperada), (1, 5))
+        self.assertEqual(self.tarefa.versao, 5)
+
+        self.tarefa.refresh_from_db()
+        self.tarefa.titulo = 'Sem versão esperada'
+        self.tarefa.save(update_fields=['titulo'])
+        self.tarefa.refresh_from_db()
+        self.assertEqual(self.tarefa.versao, 2)
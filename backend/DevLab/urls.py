@@ -16,10 +16,9 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
+from usuarios.views import TokenObtainPairProtegidoView
+from DevLab.instrumentacao import InstrumentacaoView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,7 +26,10 @@ urlpatterns = [
     path('api/', include('projetos.urls')),
     path('api/', include('equipe.urls')),
     path('api/usuarios/', include('usuarios.urls')),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', TokenObtainPairProtegidoView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/instrumentacao/', InstrumentacaoView.as_view(), name='instrumentacao'),
     path('api/', include('tarefas.urls')),
+    path('api/', include('atividades.urls')),
+    path('api/', include('fila.urls')),
 ]
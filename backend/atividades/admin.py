@@ -0,0 +1,9 @@
+from django.contrib import admin
+from atividades.models import Atividade
+
+
+@admin.register(Atividade)
+class AtividadeAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tipo', 'usuario_id', 'projeto_id', 'objeto_id', 'criado_em']
+    list_filter = ['tipo']
+    ordering = ['-id']
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class AtividadesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'atividades'
+
+    def ready(self):
+        import atexit
+        from atividades.buffer import buffer_atividades
+        from DevLab.instrumentacao import registrar_coletor
+
+        # Na parada do worker grava o que ainda estiver no buffer
+        atexit.register(buffer_atividades.flush)
+        registrar_coletor('atividades', buffer_atividades.estatisticas)
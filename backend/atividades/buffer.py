@@ -0,0 +1,123 @@
+"""
+Buffer das atividades.
+
+Gravar um evento a cada escrita colocaria mais um INSERT em toda requisição.
+Em vez disso os eventos ficam numa lista do processo e vão para o banco com um
+único bulk_create quando o buffer enche (ATIVIDADES_BUFFER_TAMANHO) ou quando o
+evento mais antigo passa de ATIVIDADES_BUFFER_INTERVALO segundos. Na parada do
+worker o atexit (ver apps.py) grava o que sobrou.
+
+Se o INSERT falhar (banco fora do ar, por exemplo) os eventos voltam para o
+começo do buffer e o timer tenta de novo; o lote é gravado numa transação só,
+então uma nova tentativa não duplica metade dele. Com o banco fora por muito
+tempo o buffer para em ATIVIDADES_BUFFER_MAXIMO eventos: os mais antigos são
+descartados (e contados em estatisticas(), que vai para a instrumentação)
+em vez de a memória do worker crescer sem limite.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class BufferAtividades:
+    def __init__(self):
+        self._eventos = []
+        self._lock = threading.Lock()
+        self._timer = None
+        self.descartados = 0
+
+    def adicionar(self, evento):
+        with self._lock:
+            self._eventos.append(evento)
+            self._limitar()
+            cheio = len(self._eventos) >= settings.ATIVIDADES_BUFFER_TAMANHO
+            if not cheio:
+                # Primeiro evento do lote: agenda o flush por tempo
+                self._agendar()
+        if cheio:
+            self._flush_sem_erro()
+
+    def _limitar(self):
+        # Chamado com o lock
+        excesso = len(self._eventos) - settings.ATIVIDADES_BUFFER_MAXIMO
+        if excesso > 0:
+            del self._eventos[:excesso]
+            self.descartados += excesso
+            logger.warning('Buffer de atividades no limite: %s eventos antigos descartados', excesso)
+
+    def _agendar(self):
+        # Chamado com o lock
+        if self._timer is None:
+            self._timer = threading.Timer(settings.ATIVIDADES_BUFFER_INTERVALO, self._flush_por_tempo)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_sem_erro(self):
+        # O log de atividades não derruba a requisição: os eventos ficam no buffer para a próxima tentativa
+        try:
+            self.flush()
+        except DatabaseError:
+            logger.exception('Falha ao gravar %s atividades; ficam no buffer', self.pendentes())
+
+    def _flush_por_tempo(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self._flush_sem_erro()
+        finally:
+            # A thread do timer abre a própria conexão; fecha pra não deixar conexão solta
+            connection.close()
+
+    def flush(self):
+        from atividades.models import Atividade
+
+        with self._lock:
+            eventos, self._eventos = self._eventos, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not eventos:
+            return 0
+        try:
+            with transaction.atomic():
+                Atividade.objects.bulk_create(eventos, batch_size=500)
+        except Exception:
+            with self._lock:
+                # Na frente dos que chegaram enquanto isso, para manter a ordem
+                self._eventos[:0] = eventos
+                self._limitar()
+                self._agendar()
+            raise
+        return len(eventos)
+
+    def pendentes(self):
+        return len(self._eventos)
+
+    def estatisticas(self):
+        return {'pendentes': self.pendentes(), 'descartados': self.descartados}
+
+
+buffer_atividades = BufferAtividades()
+
+
+def registrar_atividade(tipo, usuario=None, projeto_id=None, objeto_id=None, **dados):
+    """
+    Registra uma atividade. O evento só entra no buffer depois do commit da
+    transação atual, assim uma escrita desfeita não deixa evento para trás.
+    """
+    from atividades.models import Atividade
+
+    evento = Atividade(
+        tipo=tipo,
+        usuario_id=getattr(usuario, 'pk', usuario),
+        projeto_id=projeto_id,
+        objeto_id=objeto_id,
+        dados=dados,
+        criado_em=timezone.now(),
+    )
+    transaction.on_commit(lambda: buffer_atividades.adicionar(evento))
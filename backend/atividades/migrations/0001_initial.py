@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Atividade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('tarefa_status', 'Status da tarefa alterado'), ('tarefa_responsavel', 'Responsável da tarefa alterado'), ('participante_adicionado', 'Participante adicionado ao projeto'), ('participantes_importados', 'Participantes importados para o projeto'), ('lider_projeto', 'Líder do projeto definido'), ('professor_projeto', 'Professor do projeto definido'), ('lider_equipe', 'Líder da equipe definido'), ('membro_adicionado', 'Membro adicionado à equipe'), ('membro_removido', 'Membro removido da equipe')], max_length=30)),
+                ('usuario_id', models.BigIntegerField(blank=True, null=True)),
+                ('projeto_id', models.BigIntegerField(blank=True, null=True)),
+                ('objeto_id', models.BigIntegerField(blank=True, null=True)),
+                ('dados', models.JSONField(blank=True, default=dict)),
+                ('criado_em', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Atividade',
+                'verbose_name_plural': 'Atividades',
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['projeto_id', '-id'], name='atividade_projeto_idx'), models.Index(fields=['usuario_id', '-id'], name='atividade_usuario_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('atividades', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='atividade',
+            name='tipo',
+            field=models.CharField(choices=[('tarefa_status', 'Status da tarefa alterado'), ('tarefa_responsavel', 'Responsável da tarefa alterado'), ('participante_adicionado', 'Participante adicionado ao projeto'), ('participantes_importados', 'Participantes importados para o projeto'), ('lider_projeto', 'Líder do projeto definido'), ('professor_projeto', 'Professor do projeto definido'), ('lider_equipe', 'Líder da equipe definido'), ('membro_adicionado', 'Membro adicionado à equipe'), ('membro_removido', 'Membro removido da equipe'), ('equipes_formadas', 'Equipes formadas automaticamente')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import models
+
+
+class Atividade(models.Model):
+    """
+    Registro append-only das ações feitas em projetos, tarefas e equipes.
+    Os relacionamentos são guardados só como ids (sem FK) para a tabela ficar
+    compacta e o histórico sobreviver à exclusão ou arquivamento dos objetos.
+    """
+
+    TIPO_STATUS_TAREFA = 'tarefa_status'
+    TIPO_RESPONSAVEL_TAREFA = 'tarefa_responsavel'
+    TIPO_PARTICIPANTE_ADICIONADO = 'participante_adicionado'
+    TIPO_PARTICIPANTES_IMPORTADOS = 'participantes_importados'
+    TIPO_LIDER_PROJETO = 'lider_projeto'
+    TIPO_PROFESSOR_PROJETO = 'professor_projeto'
+    TIPO_LIDER_EQUIPE = 'lider_equipe'
+    TIPO_MEMBRO_ADICIONADO = 'membro_adicionado'
+    TIPO_MEMBRO_REMOVIDO = 'membro_removido'
+    TIPO_EQUIPES_FORMADAS = 'equipes_formadas'
+
+    TIPO_CHOICES = [
+        (TIPO_STATUS_TAREFA, 'Status da tarefa alterado'),
+        (TIPO_RESPONSAVEL_TAREFA, 'Responsável da tarefa alterado'),
+        (TIPO_PARTICIPANTE_ADICIONADO, 'Participante adicionado ao projeto'),
+        (TIPO_PARTICIPANTES_IMPORTADOS, 'Participantes importados para o projeto'),
+        (TIPO_LIDER_PROJETO, 'Líder do projeto definido'),
+        (TIPO_PROFESSOR_PROJETO, 'Professor do projeto definido'),
+        (TIPO_LIDER_EQUIPE, 'Líder da equipe definido'),
+        (TIPO_MEMBRO_ADICIONADO, 'Membro adicionado à equipe'),
+        (TIPO_MEMBRO_REMOVIDO, 'Membro removido da equipe'),
+        (TIPO_EQUIPES_FORMADAS, 'Equipes formadas automaticamente'),
+    ]
+
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES)
+    # Quem fez a ação
+    usuario_id = models.BigIntegerField(null=True, blank=True)
+    projeto_id = models.BigIntegerField(null=True, blank=True)
+    # Objeto alterado (tarefa, equipe ou usuário, conforme o tipo)
+    objeto_id = models.BigIntegerField(null=True, blank=True)
+    dados = models.JSONField(default=dict, blank=True)
+    criado_em = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Atividade"
+        verbose_name_plural = "Atividades"
+        ordering = ['-id']
+        # As consultas são sempre "eventos de um projeto/usuário, mais recentes primeiro"
+        indexes = [
+            models.Index(fields=['projeto_id', '-id'], name='atividade_projeto_idx'),
+            models.Index(fields=['usuario_id', '-id'], name='atividade_usuario_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} ({self.criado_em:%d/%m/%Y %H:%M})"
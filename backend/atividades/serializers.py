@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from atividades.models import Atividade
+
+
+class AtividadeSerializer(serializers.ModelSerializer):
+    tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
+
+    class Meta:
+        model = Atividade
+        fields = ['id', 'tipo', 'tipo_display', 'usuario_id', 'projeto_id', 'objeto_id', 'dados', 'criado_em']
+        read_only_fields = fields
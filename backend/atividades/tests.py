@@ -0,0 +1,135 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from atividades.buffer import BufferAtividades, buffer_atividades, registrar_atividade
+from atividades.models import Atividade
+from DevLab.instrumentacao import coletar
+from projetos.models import ParticipacaoProjeto, Projeto
+from usuarios.models import Usuario
+
+
+@override_settings(ATIVIDADES_BUFFER_TAMANHO=3, ATIVIDADES_BUFFER_INTERVALO=3600, ATIVIDADES_BUFFER_MAXIMO=4)
+class BufferAtividadesTest(TestCase):
+
+    def setUp(self):
+        self.buffer = BufferAtividades()
+        self.addCleanup(lambda: self.buffer._timer and self.buffer._timer.cancel())
+
+    def evento(self, objeto_id):
+        return Atividade(tipo=Atividade.TIPO_STATUS_TAREFA, objeto_id=objeto_id, criado_em=timezone.now())
+
+    def test_grava_quando_enche(self):
+        self.buffer.adicionar(self.evento(1))
+        self.buffer.adicionar(self.evento(2))
+        self.assertEqual(Atividade.objects.count(), 0)
+        self.assertIsNotNone(self.buffer._timer)
+
+        self.buffer.adicionar(self.evento(3))
+        self.assertEqual(self.buffer.pendentes(), 0)
+        self.assertIsNone(self.buffer._timer)
+        self.assertEqual(list(Atividade.objects.order_by('id').values_list('objeto_id', flat=True)), [1, 2, 3])
+
+    def test_falha_no_insert_devolve_os_eventos(self):
+        self.buffer.adicionar(self.evento(1))
+        self.buffer.adicionar(self.evento(2))
+
+        with mock.patch.object(Atividade.objects, 'bulk_create', side_effect=DatabaseError('fora do ar')):
+            with self.assertRaises(DatabaseError):
+                self.buffer.flush()
+            self.assertEqual(self.buffer.pendentes(), 2)
+            # Buffer cheio com o banco fora: a requisição não quebra e nada se perde
+            with self.assertLogs('atividades.buffer', 'ERROR'):
+                self.buffer.adicionar(self.evento(3))
+        self.assertEqual(self.buffer.pendentes(), 3)
+        # Com o retry agendado
+        self.assertIsNotNone(self.buffer._timer)
+
+        self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(list(Atividade.objects.order_by('id').values_list('objeto_id', flat=True)), [1, 2, 3])
+
+    def test_limite_com_o_banco_fora(self):
+        with mock.patch.object(Atividade.objects, 'bulk_create', side_effect=DatabaseError('fora do ar')):
+            with self.assertLogs('atividades.buffer', 'WARNING'):
+                for objeto_id in range(1, 8):
+                    self.buffer.adicionar(self.evento(objeto_id))
+        # Ficam os 4 mais recentes; os antigos são descartados e contados
+        self.assertEqual(self.buffer.estatisticas(), {'pendentes': 4, 'descartados': 3})
+
+        self.assertEqual(self.buffer.flush(), 4)
+        self.assertEqual(list(Atividade.objects.order_by('id').values_list('objeto_id', flat=True)), [4, 5, 6, 7])
+        self.assertEqual(self.buffer.estatisticas(), {'pendentes': 0, 'descartados': 3})
+
+    def test_estatisticas_na_instrumentacao(self):
+        self.assertEqual(set(coletar()['atividades']), {'pendentes', 'descartados'})
+
+
+class AtividadesApiTest(TestCase):
+    """GET /api/atividades/projetos/{id}/ e /api/atividades/usuarios/{id}/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.coordenador = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='000', tipo_usuario='coordenador'
+        )
+        cls.aluno, cls.outro = [
+            Usuario.objects.create_user(
+                f'aluno{i}', f'aluno{i}@devlab.com', 'senha', nome=f'Aluno {i}', cpf=f'cpf-{i}',
+                tipo_usuario='estudante'
+            )
+            for i in range(2)
+        ]
+        cls.projeto = Projeto.objects.create(nome='P', descricao='D', data_inicio=timezone.localdate())
+        ParticipacaoProjeto.objects.create(projeto=cls.projeto, usuario=cls.aluno)
+
+    def setUp(self):
+        self.addCleanup(buffer_atividades.flush)
+        self.cliente = APIClient()
+
+    def registrar(self, quantidade, usuario, projeto_id=None):
+        # O evento entra no buffer no commit; a listagem grava o buffer antes de consultar
+        with self.captureOnCommitCallbacks(execute=True):
+            for objeto_id in range(quantidade):
+                registrar_atividade(
+                    Atividade.TIPO_STATUS_TAREFA, usuario=usuario, projeto_id=projeto_id, objeto_id=objeto_id
+                )
+
+    def listar(self, usuario, url, **parametros):
+        self.cliente.force_authenticate(usuario)
+        return self.cliente.get(url, parametros)
+
+    def test_por_projeto(self):
+        self.registrar(3, self.coordenador, self.projeto.id)
+        self.registrar(1, self.coordenador)
+        url = f'/api/atividades/projetos/{self.projeto.id}/'
+
+        resposta = self.listar(self.coordenador, url)
+        self.assertEqual(resposta.status_code, 200)
+        # Mais recentes primeiro, só as do projeto
+        self.assertEqual([a['objeto_id'] for a in resposta.data['results']], [2, 1, 0])
+        self.assertEqual(resposta.data['results'][0]['tipo_display'], 'Status da tarefa alterado')
+
+        self.assertEqual(self.listar(self.aluno, url).status_code, 200)
+        self.assertEqual(self.listar(self.outro, url).status_code, 403)
+
+    def test_por_usuario(self):
+        self.registrar(2, self.aluno)
+        url = f'/api/atividades/usuarios/{self.aluno.id}/'
+        self.assertEqual(len(self.listar(self.aluno, url).data['results']), 2)
+        self.assertEqual(len(self.listar(self.coordenador, url).data['results']), 2)
+        self.assertEqual(self.listar(self.outro, url).status_code, 403)
+        self.cliente.force_authenticate(None)
+        self.assertEqual(self.cliente.get(url).status_code, 401)
+
+    def test_paginacao_por_cursor(self):
+        self.registrar(5, self.coordenador, self.projeto.id)
+        url = f'/api/atividades/projetos/{self.projeto.id}/'
+        primeira = self.listar(self.coordenador, url, tamanho=2)
+        self.assertEqual([a['objeto_id'] for a in primeira.data['results']], [4, 3])
+        segunda = self.cliente.get(primeira.data['next'])
+        self.assertEqual([a['objeto_id'] for a in segunda.data['results']], [2, 1])
+        self.assertIsNone(primeira.data['previous'])
@@ -0,0 +1,7 @@
+from rest_framework.routers import DefaultRouter
+from atividades.views import AtividadeViewSet
+
+router = DefaultRouter()
+router.register(r'atividades', AtividadeViewSet, basename='atividade')
+
+urlpatterns = router.urls
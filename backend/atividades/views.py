@@ -0,0 +1,60 @@
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from atividades.buffer import buffer_atividades
+from atividades.models import Atividade
+from atividades.serializers import AtividadeSerializer
+
+
+class AtividadePaginacao(CursorPagination):
+    # Cursor pelo id: cada página é uma faixa do índice (projeto_id/usuario_id, -id), sem OFFSET
+    page_size = 50
+    page_size_query_param = 'tamanho'
+    max_page_size = 200
+    ordering = '-id'
+
+
+class AtividadeViewSet(viewsets.GenericViewSet):
+    """
+    Consulta do log de atividades.
+    - GET /api/atividades/projetos/{projeto_id}/
+    - GET /api/atividades/usuarios/{usuario_id}/
+    Coordenadores veem tudo; os outros usuários veem as atividades dos projetos
+    em que participam e as próprias.
+    """
+    queryset = Atividade.objects.all()
+    serializer_class = AtividadeSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = AtividadePaginacao
+
+    def _listar(self, atividades):
+        # Grava o que está no buffer deste worker antes de consultar
+        buffer_atividades.flush()
+        page = self.paginate_queryset(atividades)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path=r'projetos/(?P<projeto_id>[0-9]+)')
+    def por_projeto(self, request, projeto_id=None):
+        user = request.user
+        if user.tipo_usuario != 'coordenador':
+            from projetos.models import ParticipacaoProjeto
+            if not ParticipacaoProjeto.objects.filter(projeto_id=projeto_id, usuario=user).exists():
+                return Response(
+                    {'detail': 'Você não participa deste projeto.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+        return self._listar(self.get_queryset().filter(projeto_id=projeto_id))
+
+    @action(detail=False, methods=['get'], url_path=r'usuarios/(?P<usuario_id>[0-9]+)')
+    def por_usuario(self, request, usuario_id=None):
+        user = request.user
+        if user.tipo_usuario != 'coordenador' and str(user.pk) != usuario_id:
+            return Response(
+                {'detail': 'Você só pode ver as suas próprias atividades.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return self._listar(self.get_queryset().filter(usuario_id=usuario_id))
@@ -6,3 +6,4 @@ pip install -r requirements.txt
 
 python manage.py collectstatic --no-input --clear
 python manage.py migrate
+python manage.py createcachetable
@@ -1,13 +1,20 @@
 from django.contrib import admin
+from django.db.models import Count
+
+from DevLab.admin_rapido import AdminRapidoMixin
 from equipe.models import Equipe
 
 @admin.register(Equipe)
-class EquipeAdmin(admin.ModelAdmin):
+class EquipeAdmin(AdminRapidoMixin, admin.ModelAdmin):
     """Configuração do admin para o modelo Equipe"""
 
     list_display = ['nome', 'projeto', 'lider', 'total_membros', 'data_criacao']
+    # Projeto e líder vêm no mesmo SELECT (o __str__ da equipe e do líder usam esses dados)
+    list_select_related = ['projeto', 'lider']
     list_filter = ['projeto', 'data_criacao']
-    search_fields = ['nome', 'descricao', 'projeto__nome', 'lider__username']
+    # Busca por prefixo ("termo%") em vez de "%termo%", sem a descrição. Nome da equipe e do
+    # projeto não têm índice: a busca percorre a tabela, mas compara só os nomes
+    search_fields = ['^nome', '^projeto__nome', '=lider__username']
     autocomplete_fields = ['projeto', 'lider']
     filter_horizontal = ['membros']
     date_hierarchy = 'data_criacao'
@@ -21,7 +28,12 @@ class EquipeAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        # O total de membros vem anotado na própria consulta (um COUNT por linha seria N+1)
+        return super().get_queryset(request).annotate(_total_membros=Count('membros', distinct=True))
+
     def total_membros(self, obj):
         """Exibe total de membros"""
-        return obj.membros.count()
-    total_membros.short_description = 'Total de Membros'
\ No newline at end of file
+        return obj._total_membros
+    total_membros.short_description = 'Total de Membros'
+    total_membros.admin_order_field = '_total_membros'
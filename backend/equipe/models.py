@@ -2,7 +2,9 @@ from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
 
-class Equipe(models.Model):
+from DevLab.concorrencia import ModeloVersionado
+
+class Equipe(ModeloVersionado):
     """
     Modelo de Equipe para o sistema DevLab.
     Cada equipe pertence a um único projeto e tem um líder.
@@ -50,6 +52,9 @@ class Equipe(models.Model):
         help_text="Data de criação da equipe"
     )
 
+    # Última modificação, usada pela sincronização incremental (?updated_since=)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     def __str__(self):
         return f"{self.nome} - {self.projeto.nome}"
 
@@ -60,9 +65,9 @@ class Equipe(models.Model):
         """
         super().clean()
 
-        if self.lider and self.projeto:
+        if self.lider_id and self.projeto_id:
             # Verifica se o líder participa do projeto
-            if not self.projeto.participantes.filter(id=self.lider.id).exists():
+            if not self.projeto.tem_participante(self.lider_id):
                 raise ValidationError({
                     'lider': f'O líder {self.lider} deve ser um participante do projeto {self.projeto}.'
                 })
@@ -70,8 +75,10 @@ class Equipe(models.Model):
     def save(self, *args, **kwargs):
         """Sobrescreve save para incluir validação automática"""
         validate = kwargs.pop('validate', True)
+        # Campos cuja unicidade o EquipeSerializer acabou de checar (vale para um único save)
+        ja_validados = self.__dict__.pop('_unicos_validados', None)
         if validate and self.pk:  # Só valida se já existe (para evitar erro ao criar)
-            self.full_clean()
+            self.full_clean(exclude=ja_validados)
         super().save(*args, **kwargs)
 
     class Meta:
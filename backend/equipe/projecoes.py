@@ -0,0 +1,51 @@
+"""Projeções de listagem (ver DevLab/projecao.py) para equipes"""
+from DevLab.projecao import Projecao, agrupar, data, data_hora
+from equipe.models import Equipe
+from usuarios.projecoes import CAMPOS_USUARIO_RESUMO, colunas_usuario, usuario_de_linha
+
+
+class ProjecaoEquipe(Projecao):
+    """
+    Mesma saída do EquipeSerializer. Os membros vêm ordenados por id, a mesma
+    ordem do Prefetch usado no caminho do serializer.
+    """
+    colunas = (
+        'id', 'nome', 'descricao', 'projeto_id', 'projeto__nome', 'lider_id',
+        *colunas_usuario('lider__', CAMPOS_USUARIO_RESUMO),
+        'data_criacao', 'updated_at', 'versao',
+    )
+
+    def membros_por_equipe(self, equipe_ids):
+        linhas = Equipe.membros.through.objects.filter(
+            equipe_id__in=equipe_ids
+        ).order_by('usuario_id').values('equipe_id', *colunas_usuario('usuario__', CAMPOS_USUARIO_RESUMO))
+        return agrupar(linhas, 'equipe_id')
+
+    def montar(self, linhas):
+        membros = self.membros_por_equipe([linha['id'] for linha in linhas])
+        resultado = []
+        for linha in linhas:
+            membros_equipe = membros.get(linha['id'], [])
+            resultado.append({
+                'id': linha['id'],
+                'nome': linha['nome'],
+                'descricao': linha['descricao'],
+                'projeto': linha['projeto_id'],
+                'projeto_nome': linha['projeto__nome'],
+                'lider': linha['lider_id'],
+                'lider_detalhes': usuario_de_linha(linha, 'lider__', CAMPOS_USUARIO_RESUMO),
+                'membros': [membro['usuario__id'] for membro in membros_equipe],
+                'membros_detalhes': [
+                    usuario_de_linha(membro, 'usuario__', CAMPOS_USUARIO_RESUMO) for membro in membros_equipe
+                ],
+                'data_criacao': data(linha['data_criacao']),
+                'updated_at': data_hora(linha['updated_at']),
+                'versao': linha['versao'],
+            })
+        return resultado
+
+    def por_id(self, ids):
+        """{id da equipe: dicionário} para usar aninhado em outra projeção"""
+        if not ids:
+            return {}
+        return {equipe['id']: equipe for equipe in self.serializar(Equipe.objects.filter(pk__in=ids))}
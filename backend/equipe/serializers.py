@@ -1,3 +1,4 @@
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from equipe.models import Equipe
 from usuarios.serializers import UsuarioResumoSerializer
@@ -25,8 +26,27 @@ class EquipeSerializer(serializers.ModelSerializer):
             'membros',
             'membros_detalhes',
             'data_criacao',
+            'updated_at',
+            'versao',
         ]
-        read_only_fields = ['id', 'data_criacao']
+        read_only_fields = ['id', 'data_criacao', 'updated_at', 'versao']
+
+    def to_representation(self, instance):
+        # membros e membros_detalhes leem a mesma relação: sem prefetch (ou depois
+        # de um add/remove, que limpa o cache) busca uma vez só para os dois
+        if 'membros' not in getattr(instance, '_prefetched_objects_cache', {}):
+            prefetch_related_objects([instance], 'membros')
+        return super().to_representation(instance)
+
+    def update(self, instance, validated_data):
+        # nome/projeto (unique_together) e lider (OneToOne) que vieram nos dados já
+        # passaram pelos validadores de unicidade do serializer: o full_clean do
+        # save não repete as mesmas consultas. As outras validações continuam.
+        instance._unicos_validados = [
+            campo for campo, enviados in (('nome', ('nome', 'projeto')), ('lider', ('lider',)))
+            if any(enviado in validated_data for enviado in enviados)
+        ]
+        return super().update(instance, validated_data)
 
     def validate(self, data):
         """
@@ -43,7 +63,7 @@ class EquipeSerializer(serializers.ModelSerializer):
 
         # Valida se o líder participa do projeto
         if lider and projeto:
-            if not projeto.participantes.filter(id=lider.id).exists():
+            if not projeto.tem_participante(lider.id):
                 raise serializers.ValidationError({
                     'lider': f'O líder deve ser um participante do projeto "{projeto.nome}".'
                 })
@@ -64,4 +84,7 @@ class EquipeResumoSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_total_membros(self, obj):
+        # Com os membros no prefetch não consulta de novo a cada equipe
+        if 'membros' in getattr(obj, '_prefetched_objects_cache', {}):
+            return len(obj.membros.all())
         return obj.membros.count()
@@ -1,3 +1,71 @@
+from django.core.exceptions import ValidationError
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from DevLab.orcamento_consultas import OrcamentoConsultasMixin, rota
+from equipe.models import Equipe
+from projetos.models import ParticipacaoProjeto, Projeto
+from usuarios.models import Usuario
+
+
+class OrcamentoConsultasEquipesTest(OrcamentoConsultasMixin, TestCase):
+    """Consultas por rota de equipes (DevLab/orcamento_consultas.py)"""
+
+    rotas = [
+        rota('get', '/api/equipes/', 2),
+        rota('get', '/api/equipes/?projeto={projeto}', 2),
+        rota('get', '/api/equipes/{equipe}/', 2),
+        rota('post', '/api/equipes/', 6, {'nome': 'Nova', 'projeto': '{projeto}'}),
+        rota('put', '/api/equipes/{equipe}/', 11, {'nome': 'Outro nome', 'descricao': 'Nova', 'projeto': '{projeto}'}),
+        rota('patch', '/api/equipes/{equipe}/', 10, {'descricao': 'Nova descrição'}),
+        rota('post', '/api/equipes/{equipe}/adicionar-membro/', 8, {'usuario_id': '{outro_estudante}'}),
+        rota('patch', '/api/equipes/{equipe}/definir-lider/', 11, {'lider_id': '{outro_estudante}'}),
+        rota('put', '/api/equipes/{equipe}/definir-lider/', 11, {'lider_id': '{outro_estudante}'}),
+        rota('delete', '/api/equipes/{equipe}/remover-membro/{outro_estudante}/', 7),
+        rota('delete', '/api/equipes/{equipe}/', 13),
+    ]
+
+
+class ValidacaoEquipeTest(TestCase):
+    """O save da equipe valida unicidade (nome no projeto, líder 1:1) fora do serializer também"""
+
+    def setUp(self):
+        self.coordenador = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='000', tipo_usuario='coordenador'
+        )
+        self.aluno = Usuario.objects.create_user(
+            'aluno', 'aluno@devlab.com', 'senha', nome='Aluno', cpf='111', tipo_usuario='estudante'
+        )
+        projeto = Projeto.objects.create(nome='P', descricao='D', data_inicio=timezone.localdate())
+        ParticipacaoProjeto.objects.create(projeto=projeto, usuario=self.aluno)
+        self.liderada = Equipe.objects.create(nome='A', projeto=projeto, lider=self.aluno)
+        self.equipe = Equipe.objects.create(nome='B', projeto=projeto)
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.coordenador)
+
+    def test_save_pelo_orm(self):
+        self.equipe.nome = 'A'
+        with self.assertRaises(ValidationError) as erro:
+            self.equipe.save()
+        self.assertIn('__all__', erro.exception.message_dict)
+
+        self.equipe.refresh_from_db()
+        self.equipe.lider = self.aluno
+        with self.assertRaises(ValidationError) as erro:
+            self.equipe.save()
+        self.assertIn('lider', erro.exception.message_dict)
+
+    def test_definir_lider_que_ja_lidera_outra_equipe(self):
+        resposta = self.cliente.patch(
+            f'/api/equipes/{self.equipe.id}/definir-lider/', {'lider_id': self.aluno.id}, format='json'
+        )
+        self.assertEqual(resposta.status_code, 400)
+        self.equipe.refresh_from_db()
+        self.assertIsNone(self.equipe.lider_id)
+
+    def test_serializer_continua_recusando_repetidos(self):
+        url = f'/api/equipes/{self.equipe.id}/'
+        self.assertEqual(self.cliente.patch(url, {'nome': 'A'}, format='json').status_code, 400)
+        self.assertEqual(self.cliente.patch(url, {'lider': self.aluno.id}, format='json').status_code, 400)
+        self.assertEqual(self.cliente.patch(url, {'nome': 'C'}, format='json').status_code, 200)
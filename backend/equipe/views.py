@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -5,11 +6,17 @@ from rest_framework.permissions import IsAuthenticated
 
 from equipe.models import Equipe
 from equipe.serializers import EquipeSerializer
+from projetos.models import ParticipacaoProjeto
 from usuarios.permissions import IsCoordenadorOrReadOnly, CanViewOwnProjectsOnly
 from usuarios.serializers import UsuarioResumoSerializer
+from atividades.buffer import registrar_atividade
+from atividades.models import Atividade
+from DevLab.concorrencia import ConcorrenciaOtimistaMixin
+from sincronizacao.delta import SincronizacaoMixin
+from sincronizacao.sinais import exclusoes_em_lote
 
 
-class EquipeViewSet(viewsets.ModelViewSet):
+class EquipeViewSet(SincronizacaoMixin, ConcorrenciaOtimistaMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar equipes do sistema DevLab.
     Permissões:
@@ -24,6 +31,9 @@ class EquipeViewSet(viewsets.ModelViewSet):
     search_fields = ['nome', 'descricao', 'projeto__nome']
     ordering_fields = ['nome', 'data_criacao', 'projeto__nome']
     ordering = ['projeto__nome', 'nome']
+    # Actions que limpam o cache dos membros (update do DRF, add/remove no M2M):
+    # o prefetch seria jogado fora e o serializer busca os membros depois da escrita
+    acoes_sem_prefetch = ('update', 'partial_update', 'adicionar_membro', 'remover_membro')
 
     def get_queryset(self):
         """
@@ -33,6 +43,8 @@ class EquipeViewSet(viewsets.ModelViewSet):
         """
         user = self.request.user
         queryset = super().get_queryset()
+        if self.action in self.acoes_sem_prefetch:
+            queryset = queryset.prefetch_related(None)
 
         # Filtrar por projeto (se especificado) - PARA TODOS OS USUÁRIOS
         projeto_id = self.request.query_params.get('projeto')
@@ -46,6 +58,22 @@ class EquipeViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def perform_destroy(self, instance):
+        # O CASCADE leva as tarefas da equipe: tombstones num INSERT só
+        with exclusoes_em_lote():
+            instance.delete()
+
+    def get_filtros_removidos(self):
+        # Mesmo escopo do get_queryset
+        projeto_id = self.request.query_params.get('projeto')
+        if projeto_id:
+            return {'projeto_id': projeto_id}
+        if self.request.user.tipo_usuario != 'coordenador':
+            return {'projeto_id__in': ParticipacaoProjeto.objects.filter(
+                usuario=self.request.user
+            ).values('projeto_id')}
+        return {}
+
     @action(detail=True, methods=['put', 'patch'], url_path='definir-lider')
     def definir_lider(self, request, pk=None):
         """
@@ -70,15 +98,25 @@ class EquipeViewSet(viewsets.ModelViewSet):
             novo_lider = Usuario.objects.get(id=lider_id)
 
             # Verifica se o novo líder participa do projeto
-            if not equipe.projeto.participantes.filter(id=novo_lider.id).exists():
+            if not equipe.projeto.tem_participante(novo_lider.id):
                 return Response(
                     {'erro': f'O usuário {novo_lider} não participa do projeto {equipe.projeto.nome}'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Define o novo líder
+            # Define o novo líder (o full_clean do save recusa quem já lidera outra equipe)
             equipe.lider = novo_lider
-            equipe.save()
+            try:
+                equipe.save()
+            except ValidationError as erro:
+                return Response(
+                    {'erro': ' '.join(erro.messages)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            registrar_atividade(
+                Atividade.TIPO_LIDER_EQUIPE, usuario=request.user,
+                projeto_id=equipe.projeto_id, objeto_id=equipe.id, lider=novo_lider.id
+            )
 
             serializer = self.get_serializer(equipe)
             return Response(serializer.data)
@@ -113,7 +151,7 @@ class EquipeViewSet(viewsets.ModelViewSet):
             usuario = Usuario.objects.get(id=usuario_id)
 
             # Verifica se o usuário participa do projeto
-            if not equipe.projeto.participantes.filter(id=usuario.id).exists():
+            if not equipe.projeto.tem_participante(usuario.id):
                 return Response(
                     {'erro': f'O usuário {usuario} não participa do projeto {equipe.projeto.nome}'},
                     status=status.HTTP_400_BAD_REQUEST
@@ -121,6 +159,10 @@ class EquipeViewSet(viewsets.ModelViewSet):
 
             # Adiciona à equipe
             equipe.membros.add(usuario)
+            registrar_atividade(
+                Atividade.TIPO_MEMBRO_ADICIONADO, usuario=request.user,
+                projeto_id=equipe.projeto_id, objeto_id=equipe.id, membro=usuario.id
+            )
             serializer = self.get_serializer(equipe)
             return Response(serializer.data)
 
@@ -142,6 +184,10 @@ class EquipeViewSet(viewsets.ModelViewSet):
             from usuarios.models import Usuario
             usuario = Usuario.objects.get(id=usuario_id)
             equipe.membros.remove(usuario)
+            registrar_atividade(
+                Atividade.TIPO_MEMBRO_REMOVIDO, usuario=request.user,
+                projeto_id=equipe.projeto_id, objeto_id=equipe.id, membro=usuario.id
+            )
             serializer = self.get_serializer(equipe)
             return Response(serializer.data)
 
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from fila.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tipo', 'status', 'progresso', 'tentativas', 'criado_por', 'criado_em', 'concluido_em']
+    list_filter = ['status', 'tipo']
+    raw_id_fields = ['criado_por']
+    ordering = ['-id']
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class FilaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'fila'
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+        from DevLab.instrumentacao import registrar_coletor
+        from fila.fila import estatisticas_fila
+
+        # Cada app registra os seus tipos de job num módulo jobs.py
+        autodiscover_modules('jobs')
+        registrar_coletor('fila', estatisticas_fila)
@@ -0,0 +1,223 @@
+"""
+Fila de jobs no banco.
+
+Relatórios, importações e arquivamento não cabem no tempo de uma requisição
+do gunicorn. A view chama enfileirar(), responde 202 com o id do job e o
+cliente consulta GET /api/jobs/{id}/ até o status virar concluido/falhou.
+
+O worker (python manage.py rodar_fila) reserva os jobs assim:
+
+- PostgreSQL: SELECT ... FOR UPDATE SKIP LOCKED, então vários workers pegam
+  jobs diferentes sem esperar um pelo outro;
+- SQLite (não tem FOR UPDATE): UPDATE ... WHERE id = ? AND status = 'pendente';
+  só um worker consegue trocar o status, os outros tentam o próximo id.
+
+Se a função levanta exceção, o job volta para pendente com espera exponencial
+(com jitter) até max_tentativas. Um job "executando" com a reserva vencida
+(travado_ate) é de um worker que morreu e volta para a fila.
+
+Para registrar um tipo de job, crie um jobs.py no app:
+
+    @registrar_job('meu_job')
+    def meu_job(job, **parametros):
+        job.atualizar_progresso(50, 'metade')
+        return {'ok': True}  # vira job.resultado (precisa ser serializável em JSON)
+
+Os parâmetros e o resultado ficam no banco por FILA_RETENCAO_DIAS: nada de
+senha neles. O que for sensível vai na chave 'segredos' do retorno; ela é
+separada em Job.segredos, entregue uma vez só ao criador do job (no GET
+/api/jobs/{id}/ depois de concluído) e apagada. Segredos não retirados somem
+depois de FILA_SEGREDOS_HORAS.
+
+Dados sensíveis de entrada (ex.: senhas de uma importação) vão em
+enfileirar(..., segredos=...): o job lê job.segredos, e eles são trocados pelos
+segredos do resultado quando o job termina (ou apagados, se ele falha de vez).
+"""
+import datetime
+import logging
+import random
+import traceback
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from fila.models import Job
+
+logger = logging.getLogger(__name__)
+
+_registro = {}
+
+
+def registrar_job(nome):
+    def decorador(funcao):
+        _registro[nome] = funcao
+        return funcao
+    return decorador
+
+
+def tipos_registrados():
+    return sorted(_registro)
+
+
+def prazo_reserva():
+    return timezone.now() + datetime.timedelta(seconds=settings.FILA_TEMPO_LIMITE)
+
+
+def enfileirar(tipo, usuario=None, max_tentativas=None, atraso=0, segredos=None, **parametros):
+    """
+    Cria um job pendente e devolve o Job. Os parâmetros são guardados em JSON;
+    `segredos` (opcional) fica em Job.segredos até o job terminar.
+    Com FILA_SINCRONA (desenvolvimento sem worker) o job roda logo após o commit.
+    """
+    if tipo not in _registro:
+        raise ValueError(f'Tipo de job não registrado: {tipo}')
+
+    job = Job.objects.create(
+        tipo=tipo,
+        parametros=parametros,
+        segredos=segredos,
+        criado_por=usuario if getattr(usuario, 'pk', None) else None,
+        max_tentativas=max_tentativas or settings.FILA_MAX_TENTATIVAS,
+        executar_apos=timezone.now() + datetime.timedelta(seconds=atraso),
+    )
+    if settings.FILA_SINCRONA:
+        transaction.on_commit(lambda: processar_proximo('sincrono', job_id=job.pk))
+    return job
+
+
+def _pendentes(agora):
+    return Job.objects.filter(
+        status=Job.STATUS_PENDENTE, executar_apos__lte=agora
+    ).order_by('executar_apos', 'id')
+
+
+def reservar_proximo(worker, tipos=None, job_id=None):
+    """Reserva o próximo job pendente para este worker. Devolve o Job ou None."""
+    agora = timezone.now()
+    pendentes = _pendentes(agora)
+    if tipos:
+        pendentes = pendentes.filter(tipo__in=tipos)
+    if job_id is not None:
+        pendentes = pendentes.filter(pk=job_id)
+
+    reserva = {
+        'status': Job.STATUS_EXECUTANDO,
+        'worker': worker[:100],
+        'iniciado_em': agora,
+        'travado_ate': prazo_reserva(),
+        'tentativas': F('tentativas') + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            candidato = pendentes.select_for_update(skip_locked=True).values_list('pk', flat=True).first()
+            if candidato is None:
+                return None
+            Job.objects.filter(pk=candidato).update(**reserva)
+    else:
+        # Compare-and-set pelo status; olha alguns candidatos pra não desistir
+        # só porque outro worker levou o primeiro
+        for candidato in pendentes.values_list('pk', flat=True)[:10]:
+            if Job.objects.filter(pk=candidato, status=Job.STATUS_PENDENTE).update(**reserva):
+                break
+        else:
+            return None
+
+    return Job.objects.get(pk=candidato)
+
+
+def _espera_retry(tentativa):
+    base = settings.FILA_RETRY_ESPERA_BASE
+    return base * (2 ** (tentativa - 1)) * random.uniform(0.5, 1.5)
+
+
+def _falhar(job, erro_texto):
+    agora = timezone.now()
+    if job.tentativas < job.max_tentativas:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.STATUS_PENDENTE,
+            executar_apos=agora + datetime.timedelta(seconds=_espera_retry(job.tentativas)),
+            travado_ate=None,
+            erro=erro_texto,
+        )
+    else:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.STATUS_FALHOU, concluido_em=agora, travado_ate=None, erro=erro_texto, segredos=None
+        )
+
+
+def executar(job):
+    funcao = _registro.get(job.tipo)
+    if funcao is None:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.STATUS_FALHOU, concluido_em=timezone.now(), travado_ate=None, segredos=None,
+            erro=f'Tipo de job não registrado: {job.tipo}',
+        )
+        return
+
+    try:
+        resultado = funcao(job, **job.parametros)
+    except Exception:
+        logger.exception('Job %s (%s) falhou na tentativa %s', job.pk, job.tipo, job.tentativas)
+        _falhar(job, traceback.format_exc()[-5000:])
+        return
+
+    segredos = resultado.pop('segredos', None) if isinstance(resultado, dict) else None
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.STATUS_CONCLUIDO,
+        progresso=100,
+        resultado=resultado,
+        segredos=segredos or None,
+        concluido_em=timezone.now(),
+        travado_ate=None,
+        erro='',
+    )
+
+
+def processar_proximo(worker, tipos=None, job_id=None):
+    """Reserva e executa um job. Devolve False se não havia job disponível."""
+    job = reservar_proximo(worker, tipos=tipos, job_id=job_id)
+    if job is None:
+        return False
+    executar(job)
+    return True
+
+
+def liberar_travados():
+    """Devolve para a fila (ou marca como falho) os jobs cuja reserva venceu"""
+    agora = timezone.now()
+    travados = list(Job.objects.filter(status=Job.STATUS_EXECUTANDO, travado_ate__lt=agora))
+    for job in travados:
+        _falhar(job, 'Reserva expirada: o worker parou ou o job passou de FILA_TEMPO_LIMITE.')
+    return len(travados)
+
+
+def entregar_segredos(job):
+    """
+    Devolve os segredos do job e apaga do banco. O UPDATE condicional garante
+    a entrega única mesmo com duas requisições ao mesmo tempo.
+    """
+    if job.segredos is None:
+        return None
+    apagados = Job.objects.filter(pk=job.pk, segredos__isnull=False).update(segredos=None)
+    segredos, job.segredos = job.segredos, None
+    return segredos if apagados else None
+
+
+def limpar_antigos():
+    """Apaga jobs terminados há mais de FILA_RETENCAO_DIAS e segredos não retirados"""
+    agora = timezone.now()
+    Job.objects.filter(
+        segredos__isnull=False, concluido_em__lt=agora - datetime.timedelta(hours=settings.FILA_SEGREDOS_HORAS)
+    ).update(segredos=None)
+    corte = agora - datetime.timedelta(days=settings.FILA_RETENCAO_DIAS)
+    return Job.objects.filter(
+        status__in=[Job.STATUS_CONCLUIDO, Job.STATUS_FALHOU], concluido_em__lt=corte
+    ).delete()[0]
+
+
+def estatisticas_fila():
+    por_status = dict(Job.objects.values_list('status').annotate(total=Count('id')).order_by())
+    return {status: por_status.get(status, 0) for status, _ in Job.STATUS_CHOICES}
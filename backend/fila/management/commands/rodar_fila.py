@@ -0,0 +1,77 @@
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from fila.fila import liberar_travados, limpar_antigos, processar_proximo, tipos_registrados
+
+
+class Command(BaseCommand):
+    help = "Worker da fila de jobs: reserva e executa os jobs pendentes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concorrencia', type=int, default=None,
+                            help='Quantos jobs rodam ao mesmo tempo (padrão: FILA_CONCORRENCIA)')
+        parser.add_argument('--intervalo', type=float, default=None,
+                            help='Segundos de espera quando a fila está vazia (padrão: FILA_INTERVALO)')
+        parser.add_argument('--tipos', nargs='*', metavar='TIPO',
+                            help='Só executa estes tipos de job')
+        parser.add_argument('--uma-vez', action='store_true',
+                            help='Processa o que estiver pendente e sai')
+
+    def handle(self, *args, **options):
+        concorrencia = options['concorrencia'] or settings.FILA_CONCORRENCIA
+        intervalo = options['intervalo'] if options['intervalo'] is not None else settings.FILA_INTERVALO
+        tipos = options['tipos'] or None
+        nome = f'{socket.gethostname()}:{os.getpid()}'
+        parar = threading.Event()
+
+        def encerrar(signum, frame):
+            # Termina os jobs em andamento e sai (o SIGTERM do deploy não corta um job no meio)
+            self.stdout.write('Encerrando o worker depois dos jobs em andamento...')
+            parar.set()
+
+        signal.signal(signal.SIGTERM, encerrar)
+        signal.signal(signal.SIGINT, encerrar)
+
+        liberados = liberar_travados()
+        removidos = limpar_antigos()
+        self.stdout.write(
+            f'Worker {nome}: {concorrencia} thread(s), tipos: {", ".join(tipos or tipos_registrados())} '
+            f'({liberados} job(s) travados devolvidos, {removidos} antigos removidos)'
+        )
+
+        def laco(indice):
+            worker = f'{nome}/{indice}'
+            try:
+                while not parar.is_set():
+                    close_old_connections()
+                    if processar_proximo(worker, tipos=tipos):
+                        continue
+                    if options['uma_vez']:
+                        break
+                    parar.wait(intervalo)
+            finally:
+                # Cada thread tem a própria conexão com o banco
+                connection.close()
+
+        threads = [
+            threading.Thread(target=laco, args=(indice,), name=f'fila-{indice}', daemon=True)
+            for indice in range(concorrencia)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # A thread principal cuida das reservas vencidas enquanto as outras trabalham
+        vigia = max(intervalo, 1) * 5
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=vigia / len(threads))
+            if not options['uma_vez'] and not parar.is_set():
+                liberar_travados()
+
+        self.stdout.write(self.style.SUCCESS('Worker encerrado.'))
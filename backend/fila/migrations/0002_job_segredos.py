@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fila', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='segredos',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Trabalho pesado executado fora da requisição pelo worker
+    (python manage.py rodar_fila). Ver fila/fila.py.
+    """
+
+    STATUS_PENDENTE = 'pendente'
+    STATUS_EXECUTANDO = 'executando'
+    STATUS_CONCLUIDO = 'concluido'
+    STATUS_FALHOU = 'falhou'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDENTE, 'Pendente'),
+        (STATUS_EXECUTANDO, 'Executando'),
+        (STATUS_CONCLUIDO, 'Concluído'),
+        (STATUS_FALHOU, 'Falhou'),
+    ]
+
+    # Nome registrado com @registrar_job
+    tipo = models.CharField(max_length=100)
+    parametros = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDENTE)
+    criado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs',
+    )
+
+    # Tentativas já iniciadas (conta na reserva, então um worker que morreu também conta)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    max_tentativas = models.PositiveSmallIntegerField(default=3)
+    # Só é reservado a partir desse momento (usado no backoff das novas tentativas)
+    executar_apos = models.DateTimeField(default=timezone.now)
+    # Prazo da reserva: passado isso com o job ainda "executando", o worker morreu
+    travado_ate = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+
+    progresso = models.PositiveSmallIntegerField(default=0, help_text="Percentual concluído (0 a 100)")
+    mensagem = models.CharField(max_length=255, blank=True)
+    resultado = models.JSONField(null=True, blank=True)
+    # Parte sensível do resultado (ex.: senhas temporárias): entregue uma vez ao
+    # criador do job e apagada em seguida (ver entregar_segredos)
+    segredos = models.JSONField(null=True, blank=True, editable=False)
+    erro = models.TextField(blank=True)
+
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    concluido_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Job"
+        verbose_name_plural = "Jobs"
+        ordering = ['-id']
+        indexes = [
+            # Reserva: "próximo pendente com executar_apos vencido"
+            models.Index(fields=['status', 'executar_apos'], name='job_fila_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.pk} ({self.get_status_display()})"
+
+    def atualizar_progresso(self, percentual, mensagem=''):
+        """
+        Chamado pela função do job durante a execução. Também renova a reserva,
+        então um job longo que reporta progresso não é tomado como travado.
+        """
+        from fila.fila import prazo_reserva
+
+        self.progresso = max(0, min(100, int(percentual)))
+        self.mensagem = mensagem[:255]
+        Job.objects.filter(pk=self.pk).update(
+            progresso=self.progresso, mensagem=self.mensagem, travado_ate=prazo_reserva()
+        )
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from fila.models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'tipo', 'status', 'progresso', 'mensagem', 'resultado', 'erro',
+            'tentativas', 'max_tentativas', 'criado_em', 'iniciado_em', 'concluido_em',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,141 @@
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from fila.fila import (
+    enfileirar, executar, limpar_antigos, liberar_travados, processar_proximo, registrar_job, reservar_proximo,
+)
+from fila.models import Job
+from usuarios.models import Usuario
+
+@registrar_job('teste_ok')
+def job_ok(job, valor=None):
+    return {'valor': valor, 'segredos': {'senha': 's3cr3t'}}
+
+
+@registrar_job('teste_falha')
+def job_falha(job):
+    raise RuntimeError('quebrou')
+
+
+@override_settings(FILA_SINCRONA=False)
+class FilaTest(TestCase):
+
+    def setUp(self):
+        self.coordenador = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='000.000.000-00', tipo_usuario='coordenador'
+        )
+
+    def test_reserva_pega_cada_job_uma_vez(self):
+        primeiro = enfileirar('teste_ok', valor=1)
+        segundo = enfileirar('teste_ok', valor=2)
+        futuro = enfileirar('teste_ok', atraso=3600, valor=3)
+
+        reservados = [reservar_proximo('w1'), reservar_proximo('w2'), reservar_proximo('w3')]
+        self.assertEqual([job.pk if job else None for job in reservados], [primeiro.pk, segundo.pk, None])
+        self.assertEqual(reservados[0].status, Job.STATUS_EXECUTANDO)
+        self.assertEqual(reservados[0].tentativas, 1)
+        self.assertEqual(reservados[0].worker, 'w1')
+        futuro.refresh_from_db()
+        self.assertEqual(futuro.status, Job.STATUS_PENDENTE)
+
+    def test_falha_volta_para_fila_ate_max_tentativas(self):
+        job = enfileirar('teste_falha', max_tentativas=2, segredos={'senha': 'x'})
+
+        with self.assertLogs('fila.fila', 'ERROR'):
+            self.assertTrue(processar_proximo('w'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_PENDENTE)
+        self.assertGreater(job.executar_apos, timezone.now())
+        self.assertIn('quebrou', job.erro)
+        # Ainda na espera do retry: ninguém pega
+        self.assertFalse(processar_proximo('w'))
+
+        Job.objects.filter(pk=job.pk).update(executar_apos=timezone.now())
+        with self.assertLogs('fila.fila', 'ERROR'):
+            self.assertTrue(processar_proximo('w'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FALHOU)
+        self.assertEqual(job.tentativas, 2)
+        # Os segredos de entrada ficam para as novas tentativas e somem com a falha final
+        self.assertIsNone(job.segredos)
+        self.assertIsNotNone(job.concluido_em)
+
+    def test_reserva_vencida_volta_para_fila(self):
+        job = enfileirar('teste_ok')
+        reservar_proximo('w')
+        Job.objects.filter(pk=job.pk).update(travado_ate=timezone.now() - datetime.timedelta(seconds=1))
+
+        self.assertEqual(liberar_travados(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_PENDENTE)
+        self.assertIn('Reserva expirada', job.erro)
+
+    def test_retencao(self):
+        antigo = timezone.now() - datetime.timedelta(days=30)
+        velho = Job.objects.create(tipo='teste_ok', status=Job.STATUS_CONCLUIDO, concluido_em=antigo)
+        velho_falho = Job.objects.create(tipo='teste_ok', status=Job.STATUS_FALHOU, concluido_em=antigo)
+        recente = Job.objects.create(
+            tipo='teste_ok', status=Job.STATUS_CONCLUIDO, concluido_em=timezone.now() - datetime.timedelta(hours=30),
+            segredos={'senha': 'x'},
+        )
+        pendente = Job.objects.create(tipo='teste_ok')
+
+        self.assertEqual(limpar_antigos(), 2)
+        self.assertFalse(Job.objects.filter(pk__in=[velho.pk, velho_falho.pk]).exists())
+        recente.refresh_from_db()
+        # O job fica, os segredos não retirados em FILA_SEGREDOS_HORAS não
+        self.assertIsNone(recente.segredos)
+        self.assertTrue(Job.objects.filter(pk=pendente.pk).exists())
+
+    def test_segredos_entregues_uma_vez_ao_criador(self):
+        job = enfileirar('teste_ok', usuario=self.coordenador, valor=7)
+        executar(reservar_proximo('w'))
+        job.refresh_from_db()
+        self.assertEqual(job.resultado, {'valor': 7})
+        self.assertEqual(job.segredos, {'senha': 's3cr3t'})
+
+        outro = Usuario.objects.create_user(
+            'staff', 'staff@devlab.com', 'senha', nome='Staff', cpf='999.999.999-99', is_staff=True
+        )
+        cliente = APIClient()
+        cliente.force_authenticate(outro)
+        self.assertNotIn('senha', cliente.get(f'/api/jobs/{job.pk}/').data['resultado'])
+
+        cliente.force_authenticate(self.coordenador)
+        self.assertEqual(cliente.get(f'/api/jobs/{job.pk}/').data['resultado'], {'valor': 7, 'senha': 's3cr3t'})
+        self.assertEqual(cliente.get(f'/api/jobs/{job.pk}/').data['resultado'], {'valor': 7})
+        job.refresh_from_db()
+        self.assertIsNone(job.segredos)
+
+    def test_importacao_assincrona_nao_grava_senha(self):
+        cliente = APIClient()
+        cliente.force_authenticate(self.coordenador)
+        linhas = [
+            {'username': 'a1', 'nome': 'A 1', 'email': 'a1@devlab.com', 'cpf': '1', 'tipo_usuario': 'estudante',
+             'password': 'SenhaEmTextoPuro1'},
+            {'username': 'a2', 'nome': 'A 2', 'email': 'a2@devlab.com', 'cpf': '2', 'tipo_usuario': 'estudante'},
+        ]
+        resposta = cliente.post('/api/usuarios/importar/?assincrono=1', {'usuarios': linhas}, format='json')
+        self.assertEqual(resposta.status_code, 202)
+
+        job = Job.objects.get(pk=resposta.data['job_id'])
+        self.assertNotIn('SenhaEmTextoPuro1', str(job.parametros))
+        # A senha espera o worker nos segredos de entrada, que não são entregues antes do fim
+        self.assertEqual(job.segredos, {'senhas': {'a1': 'SenhaEmTextoPuro1'}})
+        self.assertIsNone(cliente.get(f'/api/jobs/{job.pk}/').data['resultado'])
+        executar(reservar_proximo('w'))
+        job.refresh_from_db()
+        self.assertNotIn('senhas_temporarias', job.resultado)
+        self.assertNotIn('SenhaEmTextoPuro1', str(job.segredos))
+        # Nada de dados pessoais no resultado guardado
+        self.assertEqual(
+            [sorted(usuario) for usuario in job.resultado['usuarios']], [['id', 'username'], ['id', 'username']]
+        )
+        self.assertTrue(Usuario.objects.get(username='a1').check_password('SenhaEmTextoPuro1'))
+
+        senhas = cliente.get(f'/api/jobs/{job.pk}/').data['resultado']['senhas_temporarias']
+        self.assertEqual(list(senhas), ['a2'])
+        self.assertTrue(Usuario.objects.get(username='a2').check_password(senhas['a2']))
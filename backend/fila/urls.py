@@ -0,0 +1,7 @@
+from rest_framework.routers import DefaultRouter
+from fila.views import JobViewSet
+
+router = DefaultRouter()
+router.register(r'jobs', JobViewSet, basename='job')
+
+urlpatterns = router.urls
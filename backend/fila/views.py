@@ -0,0 +1,50 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from fila.fila import entregar_segredos
+from fila.models import Job
+from fila.serializers import JobSerializer
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Acompanhamento dos jobs da fila (o SPA consulta até terminar).
+    - GET /api/jobs/       jobs do usuário logado
+    - GET /api/jobs/{id}/  status, progresso e resultado
+    Cada usuário vê só os próprios jobs; staff vê todos. Os segredos do job
+    (ex.: senhas temporárias da importação) saem uma vez só, para o criador.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        jobs = Job.objects.all()
+        if not self.request.user.is_staff:
+            jobs = jobs.filter(criado_por=self.request.user)
+        status_param = self.request.query_params.get('status')
+        if status_param:
+            jobs = jobs.filter(status=status_param)
+        return jobs
+
+    def retrieve(self, request, *args, **kwargs):
+        job = self.get_object()
+        dados = self.get_serializer(job).data
+        # Antes de terminar, os segredos são os de entrada do job: não saem daqui
+        if job.criado_por_id == request.user.id and job.status == Job.STATUS_CONCLUIDO:
+            segredos = entregar_segredos(job)
+            if segredos:
+                dados['resultado'] = {**(dados['resultado'] or {}), **segredos}
+        return Response(dados)
+
+
+def resposta_job(request, job):
+    """Corpo da resposta 202 das views que enfileiram um job"""
+    from django.urls import reverse
+
+    return {
+        'detail': 'Processamento iniciado em segundo plano.',
+        'job_id': job.pk,
+        'status': job.status,
+        'url': request.build_absolute_uri(reverse('job-detail', args=[job.pk])),
+    }
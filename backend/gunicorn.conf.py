@@ -0,0 +1,78 @@
+"""
+Configuração do gunicorn (lida automaticamente quando ele roda nesta pasta).
+
+- Workers e threads saem da quantidade de CPUs e da memória disponível
+  (limite do container quando existir). Os valores podem ser fixados com
+  WEB_CONCURRENCY e GUNICORN_THREADS.
+- preload_app: o Django é carregado e aquecido (DevLab.aquecimento) uma vez no
+  processo mestre; os workers já nascem prontos.
+- max_requests com jitter: cada worker é reciclado depois de algumas
+  requisições, o que limita o crescimento de memória, e o jitter evita que
+  todos reiniciem ao mesmo tempo.
+"""
+import multiprocessing
+import os
+
+# Memória que um worker do Django + DRF ocupa depois de aquecido (MB)
+MEMORIA_POR_WORKER = int(os.environ.get('GUNICORN_MEMORIA_POR_WORKER', '150'))
+
+
+def _memoria_disponivel_mb():
+    """Limite de memória do container (cgroup v2/v1) ou a memória total da máquina"""
+    for caminho in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(caminho) as arquivo:
+                valor = arquivo.read().strip()
+        except OSError:
+            continue
+        # "max" (v2) ou um número absurdo (v1) significam sem limite
+        if valor.isdigit() and int(valor) < 1 << 50:
+            return int(valor) // (1024 * 1024)
+    try:
+        with open('/proc/meminfo') as arquivo:
+            for linha in arquivo:
+                if linha.startswith('MemTotal:'):
+                    return int(linha.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def _workers():
+    if os.environ.get('WEB_CONCURRENCY'):
+        return int(os.environ['WEB_CONCURRENCY'])
+    por_cpu = multiprocessing.cpu_count() * 2 + 1
+    memoria = _memoria_disponivel_mb()
+    if memoria is None:
+        return por_cpu
+    # Deixa uma parte da memória para o processo mestre e o sistema
+    return max(1, min(por_cpu, int(memoria * 0.8) // MEMORIA_POR_WORKER))
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = _workers()
+# Threads cobrem a espera por banco/rede sem o custo de memória de outro processo
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    # Com preload_app o Django já está carregado aqui, antes de qualquer fork
+    if not preload_app:
+        return
+    from DevLab.aquecimento import aquecer
+
+    duracao = aquecer()
+    server.log.info('Aplicação aquecida em %.0f ms (%s workers x %s threads)', duracao * 1000, workers, threads)
+
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from idempotencia.models import RequisicaoIdempotente
+
+
+@admin.register(RequisicaoIdempotente)
+class RequisicaoIdempotenteAdmin(admin.ModelAdmin):
+    list_display = ['id', 'metodo', 'rota', 'usuario_id', 'status', 'status_http', 'criado_em', 'expira_em']
+    list_filter = ['status', 'metodo']
+    exclude = ['corpo_resposta']
+    ordering = ['-id']
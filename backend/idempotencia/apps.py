@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class IdempotenciaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'idempotencia'
+
+    def ready(self):
+        from DevLab.instrumentacao import registrar_coletor
+        from idempotencia.middleware import estatisticas_idempotencia
+
+        registrar_coletor('idempotencia', estatisticas_idempotencia)
@@ -0,0 +1,228 @@
+"""
+Suporte ao header Idempotency-Key nas escritas (POST/PUT/PATCH).
+
+O frontend repete requisições quando a rede falha, e sem isso a repetição
+cria a tarefa de novo ou volta com um 400 ("já é participante"). Com a chave:
+
+- a primeira requisição grava um registro "em andamento" (hash_chave é único,
+  então só uma requisição consegue gravar) e roda a view normalmente;
+- a resposta é guardada no registro, com validade de IDEMPOTENCIA_TTL segundos;
+- uma repetição com a mesma chave devolve a resposta guardada sem chamar a
+  view, com o header Idempotent-Replayed;
+- uma repetição que chega enquanto a primeira ainda roda espera por ela (até
+  IDEMPOTENCIA_ESPERA segundos) em vez de executar em paralelo.
+
+A chave vale por usuário e por rota. O usuário sai do token JWT (sem consulta
+ao banco), já que a autenticação do DRF só roda dentro da view.
+Respostas 5xx, 401/403/429 e respostas grandes não são guardadas: o registro
+é apagado e o cliente pode tentar de novo com a mesma chave.
+
+As rotas de IDEMPOTENCIA_ROTAS_EXCLUIDAS respondem com credenciais (tokens,
+senhas temporárias) e ficam de fora: o corpo iria para o banco e para o admin.
+Nelas a repetição já é barrada pela própria view (a importação recusa
+usuários já cadastrados; o login só emite outro token).
+"""
+import datetime
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from idempotencia.models import RequisicaoIdempotente
+
+METODOS_IDEMPOTENTES = ('POST', 'PUT', 'PATCH')
+# Respostas que dependem do momento (auth, throttle, conflito) e não devem ser repetidas
+STATUS_NAO_GUARDADOS = {401, 403, 408, 409, 425, 429}
+TAMANHO_MAXIMO_CHAVE = 255
+# Registros "em andamento" mais velhos que isso são de um worker que morreu no meio
+TEMPO_MAXIMO_PROCESSAMENTO = 120
+
+_contadores = defaultdict(int)
+_lock = threading.Lock()
+
+
+def _contar(nome):
+    with _lock:
+        _contadores[nome] += 1
+
+
+def estatisticas_idempotencia():
+    return dict(_contadores)
+
+
+def usuario_da_requisicao(request):
+    """Id do usuário do token JWT (ou da sessão), ou None para anônimo/token inválido"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+    from rest_framework_simplejwt.settings import api_settings
+
+    autenticacao = JWTAuthentication()
+    header = autenticacao.get_header(request)
+    if header is None:
+        return None
+    token = autenticacao.get_raw_token(header)
+    if token is None:
+        return None
+    try:
+        return autenticacao.get_validated_token(token).get(api_settings.USER_ID_CLAIM)
+    except (InvalidToken, TokenError):
+        return None
+
+
+def _hash(*partes):
+    return hashlib.sha256('\x1f'.join(str(parte) for parte in partes).encode()).hexdigest()
+
+
+def _hash_corpo(request):
+    try:
+        return hashlib.sha256(request.body).hexdigest()
+    except RequestDataTooBig:
+        return ''
+
+
+def _limpar(ultimo_id):
+    """Apaga os registros vencidos e mantém a tabela dentro de IDEMPOTENCIA_MAX_REGISTROS"""
+    RequisicaoIdempotente.objects.filter(expira_em__lt=timezone.now()).delete()
+    RequisicaoIdempotente.objects.filter(id__lte=ultimo_id - settings.IDEMPOTENCIA_MAX_REGISTROS).delete()
+
+
+def _resposta_guardada(registro):
+    response = HttpResponse(
+        bytes(registro.corpo_resposta or b''),
+        status=registro.status_http,
+        content_type=registro.content_type or None,
+    )
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _erro(mensagem, status_http, **headers):
+    response = JsonResponse({'detail': mensagem}, status=status_http)
+    for nome, valor in headers.items():
+        response[nome] = valor
+    return response
+
+
+class IdempotenciaMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._criados = 0
+
+    def __call__(self, request):
+        chave = request.headers.get('Idempotency-Key')
+        if (
+            not chave
+            or request.method not in METODOS_IDEMPOTENTES
+            or request.path in settings.IDEMPOTENCIA_ROTAS_EXCLUIDAS
+        ):
+            return self.get_response(request)
+        if len(chave) > TAMANHO_MAXIMO_CHAVE:
+            return _erro('Idempotency-Key muito longa.', 400)
+
+        usuario_id = usuario_da_requisicao(request)
+        hash_chave = _hash(usuario_id or 'anonimo', request.method, request.path, chave)
+        hash_corpo = _hash_corpo(request)
+
+        registro = self._reservar(request, usuario_id, hash_chave, hash_corpo)
+        if isinstance(registro, HttpResponse):
+            return registro
+
+        try:
+            response = self.get_response(request)
+        except Exception:
+            registro.delete()
+            raise
+
+        self._guardar(registro, response)
+        return response
+
+    def _reservar(self, request, usuario_id, hash_chave, hash_corpo):
+        """
+        Cria o registro "em andamento" desta chave. Se a chave já existe,
+        devolve a resposta a ser enviada (replay, espera ou erro).
+        """
+        limite_espera = time.monotonic() + settings.IDEMPOTENCIA_ESPERA
+        intervalo = 0.05
+        while True:
+            agora = timezone.now()
+            try:
+                with transaction.atomic():
+                    registro = RequisicaoIdempotente.objects.create(
+                        hash_chave=hash_chave,
+                        usuario_id=usuario_id,
+                        metodo=request.method,
+                        rota=request.path[:255],
+                        hash_corpo=hash_corpo,
+                        criado_em=agora,
+                        expira_em=agora + datetime.timedelta(seconds=settings.IDEMPOTENCIA_TTL),
+                    )
+            except IntegrityError:
+                registro = None
+            else:
+                self._criados += 1
+                if self._criados % 100 == 0:
+                    _limpar(registro.pk)
+                return registro
+
+            existente = RequisicaoIdempotente.objects.filter(hash_chave=hash_chave).first()
+            if existente is None:
+                # Foi apagado entre o INSERT e a leitura (falha da original): tenta reservar de novo
+                continue
+
+            travado = (
+                existente.status == RequisicaoIdempotente.STATUS_EM_ANDAMENTO
+                and (agora - existente.criado_em).total_seconds() > TEMPO_MAXIMO_PROCESSAMENTO
+            )
+            if existente.expira_em < agora or travado:
+                RequisicaoIdempotente.objects.filter(pk=existente.pk).delete()
+                continue
+
+            if existente.hash_corpo != hash_corpo:
+                _contar('corpo_diferente')
+                return _erro('Idempotency-Key já usada com outro corpo de requisição.', 422)
+
+            if existente.status == RequisicaoIdempotente.STATUS_CONCLUIDA:
+                _contar('repeticoes')
+                return _resposta_guardada(existente)
+
+            # A primeira requisição ainda está rodando: espera ela terminar
+            if time.monotonic() >= limite_espera:
+                _contar('esperas_esgotadas')
+                return _erro(
+                    'Uma requisição com esta Idempotency-Key ainda está em processamento.',
+                    409,
+                    **{'Retry-After': '1'},
+                )
+            _contar('esperas')
+            time.sleep(intervalo)
+            intervalo = min(intervalo * 2, 0.5)
+
+    def _guardar(self, registro, response):
+        conteudo = None if response.streaming else response.content
+        if (
+            response.status_code >= 500
+            or response.status_code in STATUS_NAO_GUARDADOS
+            or conteudo is None
+            or len(conteudo) > settings.IDEMPOTENCIA_MAX_BYTES
+        ):
+            registro.delete()
+            return
+
+        RequisicaoIdempotente.objects.filter(pk=registro.pk).update(
+            status=RequisicaoIdempotente.STATUS_CONCLUIDA,
+            status_http=response.status_code,
+            content_type=response.get('Content-Type', '')[:100],
+            corpo_resposta=conteudo,
+        )
+        _contar('guardadas')
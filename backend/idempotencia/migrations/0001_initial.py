@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequisicaoIdempotente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash_chave', models.CharField(max_length=64, unique=True)),
+                ('usuario_id', models.BigIntegerField(blank=True, null=True)),
+                ('metodo', models.CharField(max_length=10)),
+                ('rota', models.CharField(max_length=255)),
+                ('hash_corpo', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('em_andamento', 'Em andamento'), ('concluida', 'Concluída')], default='em_andamento', max_length=20)),
+                ('status_http', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('corpo_resposta', models.BinaryField(blank=True, null=True)),
+                ('criado_em', models.DateTimeField()),
+                ('expira_em', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Requisição idempotente',
+                'verbose_name_plural': 'Requisições idempotentes',
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+ROTAS = ('/api/token/', '/api/token/refresh/', '/api/usuarios/importar/')
+
+
+def apagar_respostas(apps, schema_editor):
+    # Respostas com tokens e senhas temporárias guardadas antes da exclusão dessas rotas
+    RequisicaoIdempotente = apps.get_model('idempotencia', 'RequisicaoIdempotente')
+    RequisicaoIdempotente.objects.filter(rota__in=ROTAS).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idempotencia', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(apagar_respostas, migrations.RunPython.noop),
+    ]
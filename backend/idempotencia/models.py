@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class RequisicaoIdempotente(models.Model):
+    """
+    Resposta guardada de uma escrita feita com o header Idempotency-Key.
+    A chave do cliente é guardada como hash junto com o dono (usuário ou
+    anônimo), o método e a rota, então a mesma chave em outra rota ou de outro
+    usuário não colide.
+    """
+
+    STATUS_EM_ANDAMENTO = 'em_andamento'
+    STATUS_CONCLUIDA = 'concluida'
+
+    STATUS_CHOICES = [
+        (STATUS_EM_ANDAMENTO, 'Em andamento'),
+        (STATUS_CONCLUIDA, 'Concluída'),
+    ]
+
+    hash_chave = models.CharField(max_length=64, unique=True)
+    usuario_id = models.BigIntegerField(null=True, blank=True)
+    metodo = models.CharField(max_length=10)
+    rota = models.CharField(max_length=255)
+    # Hash do corpo da primeira requisição: a mesma chave com outro corpo é erro do cliente
+    hash_corpo = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_EM_ANDAMENTO)
+    status_http = models.PositiveSmallIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    corpo_resposta = models.BinaryField(null=True, blank=True)
+    criado_em = models.DateTimeField()
+    expira_em = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = "Requisição idempotente"
+        verbose_name_plural = "Requisições idempotentes"
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.metodo} {self.rota} ({self.get_status_display()})"
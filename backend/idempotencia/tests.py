@@ -0,0 +1,80 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from idempotencia.models import RequisicaoIdempotente
+from tarefas.models import Tarefas
+from usuarios.models import Usuario
+
+
+class IdempotenciaTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.coordenador = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='000.000.000-00', tipo_usuario='coordenador'
+        )
+
+    def setUp(self):
+        # Token de verdade: o middleware lê o usuário do JWT, antes da autenticação do DRF
+        self.cliente = APIClient()
+        self.cliente.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.coordenador).access_token}')
+
+    def criar_tarefa(self, chave, titulo='Tarefa'):
+        return self.cliente.post('/api/tarefas/', {'titulo': titulo}, format='json', HTTP_IDEMPOTENCY_KEY=chave)
+
+    def test_repeticao_devolve_resposta_guardada(self):
+        primeira = self.criar_tarefa('chave-1')
+        self.assertEqual(primeira.status_code, 201)
+        repetida = self.criar_tarefa('chave-1')
+
+        self.assertEqual(repetida.status_code, 201)
+        self.assertEqual(repetida['Idempotent-Replayed'], 'true')
+        self.assertEqual(repetida.content, primeira.content)
+        self.assertEqual(Tarefas.objects.count(), 1)
+
+        # Outra chave é outra operação
+        self.assertEqual(self.criar_tarefa('chave-2').status_code, 201)
+        self.assertEqual(Tarefas.objects.count(), 2)
+
+    def test_mesma_chave_com_outro_corpo(self):
+        self.criar_tarefa('chave-1')
+        resposta = self.criar_tarefa('chave-1', titulo='Outra')
+        self.assertEqual(resposta.status_code, 422)
+        self.assertEqual(Tarefas.objects.count(), 1)
+
+    @override_settings(IDEMPOTENCIA_ESPERA=0)
+    def test_original_ainda_em_andamento(self):
+        self.criar_tarefa('chave-1')
+        # Simula a primeira requisição ainda rodando
+        RequisicaoIdempotente.objects.update(
+            status=RequisicaoIdempotente.STATUS_EM_ANDAMENTO, corpo_resposta=None, criado_em=timezone.now()
+        )
+        resposta = self.criar_tarefa('chave-1')
+        self.assertEqual(resposta.status_code, 409)
+        self.assertEqual(resposta['Retry-After'], '1')
+        self.assertEqual(Tarefas.objects.count(), 1)
+
+    def test_rotas_com_credenciais_nao_sao_guardadas(self):
+        linhas = [{'username': 'a1', 'nome': 'A 1', 'email': 'a1@devlab.com', 'cpf': '1', 'tipo_usuario': 'estudante'}]
+        resposta = self.cliente.post(
+            '/api/usuarios/importar/', {'usuarios': linhas}, format='json', HTTP_IDEMPOTENCY_KEY='chave-1'
+        )
+        self.assertEqual(resposta.status_code, 201)
+        self.assertIn('senhas_temporarias', resposta.data)
+
+        login = APIClient().post(
+            '/api/token/', {'username': 'coord', 'password': 'senha'}, format='json', HTTP_IDEMPOTENCY_KEY='chave-2'
+        )
+        self.assertEqual(login.status_code, 200)
+        self.assertFalse(RequisicaoIdempotente.objects.exists())
+
+    def test_registro_anonimo(self):
+        dados = {'username': 'novo', 'email': 'novo@devlab.com', 'password': 'senha-forte-1', 'nome': 'Novo'}
+        primeira = APIClient().post('/api/usuarios/registro/', dados, format='json', HTTP_IDEMPOTENCY_KEY='chave-1')
+        repetida = APIClient().post('/api/usuarios/registro/', dados, format='json', HTTP_IDEMPOTENCY_KEY='chave-1')
+        self.assertEqual(primeira.status_code, 201)
+        self.assertEqual(repetida.status_code, 201)
+        self.assertEqual(repetida['Idempotent-Replayed'], 'true')
+        self.assertEqual(Usuario.objects.filter(username='novo').count(), 1)
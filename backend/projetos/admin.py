@@ -1,10 +1,31 @@
 from django.contrib import admin
-from projetos.models import Projeto
+
+from DevLab.admin_rapido import AdminRapidoMixin
+from projetos.models import Projeto, ProjetoArquivado, RelatorioDiario
 
 # Register your models here.
 @admin.register(Projeto)
-class ProjetoAdmin(admin.ModelAdmin):
-    list_display = ['id', 'nome', 'status', 'data_inicio', 'data_fim_prevista']
-    search_fields = ['nome', 'descricao']
+class ProjetoAdmin(AdminRapidoMixin, admin.ModelAdmin):
+    list_display = ['id', 'nome', 'status', 'data_inicio', 'data_fim_prevista', 'created_by', 'professor']
+    list_select_related = ['created_by', 'professor']
+    list_filter = ['status', 'is_public']
+    # Busca por prefixo do nome, sem comparar a descrição (até 2000 caracteres) de cada linha.
+    # Ainda percorre a tabela (nome não tem índice), o que é barato com o número de projetos daqui.
+    search_fields = ['^nome']
     readonly_fields = ['id']
+    raw_id_fields = ['created_by', 'professor']
     ordering = ['data_inicio']
+
+
+@admin.register(ProjetoArquivado)
+class ProjetoArquivadoAdmin(AdminRapidoMixin, admin.ModelAdmin):
+    list_display = ['id_original', 'nome', 'status', 'data_fim_prevista', 'arquivado_em']
+    list_filter = ['status']
+    search_fields = ['^nome']
+    readonly_fields = ['arquivado_em']
+
+
+@admin.register(RelatorioDiario)
+class RelatorioDiarioAdmin(admin.ModelAdmin):
+    list_display = ['data', 'projetos_total', 'tarefas_total', 'estudantes_ativos', 'participacoes_ativas', 'gerado_em']
+    ordering = ['-data']
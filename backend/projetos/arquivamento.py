@@ -0,0 +1,382 @@
+"""
+Arquivamento de projetos antigos.
+
+Projetos concluídos ou cancelados cuja data de fim (ou de início, se não tiver
+fim) é anterior ao corte são copiados para as tabelas de arquivo junto com
+participações, equipes e tarefas, e depois apagados das tabelas principais.
+O histórico de status, as métricas de fluxo e o burndown vão junto (em JSON
+na tarefa e no projeto arquivados) e são recriados na restauração.
+Cada lote roda numa transação própria, então uma falha no meio não deixa
+projeto pela metade.
+
+Projetos cujas equipes têm tarefas de outro projeto ficam de fora: o CASCADE da
+equipe apagaria tarefas de um projeto que continua ativo. Eles entram num
+arquivamento posterior, quando essas tarefas saírem da equipe.
+"""
+import datetime
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_date, parse_datetime
+
+from projetos.models import (
+    Projeto,
+    ParticipacaoProjeto,
+    ProjetoArquivado,
+    ParticipacaoArquivada,
+    EquipeArquivada,
+    TarefaArquivada,
+)
+from sincronizacao.models import Exclusao
+from sincronizacao.sinais import exclusoes_em_lote
+
+STATUS_ARQUIVAVEIS = [Projeto.STATUS_CONCLUIDO, Projeto.STATUS_CANCELADO]
+TAMANHO_LOTE_PADRAO = 50
+
+
+def _sem_tarefas_de_outros_projetos():
+    """Filtro: nenhuma equipe do projeto tem tarefa ligada a outro projeto"""
+    from tarefas.models import Tarefas
+
+    return ~Exists(
+        Tarefas.objects.filter(equipe__projeto=OuterRef('pk'), projeto__isnull=False).exclude(projeto=OuterRef('pk'))
+    )
+
+
+def projetos_arquivaveis(corte):
+    """Projetos concluídos/cancelados que terminaram antes da data de corte"""
+    return Projeto.objects.annotate(
+        data_referencia=Coalesce('data_fim_prevista', 'data_inicio')
+    ).filter(
+        _sem_tarefas_de_outros_projetos(),
+        status__in=STATUS_ARQUIVAVEIS,
+        data_referencia__lt=corte,
+    ).order_by('pk')
+
+
+def _data(valor):
+    return valor.isoformat() if valor is not None else None
+
+
+def _momento(valor):
+    return parse_datetime(valor) if valor is not None else None
+
+
+def _arquivar_lote(ids):
+    from equipe.models import Equipe
+    from tarefas.models import BurndownDiario, HistoricoStatusTarefa, MetricaTarefa, Tarefas
+
+    with transaction.atomic():
+        # Trava os projetos do lote (no SQLite isso é ignorado, mas a transação já serializa a escrita)
+        projetos = list(
+            Projeto.objects.select_for_update().filter(
+                _sem_tarefas_de_outros_projetos(), pk__in=ids, status__in=STATUS_ARQUIVAVEIS
+            ).order_by('pk')
+        )
+        if not projetos:
+            return 0
+
+        burndown_por_projeto = {}
+        for dia in BurndownDiario.objects.filter(projeto_id__in=[p.pk for p in projetos]).order_by('data'):
+            burndown_por_projeto.setdefault(dia.projeto_id, []).append({
+                'data': _data(dia.data),
+                'criadas': dia.criadas,
+                'concluidas': dia.concluidas,
+                'reabertas': dia.reabertas,
+                'removidas': dia.removidas,
+                'removidas_concluidas': dia.removidas_concluidas,
+            })
+
+        arquivados = ProjetoArquivado.objects.bulk_create([
+            ProjetoArquivado(
+                id_original=p.pk,
+                nome=p.nome,
+                descricao=p.descricao,
+                data_inicio=p.data_inicio,
+                data_fim_prevista=p.data_fim_prevista,
+                status=p.status,
+                is_public=p.is_public,
+                professor_id=p.professor_id,
+                created_by_id=p.created_by_id,
+                burndown=burndown_por_projeto.get(p.pk, []),
+            )
+            for p in projetos
+        ])
+        por_projeto = {a.id_original: a for a in arquivados}
+        ids_projetos = list(por_projeto)
+
+        ParticipacaoArquivada.objects.bulk_create([
+            ParticipacaoArquivada(
+                projeto=por_projeto[part.projeto_id],
+                id_original=part.pk,
+                usuario_id=part.usuario_id,
+                data_entrada=part.data_entrada,
+                data_saida=part.data_saida,
+                ativo=part.ativo,
+                is_leader=part.is_leader,
+            )
+            for part in ParticipacaoProjeto.objects.filter(projeto_id__in=ids_projetos)
+        ])
+
+        # Membros de todas as equipes do lote numa query só
+        membros_por_equipe = {}
+        Membro = Equipe.membros.through
+        for equipe_id, usuario_id in Membro.objects.filter(
+            equipe__projeto_id__in=ids_projetos
+        ).values_list('equipe_id', 'usuario_id'):
+            membros_por_equipe.setdefault(equipe_id, []).append(usuario_id)
+
+        equipes = list(Equipe.objects.filter(projeto_id__in=ids_projetos))
+        EquipeArquivada.objects.bulk_create([
+            EquipeArquivada(
+                projeto=por_projeto[e.projeto_id],
+                id_original=e.pk,
+                nome=e.nome,
+                descricao=e.descricao,
+                lider_id=e.lider_id,
+                membros=membros_por_equipe.get(e.pk, []),
+                data_criacao=e.data_criacao,
+            )
+            for e in equipes
+        ])
+        projeto_da_equipe = {e.pk: e.projeto_id for e in equipes}
+
+        # Tarefas podem estar ligadas ao projeto diretamente ou só pela equipe
+        # (as de outros projetos já deixaram o projeto fora do lote)
+        tarefas = list(Tarefas.objects.filter(
+            Q(projeto_id__in=ids_projetos) | Q(equipe_id__in=list(projeto_da_equipe))
+        ))
+        ids_tarefas = [t.pk for t in tarefas]
+        historicos = {}
+        for h in HistoricoStatusTarefa.objects.filter(tarefa_id__in=ids_tarefas).order_by('criado_em', 'pk'):
+            historicos.setdefault(h.tarefa_id, []).append({
+                'status_anterior': h.status_anterior,
+                'status_novo': h.status_novo,
+                'usuario': h.usuario_id,
+                'criado_em': _data(h.criado_em),
+            })
+        metricas = {
+            m.tarefa_id: {
+                'projeto_id': m.projeto_id,
+                'criada_em': _data(m.criada_em),
+                'iniciada_em': _data(m.iniciada_em),
+                'concluida_em': _data(m.concluida_em),
+            }
+            for m in MetricaTarefa.objects.filter(tarefa_id__in=ids_tarefas)
+        }
+        TarefaArquivada.objects.bulk_create([
+            TarefaArquivada(
+                projeto=por_projeto.get(t.projeto_id) or por_projeto[projeto_da_equipe[t.equipe_id]],
+                id_original=t.pk,
+                titulo=t.titulo,
+                descricao=t.descricao,
+                status=t.status,
+                prioridade=t.prioridade,
+                vinculada_ao_projeto=t.projeto_id in por_projeto,
+                equipe_id_original=t.equipe_id,
+                responsavel_id=t.responsavel_id,
+                data_inicio=t.data_inicio,
+                data_fim_prevista=t.data_fim_prevista,
+                historico=historicos.get(t.pk, []),
+                metrica=metricas.get(t.pk),
+            )
+            for t in tarefas
+        ])
+
+        # O CASCADE leva junto participações, equipes e tarefas (tombstones num INSERT só)
+        with exclusoes_em_lote():
+            Projeto.objects.filter(pk__in=ids_projetos).delete()
+        return len(projetos)
+
+
+def arquivar_projetos(corte=None, tamanho_lote=TAMANHO_LOTE_PADRAO, dias=365, ao_progredir=None):
+    """
+    Arquiva em lotes todos os projetos elegíveis.
+    Se o corte não for informado, usa hoje - `dias`.
+    `ao_progredir(total_ate_agora)` é chamado depois de cada lote (usado pelo job da fila).
+    Retorna quantos projetos foram arquivados.
+    """
+    if corte is None:
+        corte = datetime.date.today() - datetime.timedelta(days=dias)
+
+    total = 0
+    ultimo_id = 0
+    while True:
+        # Anda pelo id pra não depender do OFFSET nem repetir projetos que falharam
+        ids = list(
+            projetos_arquivaveis(corte).filter(pk__gt=ultimo_id).values_list('pk', flat=True)[:tamanho_lote]
+        )
+        if not ids:
+            break
+        total += _arquivar_lote(ids)
+        ultimo_id = ids[-1]
+        if ao_progredir is not None:
+            ao_progredir(total)
+    return total
+
+
+def _restaurar_datas(modelo, campo, valores):
+    """
+    Campos auto_now_add são sobrescritos pelo bulk_create, então as datas
+    originais voltam com um UPDATE por data distinta.
+    """
+    por_data = {}
+    for pk, data in valores:
+        por_data.setdefault(data, []).append(pk)
+    for data, pks in por_data.items():
+        modelo.objects.filter(pk__in=pks).update(**{campo: data})
+
+
+def restaurar_projeto(arquivado):
+    """
+    Devolve um projeto arquivado (e todo o grafo dele) para as tabelas principais,
+    mantendo os ids originais. Retorna o Projeto restaurado.
+    """
+    from django.contrib.auth import get_user_model
+    from equipe.models import Equipe
+    from tarefas.models import BurndownDiario, HistoricoStatusTarefa, MetricaTarefa, Tarefas
+
+    User = get_user_model()
+
+    with transaction.atomic():
+        # bulk_create pula o full_clean do save(), que recusaria data_inicio no passado
+        projeto = Projeto.objects.bulk_create([
+            Projeto(
+                pk=arquivado.id_original,
+                nome=arquivado.nome,
+                descricao=arquivado.descricao,
+                data_inicio=arquivado.data_inicio,
+                data_fim_prevista=arquivado.data_fim_prevista,
+                status=arquivado.status,
+                is_public=arquivado.is_public,
+                professor_id=arquivado.professor_id,
+                created_by_id=arquivado.created_by_id,
+            )
+        ])[0]
+
+        participacoes = list(arquivado.participacoes.all())
+        ParticipacaoProjeto.objects.bulk_create([
+            ParticipacaoProjeto(
+                pk=part.id_original,
+                projeto=projeto,
+                usuario_id=part.usuario_id,
+                data_saida=part.data_saida,
+                ativo=part.ativo,
+                is_leader=part.is_leader,
+            )
+            for part in participacoes
+        ])
+        _restaurar_datas(
+            ParticipacaoProjeto, 'data_entrada',
+            [(part.id_original, part.data_entrada) for part in participacoes]
+        )
+
+        equipes_arquivadas = list(arquivado.equipes.all())
+        tarefas_arquivadas = list(arquivado.tarefas.all())
+        # Usuários (membros e autores do histórico) podem ter sido removidos,
+        # e o líder pode já liderar outra equipe (1:1)
+        ids_usuarios = {u for e in equipes_arquivadas for u in e.membros}
+        ids_usuarios.update(h['usuario'] for t in tarefas_arquivadas for h in t.historico if h['usuario'])
+        usuarios_existentes = set(User.objects.filter(pk__in=ids_usuarios).values_list('pk', flat=True))
+        lideres_ocupados = set(
+            Equipe.objects.filter(
+                lider_id__in=[e.lider_id for e in equipes_arquivadas if e.lider_id]
+            ).values_list('lider_id', flat=True)
+        )
+
+        Equipe.objects.bulk_create([
+            Equipe(
+                pk=e.id_original,
+                projeto=projeto,
+                nome=e.nome,
+                descricao=e.descricao,
+                lider_id=e.lider_id if e.lider_id not in lideres_ocupados else None,
+            )
+            for e in equipes_arquivadas
+        ])
+        _restaurar_datas(
+            Equipe, 'data_criacao',
+            [(e.id_original, e.data_criacao) for e in equipes_arquivadas]
+        )
+        Equipe.membros.through.objects.bulk_create([
+            Equipe.membros.through(equipe_id=e.id_original, usuario_id=u)
+            for e in equipes_arquivadas
+            for u in e.membros
+            if u in usuarios_existentes
+        ])
+
+        ids_equipes = {e.id_original for e in equipes_arquivadas}
+        tarefas = Tarefas.objects.bulk_create([
+            Tarefas(
+                pk=t.id_original,
+                projeto=projeto if t.vinculada_ao_projeto else None,
+                equipe_id=t.equipe_id_original if t.equipe_id_original in ids_equipes else None,
+                titulo=t.titulo,
+                descricao=t.descricao,
+                status=t.status,
+                prioridade=t.prioridade,
+                responsavel_id=t.responsavel_id,
+                data_inicio=t.data_inicio,
+                data_fim_prevista=t.data_fim_prevista,
+            )
+            for t in tarefas_arquivadas
+        ])
+
+        # Histórico, métricas de fluxo e burndown voltam como estavam
+        historicos = [
+            (
+                HistoricoStatusTarefa(
+                    tarefa_id=t.id_original,
+                    status_anterior=h['status_anterior'],
+                    status_novo=h['status_novo'],
+                    usuario_id=h['usuario'] if h['usuario'] in usuarios_existentes else None,
+                ),
+                _momento(h['criado_em']),
+            )
+            for t in tarefas_arquivadas
+            for h in t.historico
+        ]
+        HistoricoStatusTarefa.objects.bulk_create([h for h, _ in historicos])
+        # criado_em é auto_now_add: o bulk_create grava agora, o bulk_update devolve a data original
+        for h, criado_em in historicos:
+            h.criado_em = criado_em
+        HistoricoStatusTarefa.objects.bulk_update([h for h, _ in historicos], ['criado_em'])
+        MetricaTarefa.objects.bulk_create([
+            MetricaTarefa(
+                tarefa_id=t.id_original,
+                projeto_id=t.metrica['projeto_id'],
+                criada_em=_momento(t.metrica['criada_em']),
+                iniciada_em=_momento(t.metrica['iniciada_em']),
+                concluida_em=_momento(t.metrica['concluida_em']),
+            )
+            for t in tarefas_arquivadas
+            if t.metrica
+        ])
+        BurndownDiario.objects.bulk_create([
+            BurndownDiario(
+                projeto=projeto,
+                data=parse_date(dia['data']),
+                criadas=dia['criadas'],
+                concluidas=dia['concluidas'],
+                reabertas=dia['reabertas'],
+                removidas=dia['removidas'],
+                removidas_concluidas=dia['removidas_concluidas'],
+            )
+            for dia in arquivado.burndown
+        ])
+
+        # Os ids voltaram a existir: sem isso a sincronização mandaria apagar de novo no cliente
+        restaurados = Q()
+        for modelo, ids in (
+            (Projeto, [projeto.pk]),
+            (ParticipacaoProjeto, [part.id_original for part in participacoes]),
+            (Equipe, ids_equipes),
+            (Tarefas, [t.pk for t in tarefas]),
+        ):
+            if ids:
+                restaurados |= Q(modelo=modelo._meta.label_lower, objeto_id__in=ids)
+        Exclusao.objects.filter(restaurados).delete()
+
+        arquivado.delete()
+    return projeto
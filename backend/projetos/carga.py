@@ -0,0 +1,203 @@
+"""
+Carga de trabalho dos estudantes, para o coordenador escolher quem adicionar
+a um projeto (add_participante) ou a uma equipe (adicionar_membro).
+
+A carga de cada estudante vem de três consultas que só trazem ids:
+
+- estudantes com as participações deles (LEFT JOIN: quem não participa de
+  nada também aparece, com projeto 0);
+- membros de equipes de projetos ativos (estudante, projeto);
+- tarefas abertas sob responsabilidade de estudantes (estudante, projeto).
+
+Com os arrays na mão o NumPy faz o resto: cada par (estudante, projeto) vira
+um índice da matriz estudante x projeto (esparsa: guardamos só as células com
+valor) e os totais por estudante saem de bincount. Para 10 mil estudantes
+o cálculo leva poucos milissegundos; o tempo é quase todo das consultas.
+
+Projetos ativos: não iniciados e em andamento. A carga é a soma ponderada por
+CARGA_PESOS (projetos, equipes, tarefas abertas).
+
+As três consultas não saem do mesmo snapshot (no READ COMMITTED do PostgreSQL
+cada uma vê os commits feitos até ela). Um estudante criado entre a primeira e
+as outras aparece nas equipes ou tarefas sem estar na lista de estudantes:
+essas linhas são descartadas e ele entra na próxima vez que a carga for montada.
+"""
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from equipe.models import Equipe
+from projetos.models import Projeto
+
+User = get_user_model()
+
+STATUS_ATIVOS = (Projeto.STATUS_NAO_INICIADO, Projeto.STATUS_ANDAMENTO)
+
+
+def _inteiros(valores):
+    """Coluna do values_list como array de int64 (None vira 0)"""
+    return np.fromiter((valor or 0 for valor in valores), dtype=np.int64, count=len(valores))
+
+
+def _posicoes(ordenados, ids):
+    """Posição de cada id no array ordenado e a máscara dos que estão nele"""
+    posicoes = np.searchsorted(ordenados, ids)
+    presentes = posicoes < len(ordenados)
+    presentes[presentes] = ordenados[posicoes[presentes]] == ids[presentes]
+    return posicoes, presentes
+
+
+def _colunas(linhas, quantidade):
+    if not linhas:
+        return [()] * quantidade
+    return list(zip(*linhas))
+
+
+class CargaEstudantes:
+    """
+    Matriz de carga estudante x projeto. Depois de montada:
+    - estudantes: ids dos estudantes (ordenados)
+    - projetos, equipes, tarefas: totais por estudante (mesma ordem)
+    - carga: soma ponderada
+    """
+
+    def __init__(self):
+        from tarefas.models import Tarefas
+
+        # 1) Todos os estudantes, com as participações (ativas ou não) e o status do projeto
+        participacoes = list(
+            User.objects.filter(tipo_usuario='estudante').values_list(
+                'id', 'participacaoprojeto__projeto_id', 'participacaoprojeto__ativo',
+                'participacaoprojeto__projeto__status',
+            )
+        )
+        # 2) Membros de equipes de projetos ativos
+        membros = list(
+            Equipe.membros.through.objects.filter(
+                usuario__tipo_usuario='estudante', equipe__projeto__status__in=STATUS_ATIVOS
+            ).values_list('usuario_id', 'equipe__projeto_id')
+        )
+        # 3) Tarefas abertas de estudantes (as sem projeto contam só no total)
+        tarefas = list(
+            Tarefas.objects.filter(responsavel__tipo_usuario='estudante').exclude(status='concluida').filter(
+                Q(projeto__isnull=True) | Q(projeto__status__in=STATUS_ATIVOS)
+            ).values_list('responsavel_id', 'projeto_id')
+        )
+
+        usuario_p, projeto_p, ativo_p, status_p = _colunas(participacoes, 4)
+        usuario_p = _inteiros(usuario_p)
+        projeto_p = _inteiros(projeto_p)
+        # Participação que conta como carga: ativa e num projeto ativo
+        conta = np.fromiter(
+            (bool(ativo) and status in STATUS_ATIVOS for ativo, status in zip(ativo_p, status_p)),
+            dtype=bool, count=len(participacoes),
+        )
+        usuario_m, projeto_m = (_inteiros(coluna) for coluna in _colunas(membros, 2))
+        usuario_t, projeto_t = (_inteiros(coluna) for coluna in _colunas(tarefas, 2))
+
+        self.estudantes = np.unique(usuario_p)
+        total = len(self.estudantes)
+
+        # Posição de cada linha na matriz (sem as de estudantes que a consulta 1 não viu)
+        self._linha_p = np.searchsorted(self.estudantes, usuario_p)
+        self._linha_m, presentes = _posicoes(self.estudantes, usuario_m)
+        self._linha_m, projeto_m = self._linha_m[presentes], projeto_m[presentes]
+        self._linha_t, presentes = _posicoes(self.estudantes, usuario_t)
+        self._linha_t, projeto_t = self._linha_t[presentes], projeto_t[presentes]
+
+        # Os projetos só entram na matriz se alguém tem carga neles
+        self.ids_projetos = np.unique(np.concatenate([projeto_p[conta], projeto_m, projeto_t[projeto_t > 0]]))
+        self._projeto_p = projeto_p
+        self._projeto_m = projeto_m
+        self._projeto_t = projeto_t
+        self._conta = conta
+
+        self.projetos = np.bincount(self._linha_p[conta], minlength=total)
+        self.equipes = np.bincount(self._linha_m, minlength=total)
+        self.tarefas = np.bincount(self._linha_t, minlength=total)
+
+        pesos = settings.CARGA_PESOS
+        self.carga = (
+            pesos['projetos'] * self.projetos + pesos['equipes'] * self.equipes + pesos['tarefas'] * self.tarefas
+        )
+
+    def matriz(self):
+        """
+        Matriz estudante x projeto em formato esparso (COO): só as células com
+        alguma carga, com equipes e tarefas abertas do estudante naquele projeto.
+        """
+        colunas = len(self.ids_projetos)
+        chaves = [
+            self._linha_p[self._conta] * colunas + np.searchsorted(self.ids_projetos, self._projeto_p[self._conta]),
+            self._linha_m * colunas + np.searchsorted(self.ids_projetos, self._projeto_m),
+        ]
+        com_projeto = self._projeto_t > 0
+        chaves.append(
+            self._linha_t[com_projeto] * colunas + np.searchsorted(self.ids_projetos, self._projeto_t[com_projeto])
+        )
+        celulas = np.unique(np.concatenate(chaves))
+        equipes = np.zeros(len(celulas), dtype=np.int64)
+        tarefas = np.zeros(len(celulas), dtype=np.int64)
+        np.add.at(equipes, np.searchsorted(celulas, chaves[1]), 1)
+        np.add.at(tarefas, np.searchsorted(celulas, chaves[2]), 1)
+        linhas, colunas_celula = np.divmod(celulas, colunas) if colunas else (celulas, celulas)
+        return {
+            'estudante_id': self.estudantes[linhas].tolist(),
+            'projeto_id': self.ids_projetos[colunas_celula].tolist(),
+            'equipes': equipes.tolist(),
+            'tarefas_abertas': tarefas.tolist(),
+        }
+
+    def _participa(self, projeto_id, apenas_ativos):
+        """Máscara dos estudantes que participam do projeto"""
+        mascara = self._projeto_p == projeto_id
+        if apenas_ativos:
+            mascara &= self._conta
+        participa = np.zeros(len(self.estudantes), dtype=bool)
+        participa[self._linha_p[mascara]] = True
+        return participa
+
+    def candidatos(self, projeto_id, para='participante', limite=10):
+        """
+        Estudantes menos carregados que podem ser adicionados:
+        - para='participante': quem ainda não participa do projeto (a mesma regra do add_participante)
+        - para='equipe': participantes ativos do projeto que ainda não estão em nenhuma equipe dele
+        Devolve a lista de índices, da menor para a maior carga (empate: menor id).
+        """
+        if para == 'equipe':
+            em_equipe = np.zeros(len(self.estudantes), dtype=bool)
+            em_equipe[self._linha_m[self._projeto_m == projeto_id]] = True
+            elegiveis = self._participa(projeto_id, apenas_ativos=True) & ~em_equipe
+        else:
+            elegiveis = ~self._participa(projeto_id, apenas_ativos=False)
+
+        indices = np.flatnonzero(elegiveis)
+        if len(indices) > limite:
+            # Sem ordenar todos: acha a carga do `limite`-ésimo e fica só com quem
+            # tem carga até ela (os empatados entram todos, para o desempate por id)
+            corte = np.partition(self.carga[indices], limite - 1)[limite - 1]
+            indices = indices[self.carga[indices] <= corte]
+        ordem = np.lexsort((self.estudantes[indices], self.carga[indices]))
+        return indices[ordem][:limite]
+
+    def resumo(self):
+        return {
+            'estudantes': int(len(self.estudantes)),
+            'projetos_ativos': int(len(self.ids_projetos)),
+            'carga_media': round(float(self.carga.mean()), 2) if len(self.carga) else 0,
+            'carga_maxima': int(self.carga.max()) if len(self.carga) else 0,
+            'sem_carga': int(np.count_nonzero(self.carga == 0)),
+        }
+
+    def totais(self, indices=None):
+        """Totais por estudante em arrays paralelos (todos ou só os índices pedidos)"""
+        if indices is None:
+            indices = slice(None)
+        return {
+            'estudante_id': self.estudantes[indices].tolist(),
+            'projetos': self.projetos[indices].tolist(),
+            'equipes': self.equipes[indices].tolist(),
+            'tarefas_abertas': self.tarefas[indices].tolist(),
+            'carga': self.carga[indices].tolist(),
+        }
@@ -0,0 +1,160 @@
+"""
+Formação automática de equipes (POST /api/projetos/{id}/formar-equipes/).
+
+Divide os participantes ativos do projeto que ainda não estão em nenhuma
+equipe dele em N equipes novas:
+
+- tamanhos equilibrados (no máximo ceil(participantes / N) por equipe);
+- carga equilibrada, com a mesma carga do relatório de carga (projetos/carga.py):
+  os grupos entram do mais carregado para o menos, cada um na equipe menor e,
+  entre as menores, na de menor carga somada;
+- restrições opcionais: `juntos` (listas de ids que ficam na mesma equipe) e
+  `separados` (listas de ids que não podem dividir equipe);
+- líder: o membro menos carregado que ainda não lidera outra equipe
+  (Equipe.lider é um para um). Sem ninguém disponível a equipe fica sem líder.
+
+O plano é montado em memória; criar_equipes grava tudo com bulk_create numa
+transação só (equipes e depois os membros).
+"""
+import math
+
+from django.db import transaction
+
+from equipe.models import Equipe
+from projetos.carga import CargaEstudantes
+
+
+class ErroFormacao(Exception):
+    """Pedido que não dá para atender (vira 400 na view)"""
+
+
+def _grupos_juntos(ids, juntos):
+    """Une os ids que precisam ficar juntos (union-find); devolve {id: representante}"""
+    pai = {estudante_id: estudante_id for estudante_id in ids}
+
+    def raiz(estudante_id):
+        while pai[estudante_id] != estudante_id:
+            pai[estudante_id] = pai[pai[estudante_id]]
+            estudante_id = pai[estudante_id]
+        return estudante_id
+
+    for lista in juntos:
+        for estudante_id in lista[1:]:
+            pai[raiz(estudante_id)] = raiz(lista[0])
+    return {estudante_id: raiz(estudante_id) for estudante_id in ids}
+
+
+def _validar_listas(nome, listas, elegiveis):
+    if not isinstance(listas, list) or not all(isinstance(lista, list) for lista in listas):
+        raise ErroFormacao(f'{nome} deve ser uma lista de listas de ids.')
+    try:
+        listas = [[int(estudante_id) for estudante_id in lista] for lista in listas]
+    except (TypeError, ValueError):
+        raise ErroFormacao(f'{nome} deve conter apenas ids de usuários.')
+    fora = sorted({estudante_id for lista in listas for estudante_id in lista} - elegiveis)
+    if fora:
+        raise ErroFormacao(
+            f'{nome}: os usuários {fora} não são participantes ativos sem equipe neste projeto.'
+        )
+    return listas
+
+
+def planejar_equipes(projeto, quantidade, juntos=(), separados=(), prefixo='Equipe'):
+    """
+    Monta o plano sem gravar nada: lista de equipes com nome, líder, membros
+    (ids em ordem crescente) e a carga somada.
+    """
+    carga = CargaEstudantes()
+    indices = carga.candidatos(projeto.id, para='equipe', limite=len(carga.estudantes))
+    ids = carga.estudantes[indices].tolist()
+    cargas = dict(zip(ids, carga.carga[indices].tolist()))
+
+    if not ids:
+        raise ErroFormacao('Não há participantes ativos sem equipe neste projeto.')
+    if not 1 <= quantidade <= len(ids):
+        raise ErroFormacao(f'quantidade deve estar entre 1 e {len(ids)} (participantes sem equipe).')
+
+    elegiveis = set(ids)
+    juntos = _validar_listas('juntos', list(juntos), elegiveis)
+    separados = _validar_listas('separados', list(separados), elegiveis)
+
+    representante = _grupos_juntos(ids, juntos)
+    grupos = {}
+    for estudante_id in ids:
+        grupos.setdefault(representante[estudante_id], []).append(estudante_id)
+
+    # Pares de grupos que não podem cair na mesma equipe
+    conflitos = {raiz: set() for raiz in grupos}
+    for lista in separados:
+        raizes = [representante[estudante_id] for estudante_id in lista]
+        if len(set(raizes)) < len(raizes):
+            raise ErroFormacao(f'Os usuários {lista} estão em "juntos" e "separados" ao mesmo tempo.')
+        for raiz in raizes:
+            conflitos[raiz].update(outra for outra in raizes if outra != raiz)
+
+    capacidade = math.ceil(len(ids) / quantidade)
+    maior = max(grupos.values(), key=len)
+    if len(maior) > capacidade:
+        raise ErroFormacao(
+            f'O grupo {sorted(maior)} tem {len(maior)} pessoas; com {quantidade} equipes o máximo é {capacidade}.'
+        )
+
+    equipes = [{'membros': [], 'carga': 0, 'grupos': set()} for _ in range(quantidade)]
+    # Maiores e mais carregados primeiro: os pequenos no final completam as equipes
+    ordem = sorted(
+        grupos.items(),
+        key=lambda item: (-len(item[1]), -sum(cargas[i] for i in item[1]), item[1][0]),
+    )
+    for raiz, membros in ordem:
+        opcoes = [
+            posicao for posicao, equipe in enumerate(equipes)
+            if len(equipe['membros']) + len(membros) <= capacidade and not equipe['grupos'] & conflitos[raiz]
+        ]
+        if not opcoes:
+            raise ErroFormacao(
+                'Não foi possível respeitar as restrições com essa quantidade de equipes.'
+            )
+        destino = equipes[min(
+            opcoes, key=lambda posicao: (len(equipes[posicao]['membros']), equipes[posicao]['carga'], posicao)
+        )]
+        destino['membros'].extend(membros)
+        destino['carga'] += sum(cargas[i] for i in membros)
+        destino['grupos'].add(raiz)
+
+    # Quem já lidera uma equipe (de qualquer projeto) não pode liderar outra
+    lideres_ocupados = set(
+        Equipe.objects.filter(lider_id__in=ids).values_list('lider_id', flat=True)
+    )
+    nomes_usados = set(Equipe.objects.filter(projeto=projeto).values_list('nome', flat=True))
+    numero = 0
+    plano = []
+    for equipe in equipes:
+        numero += 1
+        while f'{prefixo} {numero}' in nomes_usados:
+            numero += 1
+        membros = sorted(equipe['membros'])
+        livres = [i for i in membros if i not in lideres_ocupados]
+        lider = min(livres, key=lambda i: (cargas[i], i)) if livres else None
+        plano.append({
+            'nome': f'{prefixo} {numero}',
+            'lider': lider,
+            'membros': membros,
+            'carga': equipe['carga'],
+        })
+    return plano
+
+
+def criar_equipes(projeto, plano):
+    """Grava o plano: um bulk_create das equipes e outro dos membros, na mesma transação"""
+    Membro = Equipe.membros.through
+    with transaction.atomic():
+        equipes = Equipe.objects.bulk_create([
+            Equipe(nome=item['nome'], projeto=projeto, lider_id=item['lider'])
+            for item in plano
+        ])
+        Membro.objects.bulk_create([
+            Membro(equipe_id=equipe.pk, usuario_id=usuario_id)
+            for equipe, item in zip(equipes, plano)
+            for usuario_id in item['membros']
+        ])
+    return equipes
@@ -0,0 +1,28 @@
+"""Jobs da fila (fila/fila.py) do app de projetos"""
+import datetime
+
+from fila.fila import registrar_job
+from projetos.arquivamento import arquivar_projetos, projetos_arquivaveis, TAMANHO_LOTE_PADRAO
+from projetos.relatorios import relatorio_geral, gravar_snapshot
+
+
+@registrar_job('relatorio_geral')
+def job_relatorio_geral(job):
+    return relatorio_geral()
+
+
+@registrar_job('arquivar_projetos')
+def job_arquivar_projetos(job, dias=365, lote=TAMANHO_LOTE_PADRAO):
+    corte = datetime.date.today() - datetime.timedelta(days=dias)
+    previstos = projetos_arquivaveis(corte).count()
+
+    def ao_progredir(total):
+        job.atualizar_progresso(total * 100 // max(previstos, 1), f'{total} de {previstos} projeto(s)')
+
+    total = arquivar_projetos(corte=corte, tamanho_lote=lote, ao_progredir=ao_progredir)
+    return {'arquivados': total, 'corte': corte.isoformat()}
+
+
+@registrar_job('snapshot_relatorios')
+def job_snapshot_relatorios(job):
+    return {'data': gravar_snapshot().data.isoformat()}
@@ -0,0 +1,53 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from projetos.arquivamento import (
+    arquivar_projetos,
+    projetos_arquivaveis,
+    restaurar_projeto,
+    TAMANHO_LOTE_PADRAO,
+)
+from projetos.models import ProjetoArquivado
+from fila.fila import enfileirar
+
+
+class Command(BaseCommand):
+    help = "Move projetos concluídos/cancelados antigos para o arquivo (ou restaura um projeto arquivado)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=365,
+                            help='Arquiva projetos que terminaram há mais de N dias (padrão: 365)')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_PADRAO,
+                            help='Quantidade de projetos por transação')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Só mostra quantos projetos seriam arquivados')
+        parser.add_argument('--restaurar', type=int, metavar='ID_ORIGINAL',
+                            help='Restaura o projeto arquivado com esse id original')
+        parser.add_argument('--fila', action='store_true',
+                            help='Só enfileira o arquivamento para o worker (rodar_fila)')
+
+    def handle(self, *args, **options):
+        if options['restaurar']:
+            try:
+                arquivado = ProjetoArquivado.objects.get(id_original=options['restaurar'])
+            except ProjetoArquivado.DoesNotExist:
+                raise CommandError(f"Projeto arquivado {options['restaurar']} não encontrado.")
+            projeto = restaurar_projeto(arquivado)
+            self.stdout.write(self.style.SUCCESS(f'Projeto "{projeto.nome}" restaurado.'))
+            return
+
+        corte = datetime.date.today() - datetime.timedelta(days=options['dias'])
+
+        if options['dry_run']:
+            total = projetos_arquivaveis(corte).count()
+            self.stdout.write(f'{total} projeto(s) seriam arquivados (corte: {corte}).')
+            return
+
+        if options['fila']:
+            job = enfileirar('arquivar_projetos', dias=options['dias'], lote=options['lote'])
+            self.stdout.write(self.style.SUCCESS(f'Arquivamento enfileirado (job {job.pk}).'))
+            return
+
+        total = arquivar_projetos(corte=corte, tamanho_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'{total} projeto(s) arquivados (corte: {corte}).'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from projetos.relatorios import gravar_snapshot
+
+
+class Command(BaseCommand):
+    help = "Grava a foto diária das contagens do relatório (agende uma vez por dia, ex.: cron)"
+
+    def handle(self, *args, **options):
+        snapshot = gravar_snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f'Foto de {snapshot.data:%d/%m/%Y} gravada: {snapshot.projetos_total} projeto(s), '
+            f'{snapshot.tarefas_total} tarefa(s), {snapshot.participacoes_ativas} participação(ões) ativa(s).'
+        ))
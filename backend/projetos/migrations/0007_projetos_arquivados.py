@@ -0,0 +1,92 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projetos', '0006_projeto_is_public'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjetoArquivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_original', models.BigIntegerField(help_text='Id do projeto antes de ser arquivado', unique=True)),
+                ('nome', models.CharField(max_length=200)),
+                ('descricao', models.CharField(max_length=2000)),
+                ('data_inicio', models.DateField()),
+                ('data_fim_prevista', models.DateField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('nao_iniciado', 'Não Iniciado'), ('em_andamento', 'Em Andamento'), ('concluido', 'Concluído'), ('cancelado', 'Cancelado')], max_length=30)),
+                ('is_public', models.BooleanField(default=False)),
+                ('arquivado_em', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('professor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Projeto Arquivado',
+                'verbose_name_plural': 'Projetos Arquivados',
+                'ordering': ['-arquivado_em'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ParticipacaoArquivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_original', models.BigIntegerField()),
+                ('data_entrada', models.DateField()),
+                ('data_saida', models.DateField(blank=True, null=True)),
+                ('ativo', models.BooleanField(default=True)),
+                ('is_leader', models.BooleanField(default=False)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('projeto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participacoes', to='projetos.projetoarquivado')),
+            ],
+            options={
+                'verbose_name': 'Participação Arquivada',
+                'verbose_name_plural': 'Participações Arquivadas',
+            },
+        ),
+        migrations.CreateModel(
+            name='EquipeArquivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_original', models.BigIntegerField()),
+                ('nome', models.CharField(max_length=200)),
+                ('descricao', models.TextField(blank=True, null=True)),
+                ('membros', models.JSONField(blank=True, default=list)),
+                ('data_criacao', models.DateField()),
+                ('lider', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('projeto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='equipes', to='projetos.projetoarquivado')),
+            ],
+            options={
+                'verbose_name': 'Equipe Arquivada',
+                'verbose_name_plural': 'Equipes Arquivadas',
+            },
+        ),
+        migrations.CreateModel(
+            name='TarefaArquivada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_original', models.BigIntegerField()),
+                ('titulo', models.CharField(max_length=200)),
+                ('descricao', models.TextField(blank=True)),
+                ('status', models.CharField(max_length=20)),
+                ('prioridade', models.IntegerField(default=2)),
+                ('vinculada_ao_projeto', models.BooleanField(default=True)),
+                ('equipe_id_original', models.BigIntegerField(blank=True, null=True)),
+                ('data_inicio', models.DateField()),
+                ('data_fim_prevista', models.DateField(blank=True, null=True)),
+                ('projeto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tarefas', to='projetos.projetoarquivado')),
+                ('responsavel', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tarefa Arquivada',
+                'verbose_name_plural': 'Tarefas Arquivadas',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projetos', '0007_projetos_arquivados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projeto',
+            index=models.Index(fields=['data_inicio', 'data_fim_prevista'], name='projeto_intervalo_idx'),
+        ),
+    ]
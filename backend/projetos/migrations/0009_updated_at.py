@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projetos', '0008_indices_intervalo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participacaoprojeto',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='projeto',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projetos', '0009_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projeto',
+            name='versao',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Versão para controle de concorrência'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projetos', '0010_versao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatorioDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(unique=True)),
+                ('projetos_total', models.PositiveIntegerField(default=0)),
+                ('projetos_em_andamento', models.PositiveIntegerField(default=0)),
+                ('projetos_concluidos', models.PositiveIntegerField(default=0)),
+                ('projetos_planejamento', models.PositiveIntegerField(default=0)),
+                ('projetos_cancelados', models.PositiveIntegerField(default=0)),
+                ('total_estudantes', models.PositiveIntegerField(default=0)),
+                ('estudantes_ativos', models.PositiveIntegerField(default=0)),
+                ('total_professores', models.PositiveIntegerField(default=0)),
+                ('total_coordenadores', models.PositiveIntegerField(default=0)),
+                ('tarefas_total', models.PositiveIntegerField(default=0)),
+                ('tarefas_pendentes', models.PositiveIntegerField(default=0)),
+                ('tarefas_em_andamento', models.PositiveIntegerField(default=0)),
+                ('tarefas_concluidas', models.PositiveIntegerField(default=0)),
+                ('participacoes_ativas', models.PositiveIntegerField(default=0)),
+                ('gerado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Relatório Diário',
+                'verbose_name_plural': 'Relatórios Diários',
+                'ordering': ['data'],
+            },
+        ),
+    ]
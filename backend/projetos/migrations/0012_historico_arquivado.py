@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-19 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projetos', '0011_relatorio_diario'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projetoarquivado',
+            name='burndown',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='tarefaarquivada',
+            name='historico',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='tarefaarquivada',
+            name='metrica',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
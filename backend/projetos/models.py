@@ -3,6 +3,8 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 import datetime
 
+from DevLab.concorrencia import ModeloVersionado
+
 
 class ParticipacaoProjeto(models.Model):
     usuario = models.ForeignKey(
@@ -38,6 +40,9 @@ class ParticipacaoProjeto(models.Model):
         default=False,
         help_text="Indica se o usuário é o líder da equipe do projeto"
     )
+
+    # Última modificação, usada pela sincronização incremental (?updated_since=)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         verbose_name = "Participação em Projeto"
@@ -51,7 +56,7 @@ class ParticipacaoProjeto(models.Model):
         return f"{self.usuario.username} em {self.projeto.nome} ({status})"
 
 
-class Projeto(models.Model):
+class Projeto(ModeloVersionado):
     # Atributos básicos
     nome = models.CharField(max_length=200)
     descricao = models.CharField(max_length=2000) 
@@ -106,6 +111,9 @@ class Projeto(models.Model):
         (STATUS_CANCELADO, "Cancelado"),
     ]
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default=STATUS_NAO_INICIADO)
+
+    # Última modificação, usada pela sincronização incremental (?updated_since=)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def clean(self):
         #Esse clean vai validar os dados do modelo antes de salvar.
@@ -123,6 +131,12 @@ class Projeto(models.Model):
         if self.data_fim_prevista and self.data_inicio and self.data_fim_prevista < self.data_inicio:
             raise ValidationError({"data_fim_prevista": ("A data para o fim deste projeto não pode ser menor que a data de início. Por favor, troque a data")})
             
+    class Meta:
+        # Índice para as consultas de intervalo da linha do tempo (projetos/timeline.py)
+        indexes = [
+            models.Index(fields=['data_inicio', 'data_fim_prevista'], name='projeto_intervalo_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         #Aqui ele sobrescreve o método save para incluir validação automática.
         
@@ -135,4 +149,156 @@ class Projeto(models.Model):
         super().save(*args, **kwargs)
     
     def __str__(self):
-        return self.nome
\ No newline at end of file
+        return self.nome
+
+    def tem_participante(self, usuario_id):
+        """
+        Se o usuário participa do projeto. Fica memorizado na instância: a view,
+        o serializer e o clean() da equipe fazem a mesma pergunta na mesma requisição.
+        """
+        verificados = self.__dict__.setdefault('_participantes_verificados', {})
+        if usuario_id not in verificados:
+            verificados[usuario_id] = self.participantes.filter(id=usuario_id).exists()
+        return verificados[usuario_id]
+
+# ------------------------------------------------------------------
+# Arquivo morto: projetos concluídos/cancelados antigos saem das tabelas
+# principais (com participações, equipes e tarefas) e vêm pra cá.
+# Os ids originais são guardados pra permitir restaurar o projeto depois.
+# ------------------------------------------------------------------
+
+class ProjetoArquivado(models.Model):
+    id_original = models.BigIntegerField(unique=True, help_text="Id do projeto antes de ser arquivado")
+    nome = models.CharField(max_length=200)
+    descricao = models.CharField(max_length=2000)
+    data_inicio = models.DateField()
+    data_fim_prevista = models.DateField(null=True, blank=True)
+    status = models.CharField(max_length=30, choices=Projeto.STATUS_CHOICES)
+    is_public = models.BooleanField(default=False)
+
+    professor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+
+    arquivado_em = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Linhas do BurndownDiario (data e contadores do dia)
+    burndown = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        verbose_name = "Projeto Arquivado"
+        verbose_name_plural = "Projetos Arquivados"
+        ordering = ['-arquivado_em']
+
+    def __str__(self):
+        return f"{self.nome} (arquivado)"
+
+
+class ParticipacaoArquivada(models.Model):
+    projeto = models.ForeignKey(ProjetoArquivado, on_delete=models.CASCADE, related_name='participacoes')
+    id_original = models.BigIntegerField()
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    data_entrada = models.DateField()
+    data_saida = models.DateField(null=True, blank=True)
+    ativo = models.BooleanField(default=True)
+    is_leader = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = "Participação Arquivada"
+        verbose_name_plural = "Participações Arquivadas"
+
+
+class EquipeArquivada(models.Model):
+    projeto = models.ForeignKey(ProjetoArquivado, on_delete=models.CASCADE, related_name='equipes')
+    id_original = models.BigIntegerField()
+    nome = models.CharField(max_length=200)
+    descricao = models.TextField(blank=True, null=True)
+    lider = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    # Ids dos membros (a tabela N:N não é copiada, fica só a lista)
+    membros = models.JSONField(default=list, blank=True)
+    data_criacao = models.DateField()
+
+    class Meta:
+        verbose_name = "Equipe Arquivada"
+        verbose_name_plural = "Equipes Arquivadas"
+
+
+class TarefaArquivada(models.Model):
+    projeto = models.ForeignKey(ProjetoArquivado, on_delete=models.CASCADE, related_name='tarefas')
+    id_original = models.BigIntegerField()
+    titulo = models.CharField(max_length=200)
+    descricao = models.TextField(blank=True)
+    status = models.CharField(max_length=20)
+    prioridade = models.IntegerField(default=2)
+    # Guarda se a tarefa estava ligada diretamente ao projeto (Tarefas.projeto pode ser nulo)
+    vinculada_ao_projeto = models.BooleanField(default=True)
+    equipe_id_original = models.BigIntegerField(null=True, blank=True)
+    responsavel = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    data_inicio = models.DateField()
+    data_fim_prevista = models.DateField(null=True, blank=True)
+    # HistoricoStatusTarefa e MetricaTarefa da tarefa, para a restauração recriar
+    historico = models.JSONField(default=list, blank=True)
+    metrica = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tarefa Arquivada"
+        verbose_name_plural = "Tarefas Arquivadas"
+
+
+class RelatorioDiario(models.Model):
+    """
+    Foto diária das contagens do relatório geral (projetos/relatorios.py),
+    gravada pelo comando gerar_snapshot_relatorios. Uma linha por dia; a
+    série do gráfico de tendência é uma leitura por faixa de datas no índice único.
+    """
+    data = models.DateField(unique=True)
+
+    projetos_total = models.PositiveIntegerField(default=0)
+    projetos_em_andamento = models.PositiveIntegerField(default=0)
+    projetos_concluidos = models.PositiveIntegerField(default=0)
+    projetos_planejamento = models.PositiveIntegerField(default=0)
+    projetos_cancelados = models.PositiveIntegerField(default=0)
+
+    total_estudantes = models.PositiveIntegerField(default=0)
+    estudantes_ativos = models.PositiveIntegerField(default=0)
+    total_professores = models.PositiveIntegerField(default=0)
+    total_coordenadores = models.PositiveIntegerField(default=0)
+
+    tarefas_total = models.PositiveIntegerField(default=0)
+    tarefas_pendentes = models.PositiveIntegerField(default=0)
+    tarefas_em_andamento = models.PositiveIntegerField(default=0)
+    tarefas_concluidas = models.PositiveIntegerField(default=0)
+
+    participacoes_ativas = models.PositiveIntegerField(default=0)
+
+    gerado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Relatório Diário"
+        verbose_name_plural = "Relatórios Diários"
+        ordering = ['data']
+
+    def __str__(self):
+        return f"Relatório de {self.data:%d/%m/%Y}"
@@ -0,0 +1,56 @@
+"""Projeções de listagem (ver DevLab/projecao.py) para projetos"""
+from DevLab.projecao import Projecao, agrupar, data, data_hora
+from projetos.models import ParticipacaoProjeto
+from usuarios.projecoes import colunas_usuario, usuario_de_linha
+
+# Formato dos SerializerMethodField do ProjetoSerializer
+CAMPOS_PESSOA = ('id', 'nome', 'username', 'email')
+CAMPOS_PARTICIPANTE = ('id', 'nome', 'username', 'email', 'tipo_usuario')
+
+
+class ProjecaoProjeto(Projecao):
+    """
+    Mesma saída do ProjetoSerializer. Professor e criador vêm no mesmo SELECT;
+    participantes e líder, de uma consulta só nas participações da página
+    (participantes ordenados por id, como no Prefetch do caminho do serializer).
+    """
+    colunas = (
+        'id', 'versao', 'nome', 'descricao', 'data_inicio', 'data_fim_prevista',
+        'is_public', 'status', 'updated_at', 'professor_id', 'created_by_id',
+        *colunas_usuario('professor__', CAMPOS_PESSOA),
+        *colunas_usuario('created_by__', CAMPOS_PESSOA),
+    )
+
+    def participacoes_por_projeto(self, projeto_ids):
+        linhas = ParticipacaoProjeto.objects.filter(
+            projeto_id__in=projeto_ids
+        ).order_by('usuario_id').values('projeto_id', 'is_leader', *colunas_usuario('usuario__', CAMPOS_PARTICIPANTE))
+        return agrupar(linhas, 'projeto_id')
+
+    def montar(self, linhas):
+        participacoes = self.participacoes_por_projeto([linha['id'] for linha in linhas])
+        resultado = []
+        for linha in linhas:
+            participantes = participacoes.get(linha['id'], [])
+            lider = next((p for p in participantes if p['is_leader']), None)
+            resultado.append({
+                'id': linha['id'],
+                'participantes': [p['usuario__id'] for p in participantes],
+                'participantes_detalhes': [
+                    usuario_de_linha(p, 'usuario__', CAMPOS_PARTICIPANTE) for p in participantes
+                ],
+                'professor_detalhes': usuario_de_linha(linha, 'professor__', CAMPOS_PESSOA),
+                'lider_detalhes': lider and usuario_de_linha(lider, 'usuario__', CAMPOS_PESSOA),
+                'criado_por': usuario_de_linha(linha, 'created_by__', CAMPOS_PESSOA),
+                'versao': linha['versao'],
+                'nome': linha['nome'],
+                'descricao': linha['descricao'],
+                'data_inicio': data(linha['data_inicio']),
+                'data_fim_prevista': data(linha['data_fim_prevista']),
+                'is_public': linha['is_public'],
+                'status': linha['status'],
+                'updated_at': data_hora(linha['updated_at']),
+                'professor': linha['professor_id'],
+                'created_by': linha['created_by_id'],
+            })
+        return resultado
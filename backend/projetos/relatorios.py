@@ -0,0 +1,165 @@
+"""
+Relatórios gerais (estatísticas de participação) usados pelos coordenadores.
+A função é separada da view para poder rodar também como job da fila.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from projetos.models import Projeto, ParticipacaoProjeto
+
+User = get_user_model()
+
+
+def relatorio_geral():
+    """Retorna estatísticas gerais de projetos, usuários e tarefas"""
+    from tarefas.models import Tarefas
+
+    # Estatísticas de projetos
+    total_projetos = Projeto.objects.count()
+    projetos_em_andamento = Projeto.objects.filter(status='em_andamento').count()
+    projetos_concluidos = Projeto.objects.filter(status='concluido').count()
+    projetos_planejamento = Projeto.objects.filter(status='planejamento').count()
+    projetos_cancelados = Projeto.objects.filter(status='cancelado').count()
+    
+    # Estatísticas de usuários
+    total_estudantes = User.objects.filter(tipo_usuario='estudante').count()
+    total_professores = User.objects.filter(tipo_usuario='professor').count()
+    total_coordenadores = User.objects.filter(tipo_usuario='coordenador').count()
+    
+    # Estudantes participando de projetos
+    estudantes_ativos = ParticipacaoProjeto.objects.filter(
+        ativo=True,
+        usuario__tipo_usuario='estudante'
+    ).values('usuario').distinct().count()
+    
+    # Estatísticas de tarefas
+    total_tarefas = Tarefas.objects.count()
+    tarefas_pendentes = Tarefas.objects.filter(status='pendente').count()
+    tarefas_em_andamento = Tarefas.objects.filter(status='em_andamento').count()
+    tarefas_concluidas = Tarefas.objects.filter(status='concluida').count()
+    
+    # Projetos por coordenador
+    projetos_por_coordenador = Projeto.objects.values(
+        'created_by__nome', 'created_by__id'
+    ).annotate(
+        total=Count('id')
+    ).order_by('-total')[:10]  # Top 10 coordenadores
+    
+    # Professores mais ativos (com mais projetos)
+    professores_ativos = Projeto.objects.filter(
+        professor__isnull=False
+    ).values(
+        'professor__nome', 'professor__id'
+    ).annotate(
+        total_projetos=Count('id')
+    ).order_by('-total_projetos')[:10]
+    
+    # Estudantes mais participativos
+    estudantes_participativos = ParticipacaoProjeto.objects.filter(
+        ativo=True,
+        usuario__tipo_usuario='estudante'
+    ).values(
+        'usuario__nome', 'usuario__id'
+    ).annotate(
+        total_projetos=Count('projeto', distinct=True)
+    ).order_by('-total_projetos')[:10]
+    
+    # Total de participações ativas
+    total_participacoes = ParticipacaoProjeto.objects.filter(ativo=True).count()
+    
+    return {
+        'projetos': {
+            'total': total_projetos,
+            'em_andamento': projetos_em_andamento,
+            'concluidos': projetos_concluidos,
+            'planejamento': projetos_planejamento,
+            'cancelados': projetos_cancelados,
+        },
+        'usuarios': {
+            'total_estudantes': total_estudantes,
+            'estudantes_ativos': estudantes_ativos,
+            'total_professores': total_professores,
+            'total_coordenadores': total_coordenadores,
+        },
+        'tarefas': {
+            'total': total_tarefas,
+            'pendentes': tarefas_pendentes,
+            'em_andamento': tarefas_em_andamento,
+            'concluidas': tarefas_concluidas,
+        },
+        'rankings': {
+            'projetos_por_coordenador': list(projetos_por_coordenador),
+            'professores_ativos': list(professores_ativos),
+            'estudantes_participativos': list(estudantes_participativos),
+        },
+        'participacoes': {
+            'total_participacoes_ativas': total_participacoes,
+        }
+    }
+
+
+# ---------------------------------------------------------------
+# Fotos diárias (RelatorioDiario) para os gráficos de tendência
+# ---------------------------------------------------------------
+
+# Campos da foto, na ordem em que saem na série
+CAMPOS_SNAPSHOT = [
+    'projetos_total', 'projetos_em_andamento', 'projetos_concluidos',
+    'projetos_planejamento', 'projetos_cancelados',
+    'total_estudantes', 'estudantes_ativos', 'total_professores', 'total_coordenadores',
+    'tarefas_total', 'tarefas_pendentes', 'tarefas_em_andamento', 'tarefas_concluidas',
+    'participacoes_ativas',
+]
+
+
+def contagens_atuais():
+    """
+    As mesmas contagens do relatorio_geral(), mas com um aggregate por tabela
+    (Count com filter) em vez de um COUNT por número.
+    """
+    from tarefas.models import Tarefas
+
+    projetos = Projeto.objects.aggregate(
+        projetos_total=Count('id'),
+        projetos_em_andamento=Count('id', filter=Q(status='em_andamento')),
+        projetos_concluidos=Count('id', filter=Q(status='concluido')),
+        projetos_planejamento=Count('id', filter=Q(status='planejamento')),
+        projetos_cancelados=Count('id', filter=Q(status='cancelado')),
+    )
+    usuarios = User.objects.aggregate(
+        total_estudantes=Count('id', filter=Q(tipo_usuario='estudante')),
+        total_professores=Count('id', filter=Q(tipo_usuario='professor')),
+        total_coordenadores=Count('id', filter=Q(tipo_usuario='coordenador')),
+    )
+    participacoes = ParticipacaoProjeto.objects.filter(ativo=True).aggregate(
+        participacoes_ativas=Count('id'),
+        estudantes_ativos=Count('usuario', distinct=True, filter=Q(usuario__tipo_usuario='estudante')),
+    )
+    tarefas = Tarefas.objects.aggregate(
+        tarefas_total=Count('id'),
+        tarefas_pendentes=Count('id', filter=Q(status='pendente')),
+        tarefas_em_andamento=Count('id', filter=Q(status='em_andamento')),
+        tarefas_concluidas=Count('id', filter=Q(status='concluida')),
+    )
+    return {**projetos, **usuarios, **participacoes, **tarefas}
+
+
+def gravar_snapshot(data=None):
+    """Grava (ou regrava) a foto do dia com as contagens de agora"""
+    from projetos.models import RelatorioDiario
+
+    data = data or timezone.localdate()
+    snapshot, _ = RelatorioDiario.objects.update_or_create(data=data, defaults=contagens_atuais())
+    return snapshot
+
+
+def serie_snapshots(inicio, fim):
+    """Fotos de inicio a fim (inclusive) em arrays paralelos, numa única leitura pelo índice de data"""
+    from projetos.models import RelatorioDiario
+    from projetos.timeline import colunas
+
+    return colunas(
+        RelatorioDiario.objects.filter(data__range=(inicio, fim)).order_by('data'),
+        ['data', *CAMPOS_SNAPSHOT],
+    )
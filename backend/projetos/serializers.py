@@ -1,9 +1,33 @@
 from rest_framework import serializers
-from projetos.models import Projeto, ParticipacaoProjeto
+from projetos.models import (
+    Projeto,
+    ParticipacaoProjeto,
+    ProjetoArquivado,
+    ParticipacaoArquivada,
+    EquipeArquivada,
+    TarefaArquivada,
+)
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch, prefetch_related_objects
 
 User = get_user_model()
 
+
+def prefetch_projeto():
+    """
+    Relacionamentos de muitos que o ProjetoSerializer lê: participantes em ordem
+    de id (como na listagem rápida) e a participação do líder com o usuário.
+    """
+    return [
+        Prefetch('participantes', queryset=User.objects.order_by('id')),
+        Prefetch(
+            'participacaoprojeto_set',
+            queryset=ParticipacaoProjeto.objects.filter(is_leader=True).select_related('usuario').order_by('usuario_id'),
+            to_attr='participacoes_lider',
+        ),
+    ]
+
+
 class ProjetoSerializer(serializers.ModelSerializer):
     participantes = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     participantes_detalhes = serializers.SerializerMethodField()
@@ -14,7 +38,19 @@ class ProjetoSerializer(serializers.ModelSerializer):
     class Meta: 
         model = Projeto
         fields = '__all__'
-        read_only_fields = ['participantes', 'created_by']
+        read_only_fields = ['participantes', 'created_by', 'updated_at', 'versao']
+
+    def to_representation(self, instance):
+        # Objeto sem o prefetch (create, ou update, que limpa o cache): busca uma
+        # vez para participantes e participantes_detalhes, e o líder junto
+        em_cache = getattr(instance, '_prefetched_objects_cache', {})
+        faltando = [
+            prefetch for prefetch in prefetch_projeto()
+            if not (hasattr(instance, prefetch.to_attr) if prefetch.to_attr else prefetch.prefetch_to in em_cache)
+        ]
+        if faltando:
+            prefetch_related_objects([instance], *faltando)
+        return super().to_representation(instance)
     
     def get_criado_por(self, obj):
         if obj.created_by:
@@ -50,16 +86,16 @@ class ProjetoSerializer(serializers.ModelSerializer):
         return None
     
     def get_lider_detalhes(self, obj):
-        try:
-            participacao_lider = ParticipacaoProjeto.objects.get(projeto=obj, is_leader=True)
-            return {
-                'id': participacao_lider.usuario.id,
-                'nome': participacao_lider.usuario.nome,
-                'username': participacao_lider.usuario.username,
-                'email': participacao_lider.usuario.email
-            }
-        except ParticipacaoProjeto.DoesNotExist:
+        # Vem do prefetch (prefetch_projeto), sem consulta por projeto
+        if not obj.participacoes_lider:
             return None
+        lider = obj.participacoes_lider[0].usuario
+        return {
+            'id': lider.id,
+            'nome': lider.nome,
+            'username': lider.username,
+            'email': lider.email
+        }
         
     def validate(self, data):
         data_inicio = data.get('data_inicio', getattr(self.instance, 'data_inicio', None))
@@ -69,4 +105,42 @@ class ProjetoSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({
                 "data_fim_prevista": "A data para o fim deste projeto não pode ser menor que a data de início. Por favor, troque a data"
             })
-        return data 
\ No newline at end of file
+        return data 
+
+class ParticipacaoArquivadaSerializer(serializers.ModelSerializer):
+    usuario_nome = serializers.CharField(source='usuario.nome', read_only=True)
+
+    class Meta:
+        model = ParticipacaoArquivada
+        fields = ['id_original', 'usuario', 'usuario_nome', 'data_entrada', 'data_saida', 'ativo', 'is_leader']
+
+
+class EquipeArquivadaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EquipeArquivada
+        fields = ['id_original', 'nome', 'descricao', 'lider', 'membros', 'data_criacao']
+
+
+class TarefaArquivadaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TarefaArquivada
+        fields = [
+            'id_original', 'titulo', 'descricao', 'status', 'prioridade',
+            'equipe_id_original', 'responsavel', 'data_inicio', 'data_fim_prevista'
+        ]
+
+
+class ProjetoArquivadoSerializer(serializers.ModelSerializer):
+    """Serializer somente leitura do projeto arquivado com todo o grafo dele"""
+    participacoes = ParticipacaoArquivadaSerializer(many=True, read_only=True)
+    equipes = EquipeArquivadaSerializer(many=True, read_only=True)
+    tarefas = TarefaArquivadaSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ProjetoArquivado
+        fields = [
+            'id', 'id_original', 'nome', 'descricao', 'data_inicio', 'data_fim_prevista',
+            'status', 'is_public', 'professor', 'created_by', 'arquivado_em',
+            'participacoes', 'equipes', 'tarefas',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,314 @@
+import datetime
+from unittest import mock
+
+from django.utils import timezone
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from DevLab.orcamento_consultas import ListagemRapidaMixin, OrcamentoConsultasMixin, rota
+from equipe.models import Equipe
+from projetos.arquivamento import arquivar_projetos, restaurar_projeto
+from projetos.carga import CargaEstudantes
+from projetos.models import ParticipacaoProjeto, Projeto, ProjetoArquivado
+from sincronizacao.models import Exclusao
+from tarefas.historico import registrar_criacao, registrar_transicao
+from tarefas.models import BurndownDiario, HistoricoStatusTarefa, MetricaTarefa, Tarefas
+from usuarios.models import Usuario
+
+
+class ListagemRapidaProjetosTest(ListagemRapidaMixin, TestCase):
+
+    urls_listagem = [
+        '/api/projetos/publicos/?tamanho=100',
+        '/api/projetos/publicos/?tamanho=3&page=2',
+        '/api/projetos/?tamanho=100',
+        '/api/projetos/?status=em_andamento&ordering=-nome',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario_listagem = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='000.000.000-00', tipo_usuario='coordenador'
+        )
+        professor = Usuario.objects.create_user(
+            'prof', 'prof@devlab.com', 'senha', nome='Professora', cpf='222.222.222-22', tipo_usuario='professor'
+        )
+        estudantes = [
+            Usuario.objects.create_user(
+                f'aluno{i}', f'aluno{i}@devlab.com', 'senha', nome=f'Aluno {i}', cpf=f'111.111.111-{i:02d}',
+                tipo_usuario='estudante'
+            )
+            for i in range(3)
+        ]
+        for i in range(8):
+            projeto = Projeto.objects.create(
+                nome=f'Projeto {i} ção', descricao='Descrição "longa"', created_by=cls.usuario_listagem if i % 3 else None,
+                professor=professor if i % 2 else None, is_public=i % 4 != 0,
+                data_inicio=timezone.localdate() + datetime.timedelta(days=i * 7),
+                data_fim_prevista=None if i % 3 == 0 else timezone.localdate() + datetime.timedelta(days=365),
+                status=[Projeto.STATUS_NAO_INICIADO, Projeto.STATUS_ANDAMENTO][i % 2],
+            )
+            # Participações criadas fora de ordem de id; uma inativa e um líder em alguns projetos
+            for j, estudante in enumerate(reversed(estudantes[: i % 4])):
+                ParticipacaoProjeto.objects.create(
+                    projeto=projeto, usuario=estudante, ativo=j != 1, is_leader=(j == 0 and i % 2 == 0)
+                )
+
+
+class OrcamentoConsultasProjetosTest(OrcamentoConsultasMixin, TestCase):
+    """Consultas por rota de projetos, relatórios e atividades (DevLab/orcamento_consultas.py)"""
+
+    rotas = [
+        rota('get', '/api/projetos/', 3),
+        rota('get', '/api/projetos/', 4, LISTAGEM_RAPIDA=False),
+        rota('get', '/api/projetos/?updated_since={desde}', 5),
+        rota('get', '/api/projetos/{projeto}/', 3),
+        rota('get', '/api/projetos/publicos/', 3),
+        rota('get', '/api/projetos/publicos/', 4, LISTAGEM_RAPIDA=False),
+        rota('get', '/api/projetos/{projeto}/equipes/', 3),
+        rota('get', '/api/projetos/{projeto}/participantes/', 2),
+        rota('get', '/api/projetos/{projeto}/dashboard/', 5),
+        rota('get', '/api/projetos/{projeto}/tarefas/', 3),
+        rota('get', '/api/projetos/{projeto}/fluxo/', 3),
+        rota('get', '/api/projetos/timeline/?inicio=2020-01-01&fim=2040-01-01', 1),
+        rota('get', '/api/projetos/{projeto}/timeline/?inicio=2020-01-01&fim=2040-01-01', 2),
+        rota('get', '/api/projetos/relatorios/', 17),
+        rota('get', '/api/projetos/relatorios/series/', 1),
+        rota('get', '/api/relatorios/carga/?projeto={projeto}', 5),
+        rota('get', '/api/projetos-arquivados/', 6),
+        rota('get', '/api/projetos-arquivados/{arquivado}/', 5),
+        rota('post', '/api/projetos-arquivados/{arquivado}/restaurar/', 26),
+        rota('get', '/api/atividades/projetos/{projeto}/', 1),
+        rota('post', '/api/projetos/', 6, {'nome': 'Novo', 'descricao': 'Descrição', 'data_inicio': '2030-01-01'}),
+        rota('put', '/api/projetos/{projeto}/', 8, {
+            'nome': 'Outro nome', 'descricao': 'Nova descrição', 'data_inicio': '2030-01-01', 'status': 'em_andamento',
+        }),
+        rota('patch', '/api/projetos/{projeto}/', 8, {'descricao': 'Nova descrição'}),
+        rota('post', '/api/projetos/{projeto}/add_participante/', 6, {'usuario_id': '{novo}'}),
+        rota('post', '/api/projetos/{projeto}/definir-lider/', 7, {'usuario_id': '{outro_estudante}'}),
+        rota('post', '/api/projetos/{projeto}/definir-professor/', 10, {'professor_id': '{professor}'}),
+        rota('post', '/api/projetos/{projeto}/formar-equipes/?simular=1', 9, {'quantidade': 1}),
+        rota('post', '/api/projetos/{projeto}/formar-equipes/', 13, {'quantidade': 1}),
+        rota('post', '/api/projetos/{projeto}/tarefas/', 14, {'titulo': 'Nova', 'data_inicio': '2030-01-01'}),
+        rota('delete', '/api/projetos/{projeto}/', 19),
+    ]
+
+
+class CargaEstudantesTest(TestCase):
+    """Matriz de carga e candidatos (projetos/carga.py); pesos padrão: projeto 3, equipe 2, tarefa 1"""
+
+    @classmethod
+    def setUpTestData(cls):
+        hoje = timezone.localdate()
+        cls.a, cls.b, cls.c, cls.d = [
+            Usuario.objects.create_user(
+                f'aluno{i}', f'aluno{i}@devlab.com', 'senha', nome=f'Aluno {i}', cpf=f'cpf-{i}', tipo_usuario='estudante'
+            )
+            for i in range(4)
+        ]
+        cls.projeto = Projeto.objects.create(nome='Ativo', descricao='D', data_inicio=hoje)
+        cls.outro = Projeto.objects.create(nome='Outro', descricao='D', data_inicio=hoje)
+        concluido = Projeto.objects.create(
+            nome='Concluído', descricao='D', data_inicio=hoje, status=Projeto.STATUS_CONCLUIDO
+        )
+        # a: participa e está em equipe do projeto, com 2 tarefas abertas (1 concluída não conta)
+        # b: participa do projeto, sem equipe; c: só do outro, com 1 tarefa sem projeto
+        # d: participação inativa no projeto e ativa num concluído (nenhuma conta)
+        for usuario, projeto, ativo in (
+            (cls.a, cls.projeto, True), (cls.b, cls.projeto, True), (cls.c, cls.outro, True),
+            (cls.d, cls.projeto, False), (cls.d, concluido, True),
+        ):
+            ParticipacaoProjeto.objects.create(projeto=projeto, usuario=usuario, ativo=ativo)
+        cls.equipe = Equipe.objects.create(nome='E', projeto=cls.projeto, lider=cls.a)
+        cls.equipe.membros.add(cls.a)
+        for status in ('nao_iniciado', 'em_andamento', 'concluida'):
+            Tarefas.objects.create(titulo=status, projeto=cls.projeto, responsavel=cls.a, status=status, data_inicio=hoje)
+        Tarefas.objects.create(titulo='Solta', responsavel=cls.c, data_inicio=hoje)
+
+    def ids(self, carga, indices):
+        return carga.estudantes[indices].tolist()
+
+    def test_totais_e_matriz(self):
+        carga = CargaEstudantes()
+        self.assertEqual(carga.totais(), {
+            'estudante_id': [self.a.id, self.b.id, self.c.id, self.d.id],
+            'projetos': [1, 1, 1, 0],
+            'equipes': [1, 0, 0, 0],
+            'tarefas_abertas': [2, 0, 1, 0],
+            'carga': [7, 3, 4, 0],
+        })
+        self.assertEqual(carga.matriz(), {
+            'estudante_id': [self.a.id, self.b.id, self.c.id],
+            'projeto_id': [self.projeto.id, self.projeto.id, self.outro.id],
+            'equipes': [1, 0, 0],
+            'tarefas_abertas': [2, 0, 0],
+        })
+
+    def test_candidatos(self):
+        carga = CargaEstudantes()
+        # Quem já participa (mesmo inativo) fica de fora; menor carga primeiro
+        self.assertEqual(self.ids(carga, carga.candidatos(self.projeto.id)), [self.c.id])
+        self.assertEqual(self.ids(carga, carga.candidatos(self.outro.id)), [self.d.id, self.b.id, self.a.id])
+        self.assertEqual(self.ids(carga, carga.candidatos(self.outro.id, limite=2)), [self.d.id, self.b.id])
+        # Para equipe: participantes ativos sem equipe no projeto
+        self.assertEqual(self.ids(carga, carga.candidatos(self.projeto.id, para='equipe')), [self.b.id])
+
+    def test_estudante_criado_entre_as_consultas(self):
+        filtrar = Equipe.membros.through.objects.filter
+
+        def criar_no_meio(*args, **kwargs):
+            novo = Usuario.objects.create_user(
+                'novo', 'novo@devlab.com', 'senha', nome='Novo', cpf='cpf-novo', tipo_usuario='estudante'
+            )
+            ParticipacaoProjeto.objects.create(projeto=self.projeto, usuario=novo)
+            self.equipe.membros.add(novo)
+            Tarefas.objects.create(titulo='T', projeto=self.projeto, responsavel=novo, data_inicio=timezone.localdate())
+            return filtrar(*args, **kwargs)
+
+        with mock.patch.object(Equipe.membros.through.objects, 'filter', side_effect=criar_no_meio):
+            carga = CargaEstudantes()
+        self.assertEqual(carga.totais()['carga'], [7, 3, 4, 0])
+        self.assertEqual(len(carga.matriz()['estudante_id']), 3)
+        self.assertEqual(CargaEstudantes().totais()['carga'], [7, 3, 4, 0, 6])
+
+
+class ArquivamentoTest(TestCase):
+    """Arquivar e restaurar (projetos/arquivamento.py) mantendo os ids originais"""
+
+    def setUp(self):
+        hoje = timezone.localdate()
+        self.a, self.b = [
+            Usuario.objects.create_user(
+                f'aluno{i}', f'aluno{i}@devlab.com', 'senha', nome=f'Aluno {i}', cpf=f'cpf-{i}', tipo_usuario='estudante'
+            )
+            for i in range(2)
+        ]
+        self.velho = Projeto.objects.create(
+            nome='Velho', descricao='D', data_inicio=hoje, status=Projeto.STATUS_CONCLUIDO
+        )
+        Projeto.objects.filter(pk=self.velho.pk).update(data_inicio=hoje - datetime.timedelta(days=800))
+        self.ativo = Projeto.objects.create(nome='Ativo', descricao='D', data_inicio=hoje)
+        self.participacoes = [
+            ParticipacaoProjeto.objects.create(projeto=self.velho, usuario=usuario, is_leader=usuario == self.a)
+            for usuario in (self.a, self.b)
+        ]
+        self.equipe = Equipe.objects.create(nome='E', projeto=self.velho, lider=self.a)
+        self.equipe.membros.add(self.a, self.b)
+        self.equipe_ativa = Equipe.objects.create(nome='Outra', projeto=self.ativo)
+        self.da_equipe = Tarefas.objects.create(titulo='Só da equipe', equipe=self.equipe, responsavel=self.a)
+        self.do_projeto = Tarefas.objects.create(
+            titulo='Do projeto', projeto=self.velho, equipe=self.equipe, responsavel=self.b, status='concluida'
+        )
+        # Ligada ao projeto arquivado, mas com a equipe de outro projeto, que não vai para o arquivo
+        self.equipe_de_fora = Tarefas.objects.create(
+            titulo='Equipe de fora', projeto=self.velho, equipe=self.equipe_ativa
+        )
+
+    def test_arquivar_e_restaurar(self):
+        self.assertEqual(arquivar_projetos(), 1)
+        self.assertFalse(Projeto.objects.filter(pk=self.velho.pk).exists())
+        self.assertFalse(Equipe.objects.filter(pk=self.equipe.pk).exists())
+        arquivado = ProjetoArquivado.objects.get(id_original=self.velho.pk)
+        self.assertEqual(arquivado.equipes.get().membros, [self.a.pk, self.b.pk])
+        self.assertEqual(arquivado.tarefas.count(), 3)
+
+        projeto = restaurar_projeto(arquivado)
+        self.assertEqual(projeto.pk, self.velho.pk)
+        self.assertFalse(ProjetoArquivado.objects.exists())
+        self.assertEqual(
+            set(ParticipacaoProjeto.objects.filter(projeto=projeto).values_list('pk', flat=True)),
+            {part.pk for part in self.participacoes},
+        )
+        equipe = Equipe.objects.get(pk=self.equipe.pk)
+        self.assertEqual((equipe.projeto_id, equipe.lider_id), (projeto.pk, self.a.pk))
+        self.assertEqual(set(equipe.membros.values_list('pk', flat=True)), {self.a.pk, self.b.pk})
+
+        tarefas = {t.pk: t for t in Tarefas.objects.filter(pk__in=[
+            self.da_equipe.pk, self.do_projeto.pk, self.equipe_de_fora.pk,
+        ])}
+        self.assertEqual((tarefas[self.da_equipe.pk].projeto_id, tarefas[self.da_equipe.pk].equipe_id),
+                         (None, self.equipe.pk))
+        self.assertEqual((tarefas[self.do_projeto.pk].projeto_id, tarefas[self.do_projeto.pk].status),
+                         (projeto.pk, 'concluida'))
+        # A equipe de fora não voltou com o projeto: a tarefa volta sem equipe
+        self.assertEqual((tarefas[self.equipe_de_fora.pk].projeto_id, tarefas[self.equipe_de_fora.pk].equipe_id),
+                         (projeto.pk, None))
+        self.assertTrue(Equipe.objects.filter(pk=self.equipe_ativa.pk).exists())
+
+        # Os ids voltaram: nenhum tombstone deles fica para a sincronização
+        self.assertFalse(Exclusao.objects.filter(objeto_id__in=[projeto.pk, equipe.pk], modelo__in=[
+            'projetos.projeto', 'equipe.equipe',
+        ]).exists())
+
+    def test_restaurar_com_lider_ocupado_e_usuario_removido(self):
+        arquivar_projetos()
+        # Depois do arquivamento o líder passou a liderar outra equipe e o b saiu do sistema
+        ParticipacaoProjeto.objects.create(projeto=self.ativo, usuario=self.a)
+        Equipe.objects.filter(pk=self.equipe_ativa.pk).update(lider=self.a)
+        self.b.delete()
+
+        restaurar_projeto(ProjetoArquivado.objects.get())
+        equipe = Equipe.objects.get(pk=self.equipe.pk)
+        self.assertIsNone(equipe.lider_id)
+        self.assertEqual(list(equipe.membros.values_list('pk', flat=True)), [self.a.pk])
+
+    def test_equipe_com_tarefa_de_outro_projeto_fica_fora(self):
+        de_outro = Tarefas.objects.create(titulo='Do ativo', projeto=self.ativo, equipe=self.equipe)
+        self.assertEqual(arquivar_projetos(), 0)
+        self.assertTrue(Projeto.objects.filter(pk=self.velho.pk).exists())
+        self.assertTrue(Tarefas.objects.filter(pk=de_outro.pk).exists())
+
+        # A tarefa saiu da equipe: o projeto volta a ser arquivável
+        Tarefas.objects.filter(pk=de_outro.pk).update(equipe=None)
+        self.assertEqual(arquivar_projetos(), 1)
+        self.assertEqual(Tarefas.objects.get(pk=de_outro.pk).projeto_id, self.ativo.pk)
+
+    def test_historico_metricas_e_burndown_voltam(self):
+        for tarefa in (self.da_equipe, self.do_projeto):
+            registrar_criacao(tarefa, usuario=self.a)
+        Tarefas.objects.filter(pk=self.da_equipe.pk).update(status='em_andamento')
+        self.da_equipe.refresh_from_db()
+        registrar_transicao(self.da_equipe, 'nao_iniciado', self.velho.pk, usuario=self.b)
+        HistoricoStatusTarefa.objects.update(criado_em=timezone.now() - datetime.timedelta(days=900))
+
+        def fotografar():
+            return (
+                list(HistoricoStatusTarefa.objects.order_by('tarefa_id', 'pk').values_list(
+                    'tarefa_id', 'status_anterior', 'status_novo', 'usuario_id', 'criado_em'
+                )),
+                list(MetricaTarefa.objects.order_by('pk').values()),
+                list(BurndownDiario.objects.order_by('data').values_list(
+                    'projeto_id', 'data', 'criadas', 'concluidas', 'reabertas', 'removidas', 'removidas_concluidas'
+                )),
+            )
+
+        antes = fotografar()
+        self.assertEqual([len(linhas) for linhas in antes], [3, 2, 1])
+        arquivar_projetos()
+        self.assertEqual(fotografar(), ([], [], []))
+
+        restaurar_projeto(ProjetoArquivado.objects.get())
+        self.assertEqual(fotografar(), antes)
+
+
+class RelatoriosTest(TestCase):
+    """Relatórios de projetos: só coordenadores, e sem login a resposta é 401 (não 500)"""
+
+    URLS = ('/api/projetos/relatorios/', '/api/projetos/relatorios/series/')
+
+    def test_permissoes(self):
+        estudante = Usuario.objects.create_user(
+            'aluno', 'aluno@devlab.com', 'senha', nome='Aluno', cpf='cpf-aluno', tipo_usuario='estudante'
+        )
+        coordenador = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='cpf-coord', tipo_usuario='coordenador'
+        )
+        cliente = APIClient()
+        for url in self.URLS:
+            with self.subTest(url=url):
+                cliente.force_authenticate(None)
+                self.assertEqual(cliente.get(url).status_code, 401)
+                cliente.force_authenticate(estudante)
+                self.assertEqual(cliente.get(url).status_code, 403)
+                cliente.force_authenticate(coordenador)
+                self.assertEqual(cliente.get(url).status_code, 200)
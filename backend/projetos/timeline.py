@@ -0,0 +1,29 @@
+"""
+Consultas de intervalo para a visão de linha do tempo (Gantt).
+
+Um item [data_inicio, data_fim_prevista] está ativo na janela [inicio, fim] quando
+    data_inicio <= fim  E  (data_fim_prevista >= inicio  OU  data_fim_prevista é nula)
+(fim nulo = item em aberto, que continua ativo). Os dois predicados usam o
+índice composto (data_inicio, data_fim_prevista) dos modelos.
+"""
+from django.db.models import Q
+
+
+def filtrar_intervalo(queryset, inicio, fim):
+    return queryset.filter(
+        Q(data_fim_prevista__gte=inicio) | Q(data_fim_prevista__isnull=True),
+        data_inicio__lte=fim,
+    )
+
+
+def colunas(queryset, campos):
+    """
+    Devolve os campos em arrays paralelos ({campo: [valores]}), que ficam bem
+    menores que uma lista de objetos quando são milhares de barras.
+    """
+    resultado = {campo: [] for campo in campos}
+    listas = [resultado[campo] for campo in campos]
+    for linha in queryset.values_list(*campos):
+        for lista, valor in zip(listas, linha):
+            lista.append(valor.isoformat() if hasattr(valor, 'isoformat') else valor)
+    return resultado
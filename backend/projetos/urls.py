@@ -1,7 +1,11 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from projetos.views import ProjetoViewSet
+from projetos.views import ProjetoViewSet, ProjetoArquivadoViewSet, CargaEstudantesView
 
 router = DefaultRouter()
 router.register(r'projetos', ProjetoViewSet, basename='projeto')
+router.register(r'projetos-arquivados', ProjetoArquivadoViewSet, basename='projeto-arquivado')
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('relatorios/carga/', CargaEstudantesView.as_view(), name='relatorio-carga'),
+] + router.urls
@@ -1,28 +1,75 @@
+import datetime
+
 from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.conf import settings
+from django.utils import timezone
 
-from projetos.models import Projeto, ParticipacaoProjeto
-from projetos.serializers import ProjetoSerializer
+from projetos.models import Projeto, ParticipacaoProjeto, ProjetoArquivado
+from projetos.serializers import ProjetoSerializer, ProjetoArquivadoSerializer, prefetch_projeto
+from projetos.projecoes import ProjecaoProjeto
+from projetos.arquivamento import restaurar_projeto
+from projetos.timeline import filtrar_intervalo, colunas
+from projetos.relatorios import relatorio_geral, serie_snapshots
+from projetos.carga import CargaEstudantes
+from projetos.formacao import ErroFormacao, planejar_equipes, criar_equipes
+from fila.fila import enfileirar
+from fila.views import resposta_job
+from usuarios.throttles import RelatoriosThrottle
+from atividades.buffer import registrar_atividade
+from atividades.models import Atividade
+from DevLab.concorrencia import ConcorrenciaOtimistaMixin
+from DevLab.projecao import ListagemRapidaMixin
+from DevLab.coalescencia import coalescer, chave_requisicao
+from sincronizacao.sinais import exclusoes_em_lote
+from sincronizacao.delta import (
+    SincronizacaoMixin, ler_cursor, cursor_expirado, proximo_cursor, ids_removidos,
+    resposta_cursor_invalido, resposta_cursor_expirado,
+)
 from equipe.models import Equipe
 from equipe.serializers import EquipeSerializer
 
 User = get_user_model()
 
+
+def com_relacionados(projetos):
+    """Relacionamentos que o ProjetoSerializer lê (ver prefetch_projeto)"""
+    return projetos.select_related('professor', 'created_by').prefetch_related(*prefetch_projeto())
+
+def e_criador(request, projeto):
+    # Compara pelo id: não precisa carregar o created_by
+    return projeto.created_by_id == request.user.pk
+
+
+def e_coordenador(request, projeto):
+    return request.user.tipo_usuario == 'coordenador'
+
+
 class IsCreatorOrReadOnly(permissions.BasePermission):
     """
     Permissão personalizada que permite apenas o criador do projeto modificá-lo.
+    As regras de cada action ficam declaradas em view.regras_por_acao, como
+    (checagem, mensagem); a primeira que falhar vira o 403 com a mensagem dela.
+    Actions de escrita sem regra declarada exigem o criador.
     """
+    regras_padrao = [(e_criador, 'Apenas o coordenador que criou o projeto pode gerenciá-lo.')]
+
     def has_object_permission(self, request, view, obj):
         # Permite leitura para todos
         if request.method in permissions.SAFE_METHODS:
             return True
-        
-        # Para escrita, verifica se é o criador
-        return obj.created_by == request.user
+
+        for checagem, mensagem in getattr(view, 'regras_por_acao', {}).get(view.action, self.regras_padrao):
+            if not checagem(request, obj):
+                self.message = mensagem
+                return False
+        return True
 
 class ProjetoPaginacao(PageNumberPagination):
     # Ele define quantos projetos vai ser retornado por página (o padrão e: 10)
@@ -32,11 +79,13 @@ class ProjetoPaginacao(PageNumberPagination):
     # Define o número máximo de itens que podem ser solicitados por página
     max_page_size = 100
     
-class ProjetoViewSet(viewsets.ModelViewSet):
+class ProjetoViewSet(SincronizacaoMixin, ListagemRapidaMixin, ConcorrenciaOtimistaMixin, viewsets.ModelViewSet):
     # Aqui ele decide o grupo de dados base para as consultas
     queryset = Projeto.objects.all()
     # Aquie le define qual serializer será usado para converter os dados
     serializer_class = ProjetoSerializer
+    # GET da listagem (e de /publicos/) sai direto do .values() (DevLab/projecao.py)
+    projecao_listagem = ProjecaoProjeto
     # Permissão personalizada: apenas o criador pode modificar
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsCreatorOrReadOnly]
     #Aqui ele define a classe de paginação customizadas
@@ -49,6 +98,34 @@ class ProjetoViewSet(viewsets.ModelViewSet):
     ordering_fields = ['data_inicio', 'data_fim_prevista', 'nome']
     # e por aqui temos a ordenação padrão (por data de início)
     ordering = ['data_inicio']
+    # Regras de escrita checadas no projeto já carregado (ver IsCreatorOrReadOnly)
+    regras_por_acao = {
+        'update': [(e_criador, 'Apenas o coordenador que criou o projeto pode modificá-lo.')],
+        'partial_update': [(e_criador, 'Apenas o coordenador que criou o projeto pode modificá-lo.')],
+        'destroy': [(e_criador, 'Apenas o coordenador que criou o projeto pode excluí-lo.')],
+        'definir_lider': [
+            (e_criador, 'Apenas o coordenador que criou o projeto pode gerenciá-lo.'),
+            (e_coordenador, 'Apenas coordenadores podem definir líderes.'),
+        ],
+        'definir_professor': [
+            (e_criador, 'Apenas o coordenador que criou o projeto pode gerenciá-lo.'),
+            (e_coordenador, 'Apenas coordenadores podem definir professores.'),
+        ],
+        'formar_equipes': [
+            (e_criador, 'Apenas o coordenador que criou o projeto pode gerenciá-lo.'),
+            (e_coordenador, 'Apenas coordenadores podem formar equipes.'),
+        ],
+    }
+    # Actions que serializam o projeto inteiro: só elas carregam professor, criador e participantes.
+    # No update o DRF limpa o cache do prefetch depois de salvar (o serializer busca de novo),
+    # então ali só vale o select_related
+    acoes_com_relacionados = ('list', 'retrieve', 'dashboard')
+    
+    def get_object(self):
+        # Um projeto por requisição: as actions e o super().update/destroy reaproveitam o mesmo objeto
+        if getattr(self, '_projeto', None) is None:
+            self._projeto = super().get_object()
+        return self._projeto
     
     def get_queryset(self):
         # Esse vai pegar o parâmetro 'status' da URL (se existir)
@@ -58,6 +135,10 @@ class ProjetoViewSet(viewsets.ModelViewSet):
         
         # E esse vai buscar todos os projetos inicialmente
         projetos = Projeto.objects.all()
+        if self.action in self.acoes_com_relacionados:
+            projetos = com_relacionados(projetos)
+        elif self.action in ('update', 'partial_update'):
+            projetos = projetos.select_related('professor', 'created_by')
         
         # Se quiser filtrar por participante (ex: /api/projetos/?participante=5)
         if participante_id:
@@ -72,38 +153,16 @@ class ProjetoViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         # Salva o projeto com o usuário logado como criador
         serializer.save(created_by=self.request.user)
-    
-    def update(self, request, *args, **kwargs):
-        projeto = self.get_object()
-        if projeto.created_by != request.user:
-            return Response(
-                {'detail': 'Apenas o coordenador que criou o projeto pode modificá-lo.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        return super().update(request, *args, **kwargs)
-    
-    def partial_update(self, request, *args, **kwargs):
-        projeto = self.get_object()
-        if projeto.created_by != request.user:
-            return Response(
-                {'detail': 'Apenas o coordenador que criou o projeto pode modificá-lo.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        return super().partial_update(request, *args, **kwargs)
-    
-    def destroy(self, request, *args, **kwargs):
-        projeto = self.get_object()
-        if projeto.created_by != request.user:
-            return Response(
-                {'detail': 'Apenas o coordenador que criou o projeto pode excluí-lo.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        return super().destroy(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        # O CASCADE leva participações, equipes e tarefas: tombstones num INSERT só
+        with exclusoes_em_lote():
+            instance.delete()
     
     @action(detail=True, methods=['get'])
     def equipes(self, request, pk=None):
         projeto = self.get_object()
-        equipes = projeto.equipes.all()
+        equipes = projeto.equipes.select_related('projeto', 'lider').prefetch_related('membros')
         serializer = EquipeSerializer(equipes, many=True)
         return Response(serializer.data)
     
@@ -111,6 +170,18 @@ class ProjetoViewSet(viewsets.ModelViewSet):
     def participantes(self, request, pk=None):
         projeto = self.get_object()
         participacoes = ParticipacaoProjeto.objects.filter(projeto=projeto).select_related('usuario')
+
+        # Sincronização incremental: só as participações alteradas depois do cursor
+        desde = None
+        if 'updated_since' in request.query_params:
+            try:
+                desde = ler_cursor(request.query_params['updated_since'])
+            except ValueError:
+                return resposta_cursor_invalido()
+            if cursor_expirado(desde):
+                return resposta_cursor_expirado()
+            cursor = proximo_cursor()
+            participacoes = participacoes.filter(updated_at__gt=desde)
         
         data = []
         for part in participacoes:
@@ -123,31 +194,38 @@ class ProjetoViewSet(viewsets.ModelViewSet):
                 'data_entrada': part.data_entrada,
                 'data_saida': part.data_saida,
                 'ativo': part.ativo,
+                'participacao_id': part.id,
+                'updated_at': part.updated_at,
+            })
+
+        if desde is not None:
+            return Response({
+                'results': data,
+                # Ids de participação (campo participacao_id de cada item)
+                'removidos': ids_removidos(ParticipacaoProjeto, desde, projeto_id=projeto.pk),
+                'cursor': cursor,
             })
         
         return Response(data)
     
     @action(detail=True, methods=['post'])
     def add_participante(self, request, pk=None):
+        # O criador já foi checado no get_object (regras_por_acao)
         projeto = self.get_object()
         usuario_id = request.data.get('usuario_id')
         
-        # Verifica se o usuário logado é o criador do projeto
-        if projeto.created_by != request.user:
-            return Response(
-                {'detail': 'Apenas o coordenador que criou o projeto pode gerenciá-lo.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
         if not usuario_id:
             return Response(
                 {'detail': 'usuario_id é obrigatório.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # O usuário e "já participa?" vêm na mesma consulta
         try:
-            usuario = User.objects.get(pk=usuario_id)
-        except User.DoesNotExist:
+            usuario = User.objects.annotate(
+                ja_participa=Exists(ParticipacaoProjeto.objects.filter(projeto=projeto, usuario=OuterRef('pk')))
+            ).get(pk=usuario_id)
+        except (User.DoesNotExist, ValueError):
             return Response(
                 {'detail': 'Usuário não encontrado.'},
                 status=status.HTTP_404_NOT_FOUND
@@ -161,7 +239,7 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             )
         
         # Verifica se já participa
-        if ParticipacaoProjeto.objects.filter(projeto=projeto, usuario=usuario).exists():
+        if usuario.ja_participa:
             return Response(
                 {'detail': 'Usuário já participa deste projeto.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -173,16 +251,90 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             usuario=usuario,
             ativo=True
         )
+        registrar_atividade(
+            Atividade.TIPO_PARTICIPANTE_ADICIONADO, usuario=request.user,
+            projeto_id=projeto.id, objeto_id=usuario.id
+        )
         
         return Response(
             {'detail': f'Usuário {usuario.username} adicionado ao projeto com sucesso.'},
             status=status.HTTP_201_CREATED
         )
     
+    @action(detail=True, methods=['post'], url_path='formar-equipes')
+    def formar_equipes(self, request, pk=None):
+        """
+        Divide os participantes ativos sem equipe em `quantidade` equipes
+        equilibradas (tamanho e carga), ver projetos/formacao.py.
+        Body: {"quantidade": 4, "juntos": [[1, 2]], "separados": [[3, 4]], "prefixo": "Equipe"}
+        Com ?simular=1 só devolve o plano, sem gravar.
+        """
+        # Criador e coordenador já foram checados no get_object (regras_por_acao)
+        projeto = self.get_object()
+        try:
+            quantidade = int(request.data.get('quantidade'))
+        except (TypeError, ValueError):
+            return Response(
+                {'detail': 'quantidade é obrigatória e deve ser um número.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        prefixo = str(request.data.get('prefixo') or 'Equipe').strip()[:180]
+
+        try:
+            plano = planejar_equipes(
+                projeto, quantidade,
+                juntos=request.data.get('juntos') or [],
+                separados=request.data.get('separados') or [],
+                prefixo=prefixo,
+            )
+        except ErroFormacao as erro:
+            return Response({'detail': str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+
+        usuarios = {
+            usuario['id']: usuario
+            for usuario in User.objects.filter(
+                pk__in=[i for item in plano for i in item['membros']]
+            ).values('id', 'username', 'nome')
+        }
+        resposta = [
+            {
+                'nome': item['nome'],
+                'lider': item['lider'],
+                'carga': item['carga'],
+                'membros': [usuarios[i] for i in item['membros']],
+            }
+            for item in plano
+        ]
+
+        if request.query_params.get('simular') in ('1', 'true'):
+            return Response({'simulacao': True, 'equipes': resposta})
+
+        try:
+            equipes = criar_equipes(projeto, plano)
+        except IntegrityError:
+            # Outra requisição criou uma equipe com o mesmo nome ou líder entre o plano e a gravação
+            return Response(
+                {'detail': 'As equipes mudaram durante a formação. Tente novamente.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        for equipe, item in zip(equipes, resposta):
+            item['id'] = equipe.pk
+        registrar_atividade(
+            Atividade.TIPO_EQUIPES_FORMADAS, usuario=request.user,
+            projeto_id=projeto.id, total=len(equipes)
+        )
+        return Response(
+            {'detail': f'{len(equipes)} equipe(s) formada(s).', 'simulacao': False, 'equipes': resposta},
+            status=status.HTTP_201_CREATED
+        )
+
     @action(detail=True, methods=['get'])
     def dashboard(self, request, pk=None):
         projeto = self.get_object()
-        
+        # Leitura liberada para todos (IsCreatorOrReadOnly): quem abre ao mesmo tempo divide o cálculo
+        return Response(coalescer(chave_requisicao(request, 'publico'), lambda: self._dados_dashboard(projeto)))
+
+    def _dados_dashboard(self, projeto):
         # Dados do projeto
         projeto_data = ProjetoSerializer(projeto).data
         
@@ -224,7 +376,7 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             'total_participantes': projeto.participantes.count()
         }
         
-        return Response(dashboard_data)
+        return dashboard_data
     
     @action(detail=True, methods=['get', 'post'])
     def tarefas(self, request, pk=None):
@@ -235,59 +387,121 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             from tarefas.models import Tarefas
             from tarefas.serializers import TarefaSerializer
             
-            tarefas = Tarefas.objects.filter(projeto=projeto)
+            from tarefas.views import TarefaViewSet
+
+            # Mesmo select/prefetch da listagem de tarefas: sem consulta por tarefa
+            tarefas = TarefaViewSet.queryset.filter(projeto=projeto)
             serializer = TarefaSerializer(tarefas, many=True)
             return Response(serializer.data)
         
         elif request.method == 'POST':
-            # Verifica se o usuário logado é o criador do projeto
-            if projeto.created_by != request.user:
-                return Response(
-                    {'detail': 'Apenas o coordenador que criou o projeto pode gerenciá-lo.'},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
+            # O criador já foi checado no get_object (regras_por_acao)
             from tarefas.serializers import TarefaSerializer
             
-            # Adiciona o projeto aos dados
+            # O projeto já carregado vai pelo contexto (o serializer não busca de novo pelo id)
             data = request.data.copy()
-            data['projeto'] = projeto.id
+            data.pop('projeto', None)
             
-            serializer = TarefaSerializer(data=data)
+            serializer = TarefaSerializer(data=data, context={'request': request, 'projeto': projeto})
             if serializer.is_valid():
-                serializer.save()
+                from tarefas.historico import registrar_criacao
+                with transaction.atomic():
+                    serializer.save(projeto=projeto)
+                    registrar_criacao(serializer.instance, usuario=request.user)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=True, methods=['get'])
+    def fluxo(self, request, pk=None):
+        """
+        Métricas de fluxo das tarefas do projeto: burndown diário (arrays paralelos)
+        e lead/cycle time das tarefas concluídas.
+        Parâmetros opcionais: ?inicio=AAAA-MM-DD&fim=AAAA-MM-DD (recorte do burndown)
+        """
+        from django.utils.dateparse import parse_date
+        from tarefas.historico import serie_burndown, tempos_de_fluxo
+
+        projeto = self.get_object()
+        inicio = parse_date(request.query_params.get('inicio', ''))
+        fim = parse_date(request.query_params.get('fim', ''))
+
+        return Response({
+            'projeto': projeto.id,
+            'burndown': serie_burndown(projeto.id, inicio=inicio, fim=fim),
+            **tempos_de_fluxo(projeto.id),
+        })
+    
+    @action(detail=False, methods=['get'], url_path='timeline')
+    def timeline(self, request):
+        """
+        Projetos ativos na janela ?inicio=AAAA-MM-DD&fim=AAAA-MM-DD, em arrays paralelos.
+        Aceita os mesmos filtros da listagem (status, participante).
+        """
+        inicio, fim, erro = self._janela_timeline(request)
+        if erro:
+            return erro
+
+        projetos = filtrar_intervalo(self.get_queryset(), inicio, fim)
+        return Response({
+            'inicio': inicio,
+            'fim': fim,
+            **colunas(projetos, ['id', 'nome', 'data_inicio', 'data_fim_prevista', 'status']),
+        })
+    
+    @action(detail=True, methods=['get'], url_path='timeline')
+    def timeline_tarefas(self, request, pk=None):
+        """Tarefas do projeto ativas na janela ?inicio=...&fim=..., em arrays paralelos"""
+        from tarefas.models import Tarefas
+
+        inicio, fim, erro = self._janela_timeline(request)
+        if erro:
+            return erro
+
+        projeto = self.get_object()
+        tarefas = filtrar_intervalo(Tarefas.objects.filter(projeto=projeto), inicio, fim).order_by('data_inicio', 'id')
+        return Response({
+            'projeto': projeto.id,
+            'inicio': inicio,
+            'fim': fim,
+            **colunas(tarefas, ['id', 'titulo', 'data_inicio', 'data_fim_prevista', 'status', 'responsavel_id']),
+        })
+    
+    def _janela_timeline(self, request):
+        from django.utils.dateparse import parse_date
+
+        try:
+            inicio = parse_date(request.query_params.get('inicio', ''))
+            fim = parse_date(request.query_params.get('fim', ''))
+        except ValueError:
+            inicio = fim = None
+        if not inicio or not fim or fim < inicio:
+            return None, None, Response(
+                {'detail': 'Informe inicio e fim válidos (AAAA-MM-DD), com fim >= inicio.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return inicio, fim, None
+    
     @action(detail=True, methods=['post'], url_path='definir-lider')
     def definir_lider(self, request, pk=None):
         """Define um estudante como líder da equipe do projeto (apenas coordenador criador)"""
+        # Criador e coordenador já foram checados no get_object (regras_por_acao)
         projeto = self.get_object()
         usuario_id = request.data.get('usuario_id')
         
-        # Verifica se o usuário logado é o criador do projeto
-        if projeto.created_by != request.user:
-            return Response(
-                {'detail': 'Apenas o coordenador que criou o projeto pode gerenciá-lo.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        # Verifica se o usuário logado é coordenador
-        if request.user.tipo_usuario != 'coordenador':
-            return Response(
-                {'detail': 'Apenas coordenadores podem definir líderes.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
         if not usuario_id:
             return Response(
                 {'detail': 'usuario_id é obrigatório.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Caminho comum: a participação ativa já traz o usuário (uma consulta só).
+        # Sem participação, busca o usuário só pra dar o erro certo.
         try:
-            usuario = User.objects.get(pk=usuario_id)
-        except User.DoesNotExist:
+            participacao = ParticipacaoProjeto.objects.select_related('usuario').filter(
+                projeto=projeto, usuario_id=usuario_id, ativo=True
+            ).first()
+            usuario = participacao.usuario if participacao else User.objects.get(pk=usuario_id)
+        except (User.DoesNotExist, ValueError):
             return Response(
                 {'detail': 'Usuário não encontrado.'},
                 status=status.HTTP_404_NOT_FOUND
@@ -301,20 +515,25 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             )
         
         # Verifica se o usuário participa do projeto
-        try:
-            participacao = ParticipacaoProjeto.objects.get(projeto=projeto, usuario=usuario, ativo=True)
-        except ParticipacaoProjeto.DoesNotExist:
+        if participacao is None:
             return Response(
                 {'detail': 'O usuário deve participar do projeto para ser líder.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         # Remove líder anterior
-        ParticipacaoProjeto.objects.filter(projeto=projeto, is_leader=True).update(is_leader=False)
+        # update() não passa pelo auto_now, então o updated_at vai junto
+        ParticipacaoProjeto.objects.filter(projeto=projeto, is_leader=True).update(
+            is_leader=False, updated_at=timezone.now()
+        )
         
         # Define novo líder
         participacao.is_leader = True
         participacao.save()
+        registrar_atividade(
+            Atividade.TIPO_LIDER_PROJETO, usuario=request.user,
+            projeto_id=projeto.id, objeto_id=usuario.id
+        )
         
         return Response({
             'detail': f'{usuario.nome} foi definido como líder do projeto.',
@@ -329,23 +548,10 @@ class ProjetoViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='definir-professor')
     def definir_professor(self, request, pk=None):
         """Define o professor orientador do projeto (apenas coordenador criador)"""
+        # Criador e coordenador já foram checados no get_object (regras_por_acao)
         projeto = self.get_object()
         professor_id = request.data.get('professor_id')
         
-        # Verifica se o usuário logado é o criador do projeto
-        if projeto.created_by != request.user:
-            return Response(
-                {'detail': 'Apenas o coordenador que criou o projeto pode gerenciá-lo.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
-        # Verifica se o usuário logado é coordenador
-        if request.user.tipo_usuario != 'coordenador':
-            return Response(
-                {'detail': 'Apenas coordenadores podem definir professores.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        
         if not professor_id:
             return Response(
                 {'detail': 'professor_id é obrigatório.'},
@@ -382,6 +588,11 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             # Se der erro ao adicionar como participante, continua mas loga o erro
             print(f"Erro ao adicionar professor como participante: {str(e)}")
         
+        registrar_atividade(
+            Atividade.TIPO_PROFESSOR_PROJETO, usuario=request.user,
+            projeto_id=projeto.id, objeto_id=professor.id
+        )
+        
         return Response({
             'detail': f'Professor {professor.nome} foi definido como orientador do projeto.',
             'professor': {
@@ -392,9 +603,13 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             }
         })
     
-    @action(detail=False, methods=['get'], url_path='relatorios')
+    @action(detail=False, methods=['get'], url_path='relatorios',
+            permission_classes=[permissions.IsAuthenticated], throttle_classes=[RelatoriosThrottle])
     def relatorios(self, request):
-        """Retorna estatísticas gerais de participação (apenas coordenadores)"""
+        """
+        Retorna estatísticas gerais de participação (apenas coordenadores).
+        Com ?assincrono=1 o relatório é gerado pela fila (resposta 202 com o job).
+        """
         # Verifica se o usuário é coordenador
         if request.user.tipo_usuario != 'coordenador':
             return Response(
@@ -402,95 +617,44 @@ class ProjetoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        from tarefas.models import Tarefas
-        
-        # Estatísticas de projetos
-        total_projetos = Projeto.objects.count()
-        projetos_em_andamento = Projeto.objects.filter(status='em_andamento').count()
-        projetos_concluidos = Projeto.objects.filter(status='concluido').count()
-        projetos_planejamento = Projeto.objects.filter(status='planejamento').count()
-        projetos_cancelados = Projeto.objects.filter(status='cancelado').count()
-        
-        # Estatísticas de usuários
-        total_estudantes = User.objects.filter(tipo_usuario='estudante').count()
-        total_professores = User.objects.filter(tipo_usuario='professor').count()
-        total_coordenadores = User.objects.filter(tipo_usuario='coordenador').count()
-        
-        # Estudantes participando de projetos
-        estudantes_ativos = ParticipacaoProjeto.objects.filter(
-            ativo=True,
-            usuario__tipo_usuario='estudante'
-        ).values('usuario').distinct().count()
-        
-        # Estatísticas de tarefas
-        total_tarefas = Tarefas.objects.count()
-        tarefas_pendentes = Tarefas.objects.filter(status='pendente').count()
-        tarefas_em_andamento = Tarefas.objects.filter(status='em_andamento').count()
-        tarefas_concluidas = Tarefas.objects.filter(status='concluida').count()
-        
-        # Projetos por coordenador
-        projetos_por_coordenador = Projeto.objects.values(
-            'created_by__nome', 'created_by__id'
-        ).annotate(
-            total=Count('id')
-        ).order_by('-total')[:10]  # Top 10 coordenadores
-        
-        # Professores mais ativos (com mais projetos)
-        professores_ativos = Projeto.objects.filter(
-            professor__isnull=False
-        ).values(
-            'professor__nome', 'professor__id'
-        ).annotate(
-            total_projetos=Count('id')
-        ).order_by('-total_projetos')[:10]
-        
-        # Estudantes mais participativos
-        estudantes_participativos = ParticipacaoProjeto.objects.filter(
-            ativo=True,
-            usuario__tipo_usuario='estudante'
-        ).values(
-            'usuario__nome', 'usuario__id'
-        ).annotate(
-            total_projetos=Count('projeto', distinct=True)
-        ).order_by('-total_projetos')[:10]
-        
-        # Total de participações ativas
-        total_participacoes = ParticipacaoProjeto.objects.filter(ativo=True).count()
-        
-        return Response({
-            'projetos': {
-                'total': total_projetos,
-                'em_andamento': projetos_em_andamento,
-                'concluidos': projetos_concluidos,
-                'planejamento': projetos_planejamento,
-                'cancelados': projetos_cancelados,
-            },
-            'usuarios': {
-                'total_estudantes': total_estudantes,
-                'estudantes_ativos': estudantes_ativos,
-                'total_professores': total_professores,
-                'total_coordenadores': total_coordenadores,
-            },
-            'tarefas': {
-                'total': total_tarefas,
-                'pendentes': tarefas_pendentes,
-                'em_andamento': tarefas_em_andamento,
-                'concluidas': tarefas_concluidas,
-            },
-            'rankings': {
-                'projetos_por_coordenador': list(projetos_por_coordenador),
-                'professores_ativos': list(professores_ativos),
-                'estudantes_participativos': list(estudantes_participativos),
-            },
-            'participacoes': {
-                'total_participacoes_ativas': total_participacoes,
-            }
-        })
+        if request.query_params.get('assincrono') in ('1', 'true'):
+            job = enfileirar('relatorio_geral', usuario=request.user)
+            return Response(resposta_job(request, job), status=status.HTTP_202_ACCEPTED)
+
+        # Todo coordenador vê o mesmo relatório: pedidos simultâneos dividem o cálculo
+        return Response(coalescer(chave_requisicao(request, 'coordenador'), relatorio_geral))
+
+    @action(detail=False, methods=['get'], url_path='relatorios/series',
+            permission_classes=[permissions.IsAuthenticated], throttle_classes=[RelatoriosThrottle])
+    def relatorios_series(self, request):
+        """
+        Série diária das contagens do relatório (fotos gravadas por
+        gerar_snapshot_relatorios) em arrays paralelos.
+        ?inicio=AAAA-MM-DD&fim=AAAA-MM-DD (padrão: últimos 30 dias). Apenas coordenadores.
+        """
+        if request.user.tipo_usuario != 'coordenador':
+            return Response(
+                {'detail': 'Apenas coordenadores podem acessar relatórios.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if 'inicio' in request.query_params or 'fim' in request.query_params:
+            inicio, fim, erro = self._janela_timeline(request)
+            if erro:
+                return erro
+        else:
+            fim = timezone.localdate()
+            inicio = fim - datetime.timedelta(days=29)
+
+        return Response({'inicio': inicio, 'fim': fim, **serie_snapshots(inicio, fim)})
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.AllowAny], url_path='publicos')
     def publicos(self, request):
         """Lista projetos públicos (sem necessidade de autenticação)"""
         projetos_publicos = Projeto.objects.filter(is_public=True).order_by('-data_inicio')
+        if settings.LISTAGEM_RAPIDA:
+            return self.responder_projecao(projetos_publicos, ProjecaoProjeto())
+        projetos_publicos = com_relacionados(projetos_publicos)
         
         # Usar paginação
         page = self.paginate_queryset(projetos_publicos)
@@ -499,4 +663,122 @@ class ProjetoViewSet(viewsets.ModelViewSet):
             return self.get_paginated_response(serializer.data)
         
         serializer = ProjetoSerializer(projetos_publicos, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+class ProjetoArquivadoViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Consulta dos projetos arquivados (somente leitura).
+    - Coordenadores veem todos
+    - Outros usuários veem apenas os projetos arquivados dos quais participaram
+    """
+    serializer_class = ProjetoArquivadoSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ProjetoPaginacao
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    search_fields = ['nome', 'descricao']
+    ordering_fields = ['arquivado_em', 'data_inicio', 'nome']
+    ordering = ['-arquivado_em']
+
+    def get_queryset(self):
+        arquivados = ProjetoArquivado.objects.prefetch_related(
+            'participacoes__usuario', 'equipes', 'tarefas'
+        )
+        if self.request.user.tipo_usuario != 'coordenador':
+            arquivados = arquivados.filter(participacoes__usuario=self.request.user).distinct()
+        return arquivados
+
+    @action(detail=True, methods=['post'])
+    def restaurar(self, request, pk=None):
+        """Devolve o projeto arquivado para as tabelas principais (apenas coordenadores)"""
+        if request.user.tipo_usuario != 'coordenador':
+            return Response(
+                {'detail': 'Apenas coordenadores podem restaurar projetos.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        arquivado = self.get_object()
+        if Projeto.objects.filter(pk=arquivado.id_original).exists():
+            return Response(
+                {'detail': 'Já existe um projeto ativo com esse id.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        projeto = restaurar_projeto(arquivado)
+        return Response(ProjetoSerializer(projeto).data, status=status.HTTP_201_CREATED)
+
+
+# Máximo de candidatos devolvidos pelo relatório de carga (?limite=)
+LIMITE_CANDIDATOS = 100
+
+
+class CargaEstudantesView(APIView):
+    """
+    GET /api/relatorios/carga/ (apenas coordenadores): carga de trabalho dos
+    estudantes (projetos ativos, equipes e tarefas abertas), ver projetos/carga.py.
+
+    - ?projeto=<id>: candidatos menos carregados para o projeto
+      (&para=equipe: participantes do projeto ainda sem equipe); &limite= (padrão 10)
+    - ?totais=1: totais de todos os estudantes em arrays paralelos
+    - ?matriz=1: matriz estudante x projeto em formato esparso
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [RelatoriosThrottle]
+
+    def get(self, request):
+        if request.user.tipo_usuario != 'coordenador':
+            return Response(
+                {'detail': 'Apenas coordenadores podem acessar relatórios.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        params = request.query_params
+        para = params.get('para', 'participante')
+        if para not in ('participante', 'equipe'):
+            return Response(
+                {'detail': 'para deve ser "participante" ou "equipe".'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            projeto_id = int(params['projeto']) if params.get('projeto') else None
+            limite = max(1, min(int(params.get('limite', 10)), LIMITE_CANDIDATOS))
+        except ValueError:
+            return Response(
+                {'detail': 'projeto e limite devem ser números.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if projeto_id is not None and not Projeto.objects.filter(pk=projeto_id).exists():
+            return Response({'detail': 'Projeto não encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+
+        def calcular():
+            carga = CargaEstudantes()
+            dados = {**carga.resumo(), 'pesos': settings.CARGA_PESOS}
+
+            if projeto_id is not None:
+                indices = carga.candidatos(projeto_id, para=para, limite=limite)
+                totais = carga.totais(indices)
+                usuarios = User.objects.in_bulk(totais['estudante_id'])
+                dados['projeto'] = projeto_id
+                dados['para'] = para
+                dados['candidatos'] = [
+                    {
+                        'id': estudante_id,
+                        'username': usuarios[estudante_id].username,
+                        'nome': usuarios[estudante_id].nome,
+                        'projetos': projetos,
+                        'equipes': equipes,
+                        'tarefas_abertas': tarefas,
+                        'carga': total,
+                    }
+                    for estudante_id, projetos, equipes, tarefas, total in zip(
+                        totais['estudante_id'], totais['projetos'], totais['equipes'],
+                        totais['tarefas_abertas'], totais['carga'],
+                    )
+                ]
+            if params.get('totais') in ('1', 'true'):
+                dados['totais'] = carga.totais()
+            if params.get('matriz') in ('1', 'true'):
+                dados['matriz'] = carga.matriz()
+            return dados
+
+        # Mesmo resultado para qualquer coordenador com os mesmos parâmetros
+        return Response(coalescer(chave_requisicao(request, 'coordenador'), calcular))
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from sincronizacao.models import Exclusao
+
+
+@admin.register(Exclusao)
+class ExclusaoAdmin(admin.ModelAdmin):
+    list_display = ['id', 'modelo', 'objeto_id', 'projeto_id', 'removido_em']
+    list_filter = ['modelo']
+    ordering = ['-id']
@@ -0,0 +1,117 @@
+"""
+Sincronização incremental das listas (?updated_since=).
+
+O cliente guarda o `cursor` devolvido na última sincronização e manda de volta
+em ?updated_since=. A resposta traz só os objetos com updated_at depois do
+cursor (index em updated_at), os ids apagados desde então (tombstones) e o
+novo cursor.
+
+O cursor devolvido fica SINCRONIZACAO_MARGEM segundos antes do início da
+consulta: uma escrita que pegou o updated_at antes da consulta mas só fez
+commit depois ainda aparece na próxima rodada. O custo é o cliente às vezes
+receber de novo um objeto que já tinha, o que é inofensivo.
+
+Os tombstones seguem o escopo da listagem: a view que restringe o que cada
+usuário vê (ex.: equipes só dos projetos de quem pede) restringe também os
+removidos em get_filtros_removidos. Um id que volta a existir (projeto
+restaurado do arquivo) tem o tombstone apagado na restauração, então a
+consulta aqui não precisa olhar a tabela do modelo.
+"""
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+
+from sincronizacao.models import Exclusao
+
+
+def ler_cursor(valor):
+    """Converte o ?updated_since= (ISO 8601) em datetime com fuso; ValueError se inválido"""
+    # Um "+00:00" sem encoding chega como " 00:00" na query string
+    data = parse_datetime((valor or '').strip().replace(' ', '+'))
+    if data is None:
+        raise ValueError(valor)
+    if timezone.is_naive(data):
+        data = timezone.make_aware(data, datetime.timezone.utc)
+    return data
+
+
+def formatar_cursor(data):
+    return data.astimezone(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def proximo_cursor():
+    return formatar_cursor(timezone.now() - datetime.timedelta(seconds=settings.SINCRONIZACAO_MARGEM))
+
+
+def cursor_expirado(desde):
+    """Antes da retenção os tombstones já foram apagados: o cliente precisa da lista completa"""
+    return desde < timezone.now() - datetime.timedelta(days=settings.SINCRONIZACAO_RETENCAO_DIAS)
+
+
+def ids_removidos(modelo, desde, **filtros):
+    """Ids apagados depois de `desde` (faixa do índice modelo + removido_em)"""
+    return list(
+        Exclusao.objects.filter(modelo=modelo._meta.label_lower, removido_em__gt=desde, **filtros)
+        .values_list('objeto_id', flat=True)
+        .distinct()
+    )
+
+
+def resposta_cursor_invalido():
+    return Response(
+        {'detail': 'updated_since inválido. Use uma data ISO 8601, ex.: 2025-01-31T12:00:00Z.'},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def resposta_cursor_expirado():
+    return Response(
+        {'detail': 'Cursor de sincronização expirado. Baixe a lista completa novamente.'},
+        status=status.HTTP_410_GONE
+    )
+
+
+class SincronizacaoMixin:
+    """
+    Mixin para ModelViewSet: com ?updated_since= a listagem devolve só o que
+    mudou, mais `removidos` e `cursor`. Sem o parâmetro, nada muda.
+    Os outros filtros da view (busca, status, projeto...) continuam valendo.
+    """
+
+    def get_filtros_removidos(self):
+        """
+        Filtros dos tombstones, com o mesmo escopo do get_queryset (ex.: só os
+        projetos de quem pede). Sem filtro: a listagem mostra o modelo inteiro.
+        """
+        return {}
+
+    def list(self, request, *args, **kwargs):
+        if 'updated_since' not in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        try:
+            desde = ler_cursor(request.query_params['updated_since'])
+        except ValueError:
+            return resposta_cursor_invalido()
+        if cursor_expirado(desde):
+            return resposta_cursor_expirado()
+
+        cursor = proximo_cursor()
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            updated_at__gt=desde
+        ).order_by('updated_at', 'pk')
+        extras = {
+            'removidos': ids_removidos(queryset.model, desde, **self.get_filtros_removidos()),
+            'cursor': cursor,
+        }
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+            response.data.update(extras)
+            return response
+        return Response({'results': self.get_serializer(queryset, many=True).data, **extras})
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Exclusao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100)),
+                ('objeto_id', models.BigIntegerField()),
+                ('projeto_id', models.BigIntegerField(blank=True, null=True)),
+                ('removido_em', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Exclusão',
+                'verbose_name_plural': 'Exclusões',
+                'indexes': [models.Index(fields=['modelo', 'removido_em'], name='exclusao_modelo_idx')],
+            },
+        ),
+    ]
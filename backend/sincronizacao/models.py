@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class Exclusao(models.Model):
+    """
+    Tombstone: registra que um objeto sincronizável foi apagado, para o
+    cliente que sincroniza com ?updated_since= tirar o objeto da lista local.
+    Os registros mais velhos que SINCRONIZACAO_RETENCAO_DIAS são descartados.
+    """
+
+    # app_label.model, ex.: "tarefas.tarefas"
+    modelo = models.CharField(max_length=100)
+    objeto_id = models.BigIntegerField()
+    # Projeto do objeto apagado, para filtrar por projeto (participações, equipes)
+    projeto_id = models.BigIntegerField(null=True, blank=True)
+    removido_em = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Exclusão"
+        verbose_name_plural = "Exclusões"
+        indexes = [
+            models.Index(fields=['modelo', 'removido_em'], name='exclusao_modelo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo} #{self.objeto_id} ({self.removido_em:%d/%m/%Y %H:%M})"
@@ -0,0 +1,126 @@
+"""
+Sinais da sincronização incremental.
+
+- post_delete dos modelos sincronizáveis grava um tombstone (Exclusao);
+- mudanças que aparecem no JSON de outro objeto também atualizam o updated_at
+  dele: participações mexem no projeto (participantes, líder) e os membros
+  (M2M) mexem na equipe.
+
+Numa exclusão em cascata (projeto com participações, equipes e tarefas) o
+post_delete roda para cada objeto. Dentro de exclusoes_em_lote() os tombstones
+vão num único bulk_create e os projetos tocados num único UPDATE, no fim do
+bloco, em vez de um INSERT/UPDATE por linha apagada.
+"""
+import datetime
+import itertools
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+
+_exclusoes = itertools.count(1)
+_lote = threading.local()
+
+
+@contextmanager
+def exclusoes_em_lote():
+    if getattr(_lote, 'atual', None) is not None:
+        # Já dentro de um lote: o bloco de fora grava tudo
+        yield
+        return
+    _lote.atual = {'exclusoes': [], 'projetos': set()}
+    try:
+        with transaction.atomic():
+            yield
+            lote = _lote.atual
+            _lote.atual = None
+            _gravar_lote(lote)
+    finally:
+        _lote.atual = None
+
+
+def _gravar_lote(lote):
+    from projetos.models import Projeto
+    from sincronizacao.models import Exclusao
+
+    if lote['exclusoes']:
+        Exclusao.objects.bulk_create(lote['exclusoes'], batch_size=500)
+        _limpar_exclusoes_antigas(lote['exclusoes'][0].removido_em)
+    if lote['projetos']:
+        # Os projetos apagados no mesmo bloco simplesmente não casam com o UPDATE
+        Projeto.objects.filter(pk__in=lote['projetos']).update(updated_at=timezone.now())
+
+
+def _limpar_exclusoes_antigas(agora):
+    # De vez em quando apaga os tombstones que passaram da retenção
+    from sincronizacao.models import Exclusao
+
+    if next(_exclusoes) % 500 == 0:
+        Exclusao.objects.filter(
+            removido_em__lt=agora - datetime.timedelta(days=settings.SINCRONIZACAO_RETENCAO_DIAS)
+        ).delete()
+
+
+def _projeto_id(instance):
+    if instance._meta.label_lower == 'projetos.projeto':
+        return instance.pk
+    if getattr(instance, 'projeto_id', None):
+        return instance.projeto_id
+    return None
+
+
+def registrar_exclusao(sender, instance, **kwargs):
+    from sincronizacao.models import Exclusao
+
+    exclusao = Exclusao(
+        modelo=sender._meta.label_lower,
+        objeto_id=instance.pk,
+        projeto_id=_projeto_id(instance),
+        removido_em=timezone.now(),
+    )
+    lote = getattr(_lote, 'atual', None)
+    if lote is not None:
+        lote['exclusoes'].append(exclusao)
+        return
+    exclusao.save()
+    _limpar_exclusoes_antigas(exclusao.removido_em)
+
+
+def tocar_projeto(sender, instance, **kwargs):
+    from projetos.models import Projeto
+
+    lote = getattr(_lote, 'atual', None)
+    if lote is not None:
+        lote['projetos'].add(instance.projeto_id)
+        return
+    Projeto.objects.filter(pk=instance.projeto_id).update(updated_at=timezone.now())
+
+
+def tocar_equipe(sender, instance, action, reverse, pk_set, **kwargs):
+    from equipe.models import Equipe
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # usuario.equipes.add(...): as equipes afetadas estão no pk_set
+        if pk_set:
+            Equipe.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+    else:
+        Equipe.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+
+
+def conectar_sinais():
+    from equipe.models import Equipe
+    from projetos.models import Projeto, ParticipacaoProjeto
+    from tarefas.models import Tarefas
+
+    for modelo in (Projeto, Tarefas, Equipe, ParticipacaoProjeto):
+        post_delete.connect(
+            registrar_exclusao, sender=modelo, dispatch_uid=f'sincronizacao_exclusao_{modelo._meta.label_lower}'
+        )
+    post_save.connect(tocar_projeto, sender=ParticipacaoProjeto, dispatch_uid='sincronizacao_participacao_salva')
+    post_delete.connect(tocar_projeto, sender=ParticipacaoProjeto, dispatch_uid='sincronizacao_participacao_removida')
+    m2m_changed.connect(tocar_equipe, sender=Equipe.membros.through, dispatch_uid='sincronizacao_membros_equipe')
@@ -0,0 +1,113 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from equipe.models import Equipe
+from projetos.arquivamento import arquivar_projetos, restaurar_projeto
+from projetos.models import ParticipacaoProjeto, Projeto, ProjetoArquivado
+from sincronizacao.models import Exclusao
+from tarefas.models import Tarefas
+from usuarios.models import Usuario
+
+
+class SincronizacaoTest(TestCase):
+    """Listagens com ?updated_since= e tombstones (sincronizacao/delta.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.coordenador = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='000', tipo_usuario='coordenador'
+        )
+        cls.estudante = Usuario.objects.create_user(
+            'aluno', 'aluno@devlab.com', 'senha', nome='Aluno', cpf='111', tipo_usuario='estudante'
+        )
+        hoje = timezone.localdate()
+        cls.projeto = Projeto.objects.create(nome='Meu', descricao='D', data_inicio=hoje)
+        cls.outro_projeto = Projeto.objects.create(nome='Outro', descricao='D', data_inicio=hoje)
+        ParticipacaoProjeto.objects.create(projeto=cls.projeto, usuario=cls.estudante)
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.estudante)
+        self.desde = (timezone.now() - datetime.timedelta(minutes=1)).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    def sincronizar(self, url, desde=None):
+        return self.cliente.get(url, {'updated_since': desde or self.desde})
+
+    def test_cursor_invalido_e_expirado(self):
+        self.assertEqual(self.sincronizar('/api/tarefas/', 'ontem').status_code, 400)
+        antigo = (timezone.now() - datetime.timedelta(days=31)).isoformat()
+        self.assertEqual(self.sincronizar('/api/tarefas/', antigo).status_code, 410)
+        self.assertEqual(self.sincronizar('/api/projetos/', antigo).status_code, 410)
+
+    def test_alterados_e_removidos_desde_o_cursor(self):
+        hoje = timezone.localdate()
+        mantida = Tarefas.objects.create(titulo='Fica', projeto=self.projeto, data_inicio=hoje)
+        apagada = Tarefas.objects.create(titulo='Sai', projeto=self.projeto, data_inicio=hoje)
+        antiga = Tarefas.objects.create(titulo='Antiga', projeto=self.projeto, data_inicio=hoje)
+        antiga_id = antiga.id
+        antiga.delete()
+        Exclusao.objects.filter(objeto_id=antiga_id).update(removido_em=timezone.now() - datetime.timedelta(hours=1))
+        apagada_id = apagada.id
+        apagada.delete()
+
+        resposta = self.sincronizar('/api/tarefas/')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual([t['id'] for t in resposta.data['results']], [mantida.id])
+        # A antiga foi apagada antes do cursor: o cliente já sabia
+        self.assertEqual(resposta.data['removidos'], [apagada_id])
+
+        # O próximo cursor não traz o que mudou antes dele (fora a margem)
+        cursor = timezone.now() + datetime.timedelta(seconds=10)
+        vazio = self.sincronizar('/api/tarefas/', cursor.strftime('%Y-%m-%dT%H:%M:%SZ'))
+        self.assertEqual((vazio.data['results'], vazio.data['removidos']), ([], []))
+        self.assertIn('cursor', vazio.data)
+
+    def test_removidos_no_escopo_de_quem_pede(self):
+        minha = Equipe.objects.create(nome='Minha', projeto=self.projeto)
+        alheia = Equipe.objects.create(nome='Alheia', projeto=self.outro_projeto)
+        ids = [minha.id, alheia.id]
+        Equipe.objects.filter(pk__in=ids).delete()
+
+        self.assertEqual(self.sincronizar('/api/equipes/').data['removidos'], [minha.id])
+        # Com ?projeto= a listagem mostra aquele projeto, e os removidos dele
+        resposta = self.cliente.get('/api/equipes/', {'updated_since': self.desde, 'projeto': self.outro_projeto.id})
+        self.assertEqual(resposta.data['removidos'], [alheia.id])
+
+        self.cliente.force_authenticate(self.coordenador)
+        self.assertEqual(sorted(self.sincronizar('/api/equipes/').data['removidos']), ids)
+
+    def test_restaurado_sai_dos_removidos(self):
+        antigo = timezone.localdate() - datetime.timedelta(days=800)
+        projeto = Projeto.objects.create(
+            nome='Velho', descricao='D', data_inicio=timezone.localdate(), status=Projeto.STATUS_CONCLUIDO
+        )
+        # O save recusa data de início no passado
+        Projeto.objects.filter(pk=projeto.pk).update(data_inicio=antigo)
+        tarefa = Tarefas.objects.create(titulo='T', projeto=projeto, data_inicio=timezone.localdate())
+        arquivar_projetos()
+        self.assertEqual(self.sincronizar('/api/tarefas/').data['removidos'], [tarefa.id])
+
+        restaurar_projeto(ProjetoArquivado.objects.get(id_original=projeto.pk))
+        self.assertEqual(self.sincronizar('/api/tarefas/').data['removidos'], [])
+        self.assertNotIn(projeto.pk, self.sincronizar('/api/projetos/').data['removidos'])
+
+    def test_importacao_com_matricula_toca_o_projeto(self):
+        # A importação matricula com bulk_create, que não dispara o post_save da participação
+        projeto = Projeto.objects.create(
+            nome='Turma', descricao='D', data_inicio=timezone.localdate(), created_by=self.coordenador
+        )
+        Projeto.objects.filter(pk=projeto.pk).update(updated_at=timezone.now() - datetime.timedelta(hours=1))
+        self.cliente.force_authenticate(self.coordenador)
+        self.assertNotIn(projeto.id, [p['id'] for p in self.sincronizar('/api/projetos/').data['results']])
+
+        linhas = [{'username': 'imp', 'nome': 'Importado', 'email': 'imp@devlab.com', 'cpf': '222',
+                   'tipo_usuario': 'estudante'}]
+        resposta = self.cliente.post(
+            '/api/usuarios/importar/', {'usuarios': linhas, 'projeto_id': projeto.id}, format='json'
+        )
+        self.assertEqual(resposta.data['matriculados'], 1)
+        sincronizados = {p['id']: p for p in self.sincronizar('/api/projetos/').data['results']}
+        self.assertEqual(sincronizados[projeto.id]['participantes'], [resposta.data['usuarios'][0]['id']])
@@ -0,0 +1,184 @@
+"""
+Feed iCalendar (.ics) com os prazos de cada usuário.
+
+O feed inclui as tarefas em que o usuário é responsável e o fim previsto dos
+projetos de que participa. O endereço leva um token assinado (sem login), já que
+apps de calendário não mandam o header Authorization. O token carrega a chave
+de calendário do usuário (Usuario.calendario_chave): renovar_chave() troca a
+chave e todos os links antigos deixam de valer.
+
+A "versão" do calendário sai do banco, numa consulta agregada por lado:
+quantidade e maior updated_at das tarefas do usuário (e dos projetos delas) e
+dos projetos de que ele participa. Qualquer worker chega à mesma versão, sem
+depender de sinal nem de cache compartilhado. O ETag é derivado da versão,
+então um cliente que já tem a última versão recebe 304 sem gerar o .ics; o
+.ics gerado fica no cache por TIMEOUT_CACHE, indexado pela versão.
+Atenção: QuerySet.update() não mexe no updated_at; quem atualizar tarefas ou
+projetos assim deve incluir updated_at=timezone.now() no update.
+"""
+import datetime
+import hashlib
+
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import CharField, Count, F, Max, Value
+from django.utils.http import parse_etags
+
+SALT_TOKEN = 'tarefas.calendario'
+TIMEOUT_CACHE = 60 * 60
+# DTSTAMP de um calendário vazio
+DTSTAMP_VAZIO = '19700101T000000'
+
+
+def gerar_token(usuario):
+    return signing.dumps([usuario.pk, usuario.calendario_chave], salt=SALT_TOKEN)
+
+
+def ler_token(token):
+    """Devolve (id do usuário, chave) do token, ou None se o token for inválido"""
+    try:
+        conteudo = signing.loads(token, salt=SALT_TOKEN)
+    except signing.BadSignature:
+        return None
+    if not isinstance(conteudo, list) or len(conteudo) != 2:
+        # Formato antigo (só o id): sem chave, não dá para revogar
+        return None
+    return conteudo[0], conteudo[1]
+
+
+def renovar_chave(usuario):
+    """Invalida todos os links de calendário do usuário"""
+    from usuarios.models import nova_chave_calendario
+
+    usuario.calendario_chave = nova_chave_calendario()
+    usuario.save(update_fields=['calendario_chave'])
+
+
+def versao_calendario(usuario_id, chave):
+    """
+    Versão atual do calendário ('AAAAMMDDTHHMMSS-hash', o começo vira o DTSTAMP),
+    ou None se a chave não for mais a do usuário. Duas consultas.
+    """
+    from tarefas.models import Tarefas
+    from usuarios.models import Usuario
+
+    projetos = Usuario.objects.filter(pk=usuario_id, calendario_chave=chave).annotate(
+        total=Count('participacaoprojeto'), alterado=Max('participacaoprojeto__projeto__updated_at'),
+    ).values_list('total', 'alterado').first()
+    if projetos is None:
+        return None
+    tarefas = Tarefas.objects.filter(responsavel_id=usuario_id).aggregate(
+        total=Count('id'), alterada=Max('updated_at'), projeto_alterado=Max('projeto__updated_at'),
+    )
+
+    instantes = [t for t in (projetos[1], tarefas['alterada'], tarefas['projeto_alterado']) if t]
+    dtstamp = max(instantes).strftime('%Y%m%dT%H%M%S') if instantes else DTSTAMP_VAZIO
+    assinatura = hashlib.sha1(repr((projetos, sorted(tarefas.items()))).encode()).hexdigest()[:16]
+    return f'{dtstamp}-{assinatura}'
+
+
+def etag_calendario(usuario_id, versao):
+    return '"' + hashlib.sha1(f'{usuario_id}:{versao}'.encode()).hexdigest() + '"'
+
+
+def etag_confere(etag, if_none_match):
+    """
+    Se o If-None-Match tem o ETag (comparação fraca, como manda a RFC 9110:
+    W/"x" vale "x"). Compara valor a valor, não como substring do cabeçalho.
+    """
+    etags = parse_etags(if_none_match)
+    if etags == ['*']:
+        return True
+    return etag.removeprefix('W/') in {valor.removeprefix('W/') for valor in etags}
+
+
+def _prazos(usuario_id):
+    """Tarefas abertas e projetos em andamento do usuário, numa única consulta (UNION)"""
+    from projetos.models import Projeto
+    from tarefas.models import Tarefas
+
+    # Só anotações, na mesma ordem dos dois lados, para o UNION casar as colunas.
+    # O order_by() vazio tira a ordenação padrão do Meta, que o SQLite não aceita dentro do UNION
+    tarefas = Tarefas.objects.filter(
+        responsavel_id=usuario_id, data_fim_prevista__isnull=False
+    ).exclude(status='concluida').annotate(
+        c_tipo=Value('tarefa', output_field=CharField()),
+        c_id=F('id'),
+        c_titulo=F('titulo'),
+        c_prazo=F('data_fim_prevista'),
+        c_projeto=F('projeto__nome'),
+        c_status=F('status'),
+    ).values_list('c_tipo', 'c_id', 'c_titulo', 'c_prazo', 'c_projeto', 'c_status').order_by()
+
+    projetos = Projeto.objects.filter(
+        participacaoprojeto__usuario_id=usuario_id, data_fim_prevista__isnull=False
+    ).exclude(status__in=[Projeto.STATUS_CONCLUIDO, Projeto.STATUS_CANCELADO]).annotate(
+        c_tipo=Value('projeto', output_field=CharField()),
+        c_id=F('id'),
+        c_titulo=F('nome'),
+        c_prazo=F('data_fim_prevista'),
+        c_projeto=F('nome'),
+        c_status=F('status'),
+    ).values_list('c_tipo', 'c_id', 'c_titulo', 'c_prazo', 'c_projeto', 'c_status').order_by()
+
+    return tarefas.union(projetos, all=True).order_by('c_prazo')
+
+
+def _escapar(texto):
+    return (texto or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _dobrar(linha):
+    """Quebra linhas com mais de 75 octetos, como pede a RFC 5545"""
+    dados = linha.encode('utf-8')
+    if len(dados) <= 75:
+        return linha
+    partes = []
+    while dados:
+        limite = 75 if not partes else 74
+        # Não corta no meio de um caractere UTF-8
+        while limite < len(dados) and (dados[limite] & 0xC0) == 0x80:
+            limite -= 1
+        partes.append(dados[:limite].decode('utf-8'))
+        dados = dados[limite:]
+    return '\r\n '.join(partes)
+
+
+def gerar_ics(usuario_id, versao):
+    linhas = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//DevLab//Prazos//PT-BR',
+        'CALSCALE:GREGORIAN',
+        'X-WR-CALNAME:DevLab - Prazos',
+    ]
+    dtstamp = versao[:15] + 'Z'
+    for tipo, objeto_id, titulo, prazo, projeto_nome, status in _prazos(usuario_id):
+        if tipo == 'tarefa':
+            resumo = f'Prazo: {titulo}'
+            descricao = f'Projeto: {projeto_nome}' if projeto_nome else ''
+        else:
+            resumo = f'Fim previsto do projeto: {titulo}'
+            descricao = ''
+        linhas += [
+            'BEGIN:VEVENT',
+            f'UID:{tipo}-{objeto_id}@devlab',
+            f'DTSTAMP:{dtstamp}',
+            f'DTSTART;VALUE=DATE:{prazo:%Y%m%d}',
+            f'DTEND;VALUE=DATE:{prazo + datetime.timedelta(days=1):%Y%m%d}',
+            f'SUMMARY:{_escapar(resumo)}',
+            f'DESCRIPTION:{_escapar(descricao)}',
+            f'X-DEVLAB-STATUS:{status}',
+            'END:VEVENT',
+        ]
+    linhas.append('END:VCALENDAR')
+    return '\r\n'.join(_dobrar(linha) for linha in linhas) + '\r\n'
+
+
+def ics_em_cache(usuario_id, versao):
+    chave = f'calendario:ics:{usuario_id}:{versao}'
+    conteudo = cache.get(chave)
+    if conteudo is None:
+        conteudo = gerar_ics(usuario_id, versao)
+        cache.set(chave, conteudo, TIMEOUT_CACHE)
+    return conteudo
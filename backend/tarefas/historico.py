@@ -0,0 +1,186 @@
+"""
+Histórico de status e métricas de fluxo das tarefas.
+
+As views chamam estas funções a cada criação, mudança de status ou remoção de
+tarefa. Tudo é incremental: grava uma linha de histórico, ajusta os marcos de
+tempo da tarefa (MetricaTarefa) e soma +1 no contador do dia (BurndownDiario).
+Nada é recalculado a partir do zero na hora de consultar.
+
+Quem chama envolve o save/delete da tarefa e o registro no mesmo
+transaction.atomic(): se um dos dois falhar, nenhum fica (senão o status da
+tarefa e o histórico/burndown divergem).
+"""
+import datetime
+
+from django.db.models import F
+from django.utils import timezone
+
+from tarefas.models import HistoricoStatusTarefa, MetricaTarefa, BurndownDiario
+
+STATUS_INICIADA = 'em_andamento'
+STATUS_CONCLUIDA = 'concluida'
+
+
+def projeto_da_tarefa(tarefa):
+    if tarefa.projeto_id:
+        return tarefa.projeto_id
+    if tarefa.equipe_id:
+        return tarefa.equipe.projeto_id
+    return None
+
+
+def _somar_no_dia(projeto_id, **deltas):
+    if not projeto_id:
+        return
+    dia, _ = BurndownDiario.objects.get_or_create(projeto_id=projeto_id, data=timezone.localdate())
+    BurndownDiario.objects.filter(pk=dia.pk).update(
+        **{campo: F(campo) + valor for campo, valor in deltas.items()}
+    )
+
+
+def _metrica(tarefa, projeto_id):
+    metrica, _ = MetricaTarefa.objects.get_or_create(
+        tarefa=tarefa,
+        defaults={
+            'projeto_id': projeto_id,
+            # Tarefas criadas antes do histórico existir usam a data de início como criação
+            'criada_em': timezone.make_aware(
+                datetime.datetime.combine(tarefa.data_inicio, datetime.time.min)
+            ),
+        }
+    )
+    return metrica
+
+
+def registrar_criacao(tarefa, usuario=None):
+    agora = timezone.now()
+    projeto_id = projeto_da_tarefa(tarefa)
+    HistoricoStatusTarefa.objects.create(
+        tarefa=tarefa, status_anterior=None, status_novo=tarefa.status, usuario=usuario
+    )
+    MetricaTarefa.objects.create(
+        tarefa=tarefa,
+        projeto_id=projeto_id,
+        criada_em=agora,
+        iniciada_em=agora if tarefa.status in (STATUS_INICIADA, STATUS_CONCLUIDA) else None,
+        concluida_em=agora if tarefa.status == STATUS_CONCLUIDA else None,
+    )
+    if tarefa.status == STATUS_CONCLUIDA:
+        _somar_no_dia(projeto_id, criadas=1, concluidas=1)
+    else:
+        _somar_no_dia(projeto_id, criadas=1)
+
+
+def registrar_transicao(tarefa, status_anterior, projeto_anterior_id, usuario=None):
+    """
+    Registra a mudança de status_anterior para tarefa.status e a troca de
+    projeto (projeto_anterior_id é o projeto_da_tarefa de antes do save).
+    Trocar de projeto tira a tarefa do burndown do antigo (como removida) e
+    põe no do novo (como criada), já com o status novo.
+    """
+    status_novo = tarefa.status
+    projeto_id = projeto_da_tarefa(tarefa)
+    if status_anterior == status_novo and projeto_anterior_id == projeto_id:
+        return
+
+    agora = timezone.now()
+    if status_anterior != status_novo:
+        HistoricoStatusTarefa.objects.create(
+            tarefa=tarefa, status_anterior=status_anterior, status_novo=status_novo, usuario=usuario
+        )
+
+    metrica = _metrica(tarefa, projeto_id)
+    campos = {'projeto_id': projeto_id}
+    if status_novo in (STATUS_INICIADA, STATUS_CONCLUIDA) and metrica.iniciada_em is None:
+        campos['iniciada_em'] = agora
+    if status_novo == STATUS_CONCLUIDA and status_anterior != STATUS_CONCLUIDA:
+        campos['concluida_em'] = agora
+    elif status_anterior == STATUS_CONCLUIDA and status_novo != STATUS_CONCLUIDA:
+        campos['concluida_em'] = None
+
+    if projeto_anterior_id != projeto_id:
+        if status_anterior == STATUS_CONCLUIDA:
+            _somar_no_dia(projeto_anterior_id, removidas=1, removidas_concluidas=1)
+        else:
+            _somar_no_dia(projeto_anterior_id, removidas=1)
+        if status_novo == STATUS_CONCLUIDA:
+            _somar_no_dia(projeto_id, criadas=1, concluidas=1)
+        else:
+            _somar_no_dia(projeto_id, criadas=1)
+    elif status_novo == STATUS_CONCLUIDA:
+        _somar_no_dia(projeto_id, concluidas=1)
+    elif status_anterior == STATUS_CONCLUIDA:
+        _somar_no_dia(projeto_id, reabertas=1)
+    MetricaTarefa.objects.filter(pk=metrica.pk).update(**campos)
+
+
+def registrar_remocao(tarefa):
+    """Chamada antes de apagar a tarefa, para o burndown não contar uma tarefa que não existe mais"""
+    projeto_id = projeto_da_tarefa(tarefa)
+    if tarefa.status == STATUS_CONCLUIDA:
+        _somar_no_dia(projeto_id, removidas=1, removidas_concluidas=1)
+    else:
+        _somar_no_dia(projeto_id, removidas=1)
+
+
+def serie_burndown(projeto_id, inicio=None, fim=None):
+    """
+    Monta a série diária acumulada em arrays paralelos. O custo depende do
+    número de dias com movimento, não do número de tarefas.
+    """
+    fim = fim or timezone.localdate()
+    dias = {
+        linha['data']: linha
+        for linha in BurndownDiario.objects.filter(projeto_id=projeto_id, data__lte=fim).values(
+            'data', 'criadas', 'concluidas', 'reabertas', 'removidas', 'removidas_concluidas'
+        ).order_by('data')
+    }
+    serie = {'datas': [], 'total': [], 'abertas': [], 'concluidas': []}
+    if not dias:
+        return serie
+
+    total = concluidas = 0
+    data = min(dias)
+    while data <= fim:
+        linha = dias.get(data)
+        if linha:
+            total += linha['criadas'] - linha['removidas']
+            concluidas += linha['concluidas'] - linha['reabertas'] - linha['removidas_concluidas']
+        if inicio is None or data >= inicio:
+            serie['datas'].append(data.isoformat())
+            serie['total'].append(total)
+            serie['abertas'].append(total - concluidas)
+            serie['concluidas'].append(concluidas)
+        data += datetime.timedelta(days=1)
+    return serie
+
+
+def _resumo(horas):
+    if not horas:
+        return {'quantidade': 0, 'media_horas': None, 'mediana_horas': None}
+    ordenadas = sorted(horas)
+    meio = len(ordenadas) // 2
+    mediana = ordenadas[meio] if len(ordenadas) % 2 else (ordenadas[meio - 1] + ordenadas[meio]) / 2
+    return {
+        'quantidade': len(ordenadas),
+        'media_horas': round(sum(ordenadas) / len(ordenadas), 2),
+        'mediana_horas': round(mediana, 2),
+    }
+
+
+def tempos_de_fluxo(projeto_id):
+    """Lead time e cycle time das tarefas concluídas do projeto, em horas"""
+    ids, lead, cycle = [], [], []
+    for tarefa_id, criada_em, iniciada_em, concluida_em in MetricaTarefa.objects.filter(
+        projeto_id=projeto_id, concluida_em__isnull=False
+    ).values_list('tarefa_id', 'criada_em', 'iniciada_em', 'concluida_em').order_by('tarefa_id'):
+        ids.append(tarefa_id)
+        lead.append(round((concluida_em - criada_em).total_seconds() / 3600, 2))
+        cycle.append(
+            round((concluida_em - iniciada_em).total_seconds() / 3600, 2) if iniciada_em else None
+        )
+    return {
+        'lead_time': _resumo(lead),
+        'cycle_time': _resumo([c for c in cycle if c is not None]),
+        'tarefas': {'ids': ids, 'lead_time_horas': lead, 'cycle_time_horas': cycle},
+    }
@@ -0,0 +1,197 @@
+"""
+Resumo diário de prazos por e-mail (python manage.py enviar_lembretes_prazos).
+
+Cada usuário recebe no máximo um e-mail com:
+- as tarefas abertas dele atrasadas ou que vencem nos próximos
+  LEMBRETES_DIAS_ANTECEDENCIA dias;
+- nos projetos que ele lidera, as mesmas tarefas dos outros (e as sem responsável).
+
+Tudo sai de poucas consultas agrupadas (tarefas, líderes, destinatários e o
+estado de envio), sem consulta por tarefa ou por usuário. Os e-mails vão pelo
+EMAIL_BACKEND do Django numa conexão só, em lotes de LEMBRETES_LOTE. Dentro do
+lote cada e-mail é enviado e conferido separado: um erro do SMTP no meio não
+faz os já entregues ficarem sem estado (e serem mandados de novo amanhã).
+
+EnvioLembrete guarda a assinatura (hash) do último resumo de cada usuário:
+rodar de novo sem nada ter mudado não manda nada, e o mesmo resumo só é
+repetido depois de LEMBRETES_INTERVALO_HORAS.
+"""
+import datetime
+import hashlib
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from projetos.models import ParticipacaoProjeto
+from tarefas.models import EnvioLembrete, Tarefas
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+COLUNAS_TAREFA = ('id', 'titulo', 'prioridade', 'data_fim_prevista', 'projeto_id', 'projeto__nome', 'responsavel_id')
+
+
+def _assinatura(proprias, lideradas, hoje):
+    # Muda quando uma tarefa entra/sai do resumo, muda de prazo ou passa a atrasar
+    partes = sorted(
+        f"{secao}:{tarefa['id']}:{tarefa['data_fim_prevista']}:{tarefa['data_fim_prevista'] < hoje}"
+        for secao, tarefas in (('p', proprias), ('l', lideradas)) for tarefa in tarefas
+    )
+    return hashlib.sha256('|'.join(partes).encode()).hexdigest()
+
+
+def _linha(tarefa, hoje, nomes=None):
+    dias = (tarefa['data_fim_prevista'] - hoje).days
+    if dias < 0:
+        prazo = f'atrasada há {-dias} dia(s)'
+    elif dias == 0:
+        prazo = 'vence hoje'
+    else:
+        prazo = f'vence em {dias} dia(s)'
+    linha = f"- {tarefa['titulo']} ({tarefa['projeto__nome'] or 'sem projeto'}): {prazo}, {tarefa['data_fim_prevista']:%d/%m/%Y}"
+    if nomes is not None:
+        linha += f" - {nomes.get(tarefa['responsavel_id'], 'sem responsável')}"
+    return linha
+
+
+def montar_texto(usuario, proprias, lideradas, hoje, nomes):
+    linhas = [f"Olá, {usuario['nome']}!", '']
+    if proprias:
+        linhas.append('Suas tarefas com prazo próximo ou atrasadas:')
+        linhas.extend(_linha(tarefa, hoje) for tarefa in proprias)
+        linhas.append('')
+    if lideradas:
+        linhas.append('Tarefas dos projetos que você lidera:')
+        linhas.extend(_linha(tarefa, hoje, nomes) for tarefa in lideradas)
+        linhas.append('')
+    linhas.append('DevLab')
+    return '\n'.join(linhas)
+
+
+def montar_resumos(hoje=None, dias=None):
+    """
+    Devolve ({usuario_id: (usuario, proprias, lideradas)}, {usuario_id: nome})
+    só com quem tem algo no resumo. Três consultas, qualquer que seja o volume
+    (a quarta, do estado de envio, fica no enviar_lembretes).
+    """
+    hoje = hoje or timezone.localdate()
+    dias = settings.LEMBRETES_DIAS_ANTECEDENCIA if dias is None else dias
+
+    # 1) Tarefas abertas atrasadas ou vencendo na janela
+    tarefas = list(
+        Tarefas.objects.exclude(status='concluida').filter(
+            Q(responsavel__isnull=False) | Q(projeto__isnull=False),
+            data_fim_prevista__lte=hoje + datetime.timedelta(days=dias),
+        ).order_by('data_fim_prevista', 'prioridade', 'id').values(*COLUNAS_TAREFA)
+    )
+    if not tarefas:
+        return {}, {}
+
+    proprias = defaultdict(list)
+    por_projeto = defaultdict(list)
+    for tarefa in tarefas:
+        if tarefa['responsavel_id']:
+            proprias[tarefa['responsavel_id']].append(tarefa)
+        if tarefa['projeto_id']:
+            por_projeto[tarefa['projeto_id']].append(tarefa)
+
+    # 2) Líderes dos projetos com tarefas na janela
+    lideradas = defaultdict(list)
+    for projeto_id, lider_id in ParticipacaoProjeto.objects.filter(
+        projeto_id__in=por_projeto, is_leader=True, ativo=True
+    ).values_list('projeto_id', 'usuario_id'):
+        # As do próprio líder já estão na parte dele
+        lideradas[lider_id].extend(t for t in por_projeto[projeto_id] if t['responsavel_id'] != lider_id)
+
+    # 3) Destinatários e os nomes dos responsáveis citados nas tarefas lideradas
+    ids = set(proprias) | {lider_id for lider_id, lista in lideradas.items() if lista}
+    citados = {t['responsavel_id'] for lista in lideradas.values() for t in lista if t['responsavel_id']}
+    usuarios = {
+        usuario['id']: usuario
+        for usuario in User.objects.filter(pk__in=ids | citados, is_active=True).values('id', 'nome', 'email')
+    }
+    nomes = {usuario_id: usuario['nome'] for usuario_id, usuario in usuarios.items()}
+
+    resumos = {}
+    for usuario_id in sorted(ids):
+        usuario = usuarios.get(usuario_id)
+        if usuario is None or not usuario['email']:
+            continue
+        lideradas[usuario_id].sort(key=lambda t: (t['data_fim_prevista'], t['prioridade'], t['id']))
+        resumos[usuario_id] = (usuario, proprias.get(usuario_id, []), lideradas.get(usuario_id, []))
+    return resumos, nomes
+
+
+def enviar_lembretes(hoje=None, dias=None, forcar=False, simular=False):
+    """
+    Envia os resumos pendentes (simular=True só conta). Devolve as contagens:
+    {'resumos', 'pendentes', 'repetidos', 'enviados', 'falhas'}.
+    """
+    hoje = hoje or timezone.localdate()
+    resumos, nomes = montar_resumos(hoje, dias)
+    agora = timezone.now()
+    intervalo = datetime.timedelta(hours=settings.LEMBRETES_INTERVALO_HORAS)
+
+    # 4) Estado de envio de todos os destinatários de uma vez
+    estados = EnvioLembrete.objects.in_bulk(list(resumos))
+    pendentes = []
+    for usuario_id, (usuario, proprias, lideradas) in resumos.items():
+        assinatura = _assinatura(proprias, lideradas, hoje)
+        estado = estados.get(usuario_id)
+        if (not forcar and estado is not None and estado.assinatura == assinatura
+                and agora - estado.enviado_em < intervalo):
+            continue
+        pendentes.append((usuario, proprias, lideradas, assinatura))
+
+    resultado = {
+        'resumos': len(resumos), 'pendentes': len(pendentes),
+        'repetidos': len(resumos) - len(pendentes), 'enviados': 0, 'falhas': 0,
+    }
+    if simular or not pendentes:
+        return resultado
+
+    lote = settings.LEMBRETES_LOTE
+    # Uma conexão para todos os lotes (no SMTP evita um handshake por e-mail)
+    with get_connection(fail_silently=False) as conexao:
+        for inicio in range(0, len(pendentes), lote):
+            parte = pendentes[inicio:inicio + lote]
+            mensagens = [
+                EmailMessage(
+                    subject=f'DevLab: {len(proprias) + len(lideradas)} tarefa(s) com prazo próximo ou atrasada(s)',
+                    body=montar_texto(usuario, proprias, lideradas, hoje, nomes),
+                    to=[usuario['email']],
+                    connection=conexao,
+                )
+                for usuario, proprias, lideradas, _ in parte
+            ]
+            entregues = []
+            for mensagem, (usuario, _, _, assinatura) in zip(mensagens, parte):
+                try:
+                    enviado = conexao.send_messages([mensagem])
+                except Exception:
+                    # Fica sem estado e vai de novo na próxima execução. A conexão pode ter
+                    # caído: fechando, o próximo send_messages abre outra
+                    logger.exception('Falha ao enviar o lembrete de prazos para o usuário %s', usuario['id'])
+                    conexao.close()
+                    enviado = 0
+                if enviado:
+                    entregues.append(
+                        EnvioLembrete(usuario_id=usuario['id'], assinatura=assinatura, enviado_em=agora)
+                    )
+                else:
+                    resultado['falhas'] += 1
+            resultado['enviados'] += len(entregues)
+            if not entregues:
+                continue
+            EnvioLembrete.objects.bulk_create(
+                entregues,
+                update_conflicts=True,
+                unique_fields=['usuario'],
+                update_fields=['assinatura', 'enviado_em'],
+            )
+    return resultado
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from tarefas.lembretes import enviar_lembretes
+
+
+class Command(BaseCommand):
+    help = (
+        "Envia o resumo de prazos (tarefas atrasadas ou vencendo) por e-mail, um por usuário "
+        "(agende uma vez por dia, ex.: cron)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=None,
+                            help='Tarefas que vencem nos próximos N dias (padrão: LEMBRETES_DIAS_ANTECEDENCIA)')
+        parser.add_argument('--forcar', action='store_true',
+                            help='Reenvia mesmo os resumos que não mudaram desde o último envio')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Só mostra quantos resumos seriam enviados')
+
+    def handle(self, *args, **options):
+        resultado = enviar_lembretes(dias=options['dias'], forcar=options['forcar'], simular=options['dry_run'])
+
+        if options['dry_run']:
+            self.stdout.write(
+                f"{resultado['pendentes']} resumo(s) seriam enviados "
+                f"({resultado['repetidos']} sem mudança desde o último envio)."
+            )
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado['enviados']} resumo(s) enviados, {resultado['repetidos']} sem mudança."
+        ))
+        if resultado['falhas']:
+            self.stderr.write(self.style.ERROR(
+                f"{resultado['falhas']} resumo(s) falharam e serão tentados na próxima execução."
+            ))
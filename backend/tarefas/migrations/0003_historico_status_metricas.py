@@ -0,0 +1,111 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def popular_metricas(apps, schema_editor):
+    """
+    Tarefas que já existiam entram no burndown como criadas na data de início
+    (e concluídas na data prevista de fim, quando já estavam concluídas).
+    """
+    import datetime
+    from django.utils import timezone
+
+    Tarefas = apps.get_model('tarefas', 'Tarefas')
+    MetricaTarefa = apps.get_model('tarefas', 'MetricaTarefa')
+    BurndownDiario = apps.get_model('tarefas', 'BurndownDiario')
+
+    def meia_noite(data):
+        return timezone.make_aware(datetime.datetime.combine(data, datetime.time.min))
+
+    metricas = []
+    dias = {}
+    for tarefa in Tarefas.objects.select_related('equipe').iterator():
+        projeto_id = tarefa.projeto_id or (tarefa.equipe.projeto_id if tarefa.equipe_id else None)
+        concluida_em = None
+        if tarefa.status == 'concluida':
+            concluida_em = meia_noite(tarefa.data_fim_prevista or tarefa.data_inicio)
+        metricas.append(MetricaTarefa(
+            tarefa_id=tarefa.pk,
+            projeto_id=projeto_id,
+            criada_em=meia_noite(tarefa.data_inicio),
+            iniciada_em=meia_noite(tarefa.data_inicio) if tarefa.status != 'nao_iniciado' else None,
+            concluida_em=concluida_em,
+        ))
+        if projeto_id:
+            dia = dias.setdefault((projeto_id, tarefa.data_inicio), {'criadas': 0, 'concluidas': 0})
+            dia['criadas'] += 1
+            if concluida_em:
+                dia = dias.setdefault((projeto_id, concluida_em.date()), {'criadas': 0, 'concluidas': 0})
+                dia['concluidas'] += 1
+
+    MetricaTarefa.objects.bulk_create(metricas, batch_size=500)
+    BurndownDiario.objects.bulk_create([
+        BurndownDiario(projeto_id=projeto_id, data=data, **contagem)
+        for (projeto_id, data), contagem in dias.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projetos', '0007_projetos_arquivados'),
+        ('tarefas', '0002_tarefas_projeto'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaTarefa',
+            fields=[
+                ('tarefa', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metrica', serialize=False, to='tarefas.tarefas')),
+                ('projeto_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('criada_em', models.DateTimeField()),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Métrica de Tarefa',
+                'verbose_name_plural': 'Métricas de Tarefas',
+            },
+        ),
+        migrations.CreateModel(
+            name='BurndownDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('criadas', models.IntegerField(default=0)),
+                ('concluidas', models.IntegerField(default=0)),
+                ('reabertas', models.IntegerField(default=0)),
+                ('removidas', models.IntegerField(default=0)),
+                ('removidas_concluidas', models.IntegerField(default=0)),
+                ('projeto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='burndown', to='projetos.projeto')),
+            ],
+            options={
+                'verbose_name': 'Burndown Diário',
+                'verbose_name_plural': 'Burndown Diário',
+                'ordering': ['projeto', 'data'],
+                'unique_together': {('projeto', 'data')},
+            },
+        ),
+        migrations.CreateModel(
+            name='HistoricoStatusTarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status_anterior', models.CharField(blank=True, choices=[('nao_iniciado', 'Não iniciado'), ('em_andamento', 'Em andamento'), ('concluida', 'Concluída')], max_length=20, null=True)),
+                ('status_novo', models.CharField(choices=[('nao_iniciado', 'Não iniciado'), ('em_andamento', 'Em andamento'), ('concluida', 'Concluída')], max_length=20)),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('tarefa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historico_status', to='tarefas.tarefas')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Histórico de Status',
+                'verbose_name_plural': 'Históricos de Status',
+                'ordering': ['tarefa', 'criado_em'],
+                'indexes': [models.Index(fields=['tarefa', 'criado_em'], name='historico_tarefa_idx')],
+            },
+        ),
+        migrations.RunPython(popular_metricas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-19 10:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipe', '0001_initial'),
+        ('projetos', '0008_indices_intervalo'),
+        ('tarefas', '0003_historico_status_metricas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tarefas',
+            index=models.Index(fields=['projeto', 'data_inicio', 'data_fim_prevista'], name='tarefa_intervalo_idx'),
+        ),
+    ]
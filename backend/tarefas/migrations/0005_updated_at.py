@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tarefas', '0004_indices_intervalo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarefas',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
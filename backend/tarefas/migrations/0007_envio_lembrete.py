@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tarefas', '0006_versao'),
+        ('usuarios', '0002_campos_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnvioLembrete',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('assinatura', models.CharField(max_length=64)),
+                ('enviado_em', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Envio de Lembrete',
+                'verbose_name_plural': 'Envios de Lembretes',
+            },
+        ),
+    ]
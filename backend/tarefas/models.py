@@ -3,7 +3,9 @@ import datetime
 from django.conf import settings
 from django.core.exceptions import ValidationError
 
-class Tarefas(models.Model):
+from DevLab.concorrencia import ModeloVersionado
+
+class Tarefas(ModeloVersionado):
     STATUS_CHOICES = [
         ('nao_iniciado', 'Não iniciado'),
         ('em_andamento', 'Em andamento'),
@@ -47,6 +49,9 @@ class Tarefas(models.Model):
     
     data_inicio = models.DateField(default=datetime.date.today)
     data_fim_prevista = models.DateField(null=True, blank=True)
+
+    # Última modificação, usada pela sincronização incremental (?updated_since=)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def clean(self):
         if self.data_fim_prevista and self.data_inicio and self.data_fim_prevista < self.data_inicio:
@@ -62,6 +67,84 @@ class Tarefas(models.Model):
         ordering = ['prioridade', 'data_fim_prevista']
         verbose_name = 'Tarefa'
         verbose_name_plural = 'Tarefas'
+        # Índice para a linha do tempo das tarefas de um projeto (projetos/timeline.py)
+        indexes = [
+            models.Index(fields=['projeto', 'data_inicio', 'data_fim_prevista'], name='tarefa_intervalo_idx'),
+        ]
         
     def __str__(self):
-        return f"{self.titulo} ({self.get_status_display()})"
\ No newline at end of file
+        return f"{self.titulo} ({self.get_status_display()})"
+
+class HistoricoStatusTarefa(models.Model):
+    """Cada mudança de status de uma tarefa (status_anterior nulo = criação)"""
+    tarefa = models.ForeignKey(Tarefas, on_delete=models.CASCADE, related_name='historico_status')
+    status_anterior = models.CharField(max_length=20, choices=Tarefas.STATUS_CHOICES, null=True, blank=True)
+    status_novo = models.CharField(max_length=20, choices=Tarefas.STATUS_CHOICES)
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['tarefa', 'criado_em']
+        verbose_name = 'Histórico de Status'
+        verbose_name_plural = 'Históricos de Status'
+        indexes = [models.Index(fields=['tarefa', 'criado_em'], name='historico_tarefa_idx')]
+
+
+class MetricaTarefa(models.Model):
+    """
+    Marcos de tempo da tarefa, mantidos a cada transição:
+    lead time = concluída - criada, cycle time = concluída - iniciada.
+    """
+    tarefa = models.OneToOneField(Tarefas, on_delete=models.CASCADE, primary_key=True, related_name='metrica')
+    projeto_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    criada_em = models.DateTimeField()
+    iniciada_em = models.DateTimeField(null=True, blank=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Métrica de Tarefa'
+        verbose_name_plural = 'Métricas de Tarefas'
+
+
+class BurndownDiario(models.Model):
+    """
+    Contadores diários por projeto. Guardamos só as variações do dia; a série
+    acumulada (total e abertas) é montada no endpoint somando os dias.
+    """
+    projeto = models.ForeignKey('projetos.Projeto', on_delete=models.CASCADE, related_name='burndown')
+    data = models.DateField()
+    criadas = models.IntegerField(default=0)
+    concluidas = models.IntegerField(default=0)
+    reabertas = models.IntegerField(default=0)
+    removidas = models.IntegerField(default=0)
+    # Tarefas removidas que já estavam concluídas (saem do total e das concluídas)
+    removidas_concluidas = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['projeto', 'data']
+        verbose_name = 'Burndown Diário'
+        verbose_name_plural = 'Burndown Diário'
+        unique_together = ['projeto', 'data']
+
+
+class EnvioLembrete(models.Model):
+    """
+    Último resumo de prazos enviado a cada usuário (tarefas/lembretes.py).
+    A assinatura é o hash do conteúdo: o mesmo resumo não é reenviado antes
+    de LEMBRETES_INTERVALO_HORAS.
+    """
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='+'
+    )
+    assinatura = models.CharField(max_length=64)
+    enviado_em = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Envio de Lembrete'
+        verbose_name_plural = 'Envios de Lembretes'
@@ -0,0 +1,34 @@
+"""Projeções de listagem (ver DevLab/projecao.py) para tarefas"""
+from DevLab.projecao import Projecao, data, data_hora
+from equipe.projecoes import ProjecaoEquipe
+from usuarios.projecoes import colunas_usuario, usuario_de_linha
+
+
+class ProjecaoTarefa(Projecao):
+    """Mesma saída do TarefaSerializer (o responsável vem no mesmo SELECT; as equipes, em lote)"""
+    colunas = (
+        'id', 'titulo', 'descricao', 'status', 'prioridade', 'projeto_id', 'equipe_id',
+        *colunas_usuario('responsavel__'),
+        'data_inicio', 'data_fim_prevista', 'updated_at', 'versao',
+    )
+
+    def montar(self, linhas):
+        equipes = ProjecaoEquipe().por_id({linha['equipe_id'] for linha in linhas} - {None})
+        return [
+            {
+                'id': linha['id'],
+                'titulo': linha['titulo'],
+                'descricao': linha['descricao'],
+                'status': linha['status'],
+                'prioridade': linha['prioridade'],
+                'projeto': linha['projeto_id'],
+                'equipe': equipes.get(linha['equipe_id']),
+                'responsavel': linha['responsavel__id'],
+                'responsavel_detalhes': usuario_de_linha(linha, 'responsavel__'),
+                'data_inicio': data(linha['data_inicio']),
+                'data_fim_prevista': data(linha['data_fim_prevista']),
+                'updated_at': data_hora(linha['updated_at']),
+                'versao': linha['versao'],
+            }
+            for linha in linhas
+        ]
@@ -19,9 +19,9 @@ class TarefaSerializer(serializers.ModelSerializer):
             'id', 'titulo', 'descricao', 'status', 'prioridade',
             'projeto', 'equipe',
             'responsavel', 'responsavel_id', 'responsavel_detalhes',
-            'data_inicio', 'data_fim_prevista'
+            'data_inicio', 'data_fim_prevista', 'updated_at', 'versao'
         ]
-        read_only_fields = ['id', 'responsavel']
+        read_only_fields = ['id', 'responsavel', 'updated_at', 'versao']
         
     def validate(self, attrs):
         """Valida que a data de fim não seja anterior à data de início."""
@@ -35,7 +35,7 @@ class TarefaSerializer(serializers.ModelSerializer):
         
         # Valida responsável se fornecido
         responsavel_id = attrs.get('responsavel_id')
-        projeto = attrs.get('projeto') or getattr(self.instance, 'projeto', None)
+        projeto = attrs.get('projeto') or self.context.get('projeto') or getattr(self.instance, 'projeto', None)
         
         if responsavel_id:
             try:
@@ -1,3 +1,360 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.utils import timezone
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from DevLab.orcamento_consultas import ListagemRapidaMixin, OrcamentoConsultasMixin, rota
+from equipe.models import Equipe
+from projetos.models import ParticipacaoProjeto, Projeto
+from tarefas.historico import serie_burndown
+from tarefas.lembretes import enviar_lembretes
+from tarefas.models import EnvioLembrete, HistoricoStatusTarefa, MetricaTarefa, Tarefas
+from usuarios.models import Usuario
+
+
+class ListagemRapidaTarefasTest(ListagemRapidaMixin, TestCase):
+
+    urls_listagem = [
+        '/api/tarefas/?tamanho=100',
+        '/api/tarefas/?tamanho=5&page=2',
+        '/api/tarefas/?status=concluida&ordering=data_inicio',
+        '/api/tarefas/?search=ção&ordering=-data_fim_prevista',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario_listagem = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='000.000.000-00', tipo_usuario='coordenador'
+        )
+        estudantes = [
+            Usuario.objects.create_user(
+                f'aluno{i}', f'aluno{i}@devlab.com', 'senha', nome=f'Aluno Ção {i}', cpf=f'111.111.111-{i:02d}',
+                tipo_usuario='estudante'
+            )
+            for i in range(4)
+        ]
+        projeto = Projeto.objects.create(
+            nome='Projeto', descricao='Descrição', created_by=cls.usuario_listagem,
+            data_inicio=timezone.localdate(),
+        )
+        for estudante in estudantes:
+            ParticipacaoProjeto.objects.create(projeto=projeto, usuario=estudante)
+
+        com_lider = Equipe.objects.create(nome='Equipe A', descricao='', projeto=projeto, lider=estudantes[0])
+        # Membros adicionados fora de ordem: a saída ordena por id nos dois caminhos
+        com_lider.membros.add(estudantes[2], estudantes[0], estudantes[1])
+        sem_lider = Equipe.objects.create(nome='Equipe B', descricao='Sem líder', projeto=projeto)
+
+        for i in range(12):
+            Tarefas.objects.create(
+                titulo=f'Tarefa "{i}" ção',
+                descricao='Linha 1\nLinha 2' if i % 2 else '',
+                status=['nao_iniciado', 'em_andamento', 'concluida'][i % 3],
+                prioridade=i % 3 + 1,
+                projeto=projeto if i % 4 else None,
+                equipe=[com_lider, sem_lider, None][i % 3],
+                responsavel=estudantes[i % 4] if i % 5 else None,
+                data_inicio=timezone.localdate() + datetime.timedelta(days=i),
+                data_fim_prevista=None if i % 2 else timezone.localdate() + datetime.timedelta(days=30 + i),
+            )
+
+    def test_consultas_da_listagem_rapida(self):
+        # Contagem, página (com o responsável junto), equipes e membros das equipes
+        cliente = APIClient()
+        cliente.force_authenticate(self.usuario_listagem)
+        with self.assertNumQueries(4):
+            cliente.get('/api/tarefas/?tamanho=100')
+
+
+class OrcamentoConsultasTarefasTest(OrcamentoConsultasMixin, TestCase):
+    """Consultas por rota de tarefas (DevLab/orcamento_consultas.py)"""
+
+    rotas = [
+        rota('get', '/api/tarefas/', 4),
+        rota('get', '/api/tarefas/', 3, LISTAGEM_RAPIDA=False),
+        rota('get', '/api/tarefas/{tarefa}/', 2),
+        rota('get', '/api/tarefas/{tarefa}/historico/', 3),
+        rota('get', '/api/tarefas/calendario/', 0),
+        rota('post', '/api/tarefas/calendario/', 3),
+        rota('get', '/api/calendario/{calendario}.ics', 3, usuario=None),
+        rota('post', '/api/tarefas/', 15, {'titulo': 'Nova', 'projeto': '{projeto}'}),
+        # Só o responsável edita e exclui a tarefa
+        rota('patch', '/api/tarefas/{tarefa}/', 11, {'titulo': 'Outro título'}, usuario='estudante'),
+        rota('put', '/api/tarefas/{tarefa}/', 17, {
+            'titulo': 'Outro título', 'descricao': 'Nova', 'status': 'em_andamento', 'prioridade': 1,
+            'projeto': '{projeto}', 'data_inicio': '2030-01-01', 'data_fim_prevista': '2030-01-10',
+        }, usuario='estudante'),
+        rota('delete', '/api/tarefas/{tarefa}/', 15, usuario='estudante'),
+        rota('post', '/api/tarefas/{tarefa}/assign/', 9, {'responsavel_id': '{outro_estudante}'}),
+        rota('post', '/api/tarefas/{tarefa}/change_status/', 16, {'status': 'em_andamento'}),
+    ]
+
+
+class CalendarioTest(TestCase):
+    """Feed .ics: versão tirada do banco (igual em qualquer worker) e links revogáveis"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.estudante = Usuario.objects.create_user(
+            'aluno', 'aluno@devlab.com', 'senha', nome='Aluno', cpf='111.111.111-11', tipo_usuario='estudante'
+        )
+        cls.projeto = Projeto.objects.create(
+            nome='Projeto', descricao='Descrição', data_inicio=timezone.localdate(),
+            data_fim_prevista=timezone.localdate() + datetime.timedelta(days=60),
+        )
+        ParticipacaoProjeto.objects.create(projeto=cls.projeto, usuario=cls.estudante)
+        cls.tarefa = Tarefas.objects.create(
+            titulo='Entrega', projeto=cls.projeto, responsavel=cls.estudante, data_inicio=timezone.localdate(),
+            data_fim_prevista=timezone.localdate() + datetime.timedelta(days=7),
+        )
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.estudante)
+
+    def link(self, metodo='get'):
+        url = getattr(self.cliente, metodo)('/api/tarefas/calendario/').data['url']
+        return url[url.index('/api/'):]
+
+    def test_feed_e_etag(self):
+        url = self.link()
+        resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn(b'SUMMARY:Prazo: Entrega', resposta.content)
+        self.assertIn(b'SUMMARY:Fim previsto do projeto: Projeto', resposta.content)
+
+        etag = resposta['ETag']
+        # Sem cache nenhum (outro worker): mesma versão, mesmo ETag
+        cache.clear()
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Lista e forma fraca valem; pedaço do valor ou outro ETag não
+        for cabecalho, esperado in (
+            (f'"outro", W/{etag}', 304),
+            ('*', 304),
+            (etag[1:-1], 200),
+            (f'"x{etag[1:-1]}"', 200),
+            (f'"{etag[1:9]}"', 200),
+        ):
+            with self.subTest(cabecalho=cabecalho):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=cabecalho).status_code, esperado)
+
+    def test_versao_muda_com_o_banco(self):
+        url = self.link()
+        etags = [self.client.get(url)['ETag']]
+
+        def mudou():
+            etags.append(self.client.get(url)['ETag'])
+            return etags[-1] != etags[-2]
+
+        self.tarefa.titulo = 'Entrega final'
+        self.tarefa.save()
+        self.assertTrue(mudou())
+        # O nome do projeto aparece na descrição das tarefas
+        self.projeto.nome = 'Projeto renomeado'
+        self.projeto.save()
+        self.assertTrue(mudou())
+        Tarefas.objects.create(titulo='Outra', responsavel=self.estudante, data_inicio=timezone.localdate())
+        self.assertTrue(mudou())
+        self.tarefa.delete()
+        self.assertTrue(mudou())
+        ParticipacaoProjeto.objects.filter(usuario=self.estudante).delete()
+        self.assertTrue(mudou())
+        self.assertNotIn(b'Projeto renomeado', self.client.get(url).content)
+        self.assertFalse(mudou())
+
+    def test_renovar_revoga_links_antigos(self):
+        antigo = self.link()
+        novo = self.link('post')
+        self.assertNotEqual(antigo, novo)
+        self.assertEqual(self.client.get(antigo).status_code, 404)
+        self.assertEqual(self.client.get(novo).status_code, 200)
+
+    def test_token_invalido(self):
+        from django.core import signing
+        from tarefas.calendario import SALT_TOKEN
+
+        # Formato antigo (só o id, sem chave) e assinatura inválida
+        legado = signing.dumps(self.estudante.pk, salt=SALT_TOKEN)
+        self.assertEqual(self.client.get(f'/api/calendario/{legado}.ics').status_code, 404)
+        self.assertEqual(self.client.get('/api/calendario/invalido.ics').status_code, 404)
+
+
+class TransicaoTest(TestCase):
+    """Histórico, métricas e burndown das tarefas (tarefas/historico.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.estudante = Usuario.objects.create_user(
+            'aluno', 'aluno@devlab.com', 'senha', nome='Aluno', cpf='111.111.111-11', tipo_usuario='estudante'
+        )
+        cls.projeto = Projeto.objects.create(nome='A', descricao='D', data_inicio=timezone.localdate())
+        cls.outro_projeto = Projeto.objects.create(nome='B', descricao='D', data_inicio=timezone.localdate())
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.estudante)
+        resposta = self.cliente.post('/api/tarefas/', {'titulo': 'T', 'projeto': self.projeto.id}, format='json')
+        self.assertEqual(resposta.status_code, 201)
+        self.tarefa = Tarefas.objects.get(pk=resposta.data['id'])
+
+    def mudar_status(self, status):
+        resposta = self.cliente.post(f'/api/tarefas/{self.tarefa.id}/change_status/', {'status': status}, format='json')
+        self.assertEqual(resposta.status_code, 200)
+
+    def burndown(self, projeto):
+        serie = serie_burndown(projeto.id)
+        return serie['total'][-1], serie['concluidas'][-1]
+
+    def test_transicoes(self):
+        self.mudar_status('em_andamento')
+        self.mudar_status('em_andamento')
+        self.assertEqual(
+            self.cliente.patch(f'/api/tarefas/{self.tarefa.id}/', {'status': 'concluida'}, format='json').status_code,
+            200
+        )
+        metrica = MetricaTarefa.objects.get(tarefa=self.tarefa)
+        self.assertIsNotNone(metrica.iniciada_em)
+        self.assertIsNotNone(metrica.concluida_em)
+        self.assertEqual(self.burndown(self.projeto), (1, 1))
+
+        self.mudar_status('nao_iniciado')
+        metrica.refresh_from_db()
+        self.assertIsNone(metrica.concluida_em)
+        self.assertEqual(self.burndown(self.projeto), (1, 0))
+        # Status repetido não gera linha
+        self.assertEqual(
+            list(HistoricoStatusTarefa.objects.filter(tarefa=self.tarefa).order_by('id').values_list(
+                'status_anterior', 'status_novo'
+            )),
+            [(None, 'nao_iniciado'), ('nao_iniciado', 'em_andamento'), ('em_andamento', 'concluida'),
+             ('concluida', 'nao_iniciado')]
+        )
+
+        self.assertEqual(self.cliente.delete(f'/api/tarefas/{self.tarefa.id}/').status_code, 204)
+        self.assertEqual(self.burndown(self.projeto), (0, 0))
+
+    def test_mudar_de_projeto_leva_as_metricas(self):
+        self.mudar_status('concluida')
+        resposta = self.cliente.patch(
+            f'/api/tarefas/{self.tarefa.id}/', {'projeto': self.outro_projeto.id}, format='json'
+        )
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(self.burndown(self.projeto), (0, 0))
+        self.assertEqual(self.burndown(self.outro_projeto), (1, 1))
+        self.assertEqual(MetricaTarefa.objects.get(tarefa=self.tarefa).projeto_id, self.outro_projeto.id)
+        fluxo = self.cliente.get(f'/api/projetos/{self.outro_projeto.id}/fluxo/').data
+        self.assertEqual(fluxo['tarefas']['ids'], [self.tarefa.id])
+
+        # Mudando projeto e status juntos
+        resposta = self.cliente.patch(
+            f'/api/tarefas/{self.tarefa.id}/', {'projeto': self.projeto.id, 'status': 'em_andamento'}, format='json'
+        )
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(self.burndown(self.projeto), (1, 0))
+        self.assertEqual(self.burndown(self.outro_projeto), (0, 0))
+
+    def test_status_e_historico_na_mesma_transacao(self):
+        with mock.patch('tarefas.historico.HistoricoStatusTarefa.objects.create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.cliente.post(f'/api/tarefas/{self.tarefa.id}/change_status/', {'status': 'concluida'})
+        self.tarefa.refresh_from_db()
+        self.assertEqual(self.tarefa.status, 'nao_iniciado')
+        self.assertEqual(self.burndown(self.projeto), (1, 0))
+
+
+@override_settings(LEMBRETES_DIAS_ANTECEDENCIA=3, LEMBRETES_INTERVALO_HORAS=20, LEMBRETES_LOTE=10)
+class LembretesTest(TestCase):
+    """Resumo diário de prazos (tarefas/lembretes.py), com o backend locmem dos testes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.hoje = timezone.localdate()
+        cls.lider, cls.aluno, cls.outro = [
+            Usuario.objects.create_user(
+                username, f'{username}@devlab.com', 'senha', nome=nome, cpf=f'cpf-{username}', tipo_usuario='estudante'
+            )
+            for username, nome in (('lider', 'Líder'), ('aluno', 'Aluno'), ('outro', 'Outro'))
+        ]
+        cls.projeto = Projeto.objects.create(nome='Projeto', descricao='D', data_inicio=cls.hoje)
+        ParticipacaoProjeto.objects.create(projeto=cls.projeto, usuario=cls.lider, is_leader=True)
+        ParticipacaoProjeto.objects.create(projeto=cls.projeto, usuario=cls.aluno)
+
+        def tarefa(titulo, responsavel, dias, **extras):
+            return Tarefas.objects.create(
+                titulo=titulo, projeto=cls.projeto, responsavel=responsavel, data_inicio=cls.hoje,
+                data_fim_prevista=cls.hoje + datetime.timedelta(days=dias), **extras
+            )
+
+        atrasada = tarefa('Atrasada', cls.aluno, 0)
+        tarefa('Hoje', cls.lider, 0)
+        tarefa('Longe', cls.aluno, 10)
+        tarefa('Feita', cls.aluno, 1, status='concluida')
+        # O save não aceita prazo antes do início: a atrasada vai direto no banco
+        Tarefas.objects.filter(pk=atrasada.pk).update(
+            data_inicio=cls.hoje - datetime.timedelta(days=5), data_fim_prevista=cls.hoje - datetime.timedelta(days=2)
+        )
+        cls.sem_projeto = Tarefas.objects.create(
+            titulo='Solta', responsavel=cls.outro, data_inicio=cls.hoje, data_fim_prevista=cls.hoje
+        )
+
+    def enviar(self, **kwargs):
+        mail.outbox = []
+        return enviar_lembretes(hoje=self.hoje, **kwargs)
+
+    def test_secoes_do_resumo(self):
+        resultado = self.enviar()
+        self.assertEqual((resultado['resumos'], resultado['enviados'], resultado['falhas']), (3, 3, 0))
+        por_email = {mensagem.to[0]: mensagem.body for mensagem in mail.outbox}
+
+        self.assertIn('- Atrasada (Projeto): atrasada há 2 dia(s)', por_email['aluno@devlab.com'])
+        self.assertNotIn('Longe', por_email['aluno@devlab.com'])
+        self.assertNotIn('Feita', por_email['aluno@devlab.com'])
+        self.assertNotIn('que você lidera', por_email['aluno@devlab.com'])
+
+        lider = por_email['lider@devlab.com']
+        self.assertIn('Suas tarefas com prazo próximo ou atrasadas:\n- Hoje (Projeto): vence hoje', lider)
+        self.assertIn('Tarefas dos projetos que você lidera:\n- Atrasada (Projeto)', lider)
+        self.assertIn('- Aluno', lider)
+        self.assertIn('Solta (sem projeto): vence hoje', por_email['outro@devlab.com'])
+
+    def test_nao_repete_o_mesmo_resumo(self):
+        self.enviar()
+        resultado = self.enviar()
+        self.assertEqual((resultado['enviados'], resultado['repetidos']), (0, 3))
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(self.enviar(forcar=True)['enviados'], 3)
+
+        # Mudou o resumo de um: só ele recebe
+        Tarefas.objects.filter(pk=self.sem_projeto.pk).update(data_fim_prevista=self.hoje + datetime.timedelta(days=1))
+        self.enviar()
+        self.assertEqual([mensagem.to for mensagem in mail.outbox], [['outro@devlab.com']])
+
+        # Mesmo resumo de novo depois do intervalo
+        EnvioLembrete.objects.filter(usuario=self.aluno).update(enviado_em=timezone.now() - datetime.timedelta(hours=21))
+        self.enviar()
+        self.assertEqual([mensagem.to for mensagem in mail.outbox], [['aluno@devlab.com']])
+
+    def test_falha_no_meio_do_lote(self):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        enviar = EmailBackend.send_messages
+
+        def falhar_para_o_aluno(backend, mensagens):
+            if mensagens[0].to == ['aluno@devlab.com']:
+                raise OSError('SMTP caiu')
+            return enviar(backend, mensagens)
+
+        with mock.patch.object(EmailBackend, 'send_messages', falhar_para_o_aluno):
+            with self.assertLogs('tarefas.lembretes', 'ERROR'):
+                resultado = self.enviar()
+        self.assertEqual((resultado['enviados'], resultado['falhas']), (2, 1))
+        # Os entregues ficam registrados; na próxima rodada só vai o que falhou
+        self.assertEqual(set(EnvioLembrete.objects.values_list('usuario_id', flat=True)), {self.lider.id, self.outro.id})
+        self.enviar()
+        self.assertEqual([mensagem.to for mensagem in mail.outbox], [['aluno@devlab.com']])
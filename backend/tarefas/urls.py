@@ -1,7 +1,10 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from tarefas.views import TarefaViewSet  
+from tarefas.views import TarefaViewSet, calendario_ics
 
 router = DefaultRouter()
 router.register(r'tarefas', TarefaViewSet, basename='tarefa')
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = [
+    path('calendario/<str:token>.ics', calendario_ics, name='calendario-ics'),
+] + router.urls
@@ -1,5 +1,10 @@
 # tarefas/views.py
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import HttpResponse, HttpResponseNotFound
+from django.urls import reverse
+from django.views.decorators.http import require_GET
 from django.utils.dateparse import parse_date
 
 from rest_framework import viewsets, permissions, filters, status
@@ -10,6 +15,14 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import Tarefas  # ← Corrigido: Tarefas (plural)
 from .serializers import TarefaSerializer
+from .projecoes import ProjecaoTarefa
+from .historico import projeto_da_tarefa, registrar_criacao, registrar_transicao, registrar_remocao
+from . import calendario
+from atividades.buffer import registrar_atividade
+from atividades.models import Atividade
+from DevLab.concorrencia import ConcorrenciaOtimistaMixin
+from DevLab.projecao import ListagemRapidaMixin
+from sincronizacao.delta import SincronizacaoMixin
 
 User = get_user_model()
 
@@ -45,10 +58,15 @@ class TarefaPaginacao(PageNumberPagination):
     max_page_size = 100
 
 
-class TarefaViewSet(viewsets.ModelViewSet):
+class TarefaViewSet(SincronizacaoMixin, ListagemRapidaMixin, ConcorrenciaOtimistaMixin, viewsets.ModelViewSet):
     # Aqui eu uso select_related pra otimizar - traz responsavel e equipe junto numa query só
-    queryset = Tarefas.objects.select_related('responsavel', 'equipe').all()
+    # (os membros da equipe em ordem de id, a mesma da listagem rápida)
+    queryset = Tarefas.objects.select_related(
+        'responsavel', 'equipe__projeto', 'equipe__lider'
+    ).prefetch_related(Prefetch('equipe__membros', queryset=User.objects.order_by('id')))
     serializer_class = TarefaSerializer
+    # GET da listagem sai direto do .values() (DevLab/projecao.py)
+    projecao_listagem = ProjecaoTarefa
     permission_classes = [IsResponsavelOrReadOnly]
     pagination_class = TarefaPaginacao
 
@@ -61,13 +79,32 @@ class TarefaViewSet(viewsets.ModelViewSet):
     ordering_fields = ['prioridade', 'data_fim_prevista', 'data_inicio']
     # Ordem padrão: mais prioritárias primeiro, depois por prazo
     ordering = ['-prioridade', 'data_fim_prevista']
+    # Actions que devolvem a tarefa (e o ETag com a versão dela)
+    acoes_com_etag = ('retrieve', 'update', 'partial_update', 'change_status', 'assign')
 
+    # Tarefa e histórico/burndown sempre na mesma transação (tarefas/historico.py)
     def perform_create(self, serializer):
         validated = getattr(serializer, 'validated_data', None)
-        if validated and validated.get('responsavel') is None:
-            serializer.save(responsavel=self.request.user)
-        else:
+        with transaction.atomic():
+            if validated and validated.get('responsavel') is None:
+                serializer.save(responsavel=self.request.user)
+            else:
+                serializer.save()
+            registrar_criacao(serializer.instance, usuario=self.request.user)
+
+    def perform_update(self, serializer):
+        status_anterior = serializer.instance.status
+        projeto_anterior_id = projeto_da_tarefa(serializer.instance)
+        with transaction.atomic():
             serializer.save()
+            registrar_transicao(
+                serializer.instance, status_anterior, projeto_anterior_id, usuario=self.request.user
+            )
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            registrar_remocao(instance)
+            instance.delete()
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def assign(self, request, pk=None):
@@ -92,8 +129,14 @@ class TarefaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
             
+        responsavel_anterior = tarefa.responsavel_id
         tarefa.responsavel = user
         tarefa.save()
+        registrar_atividade(
+            Atividade.TIPO_RESPONSAVEL_TAREFA, usuario=request.user,
+            projeto_id=tarefa.projeto_id, objeto_id=tarefa.id,
+            de=responsavel_anterior, para=user.id
+        )
         serializer = self.get_serializer(tarefa)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -120,8 +163,70 @@ class TarefaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        status_anterior = tarefa.status
         tarefa.status = status_novo
-        tarefa.save()
+        with transaction.atomic():
+            tarefa.save()
+            registrar_transicao(tarefa, status_anterior, projeto_da_tarefa(tarefa), usuario=request.user)
+        registrar_atividade(
+            Atividade.TIPO_STATUS_TAREFA, usuario=request.user,
+            projeto_id=tarefa.projeto_id, objeto_id=tarefa.id,
+            de=status_anterior, para=status_novo
+        )
         
         serializer = self.get_serializer(tarefa)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def historico(self, request, pk=None):
+        """
+        Histórico de status da tarefa.
+        GET /api/tarefas/{id}/historico/
+        """
+        tarefa = self.get_object()
+        historico = tarefa.historico_status.values(
+            'status_anterior', 'status_novo', 'usuario_id', 'criado_em'
+        ).order_by('criado_em')
+        return Response(list(historico))
+
+    @action(detail=False, methods=['get', 'post'], url_path='calendario',
+            permission_classes=[permissions.IsAuthenticated])
+    def link_calendario(self, request):
+        """
+        Endereço do feed .ics com os prazos do usuário logado.
+        GET /api/tarefas/calendario/ -> {"url": "https://.../api/calendario/<token>.ics"}
+        POST gera um endereço novo e invalida todos os anteriores (link vazado).
+        """
+        if request.method == 'POST':
+            calendario.renovar_chave(request.user)
+        token = calendario.gerar_token(request.user)
+        url = request.build_absolute_uri(reverse('calendario-ics', args=[token]))
+        return Response({'url': url})
+
+
+@require_GET
+def calendario_ics(request, token):
+    """
+    Feed iCalendar do usuário do token. Responde 304 se o cliente já tem a versão
+    atual (If-None-Match), só com as duas consultas da versão.
+    """
+    lido = calendario.ler_token(token)
+    if lido is None:
+        return HttpResponseNotFound()
+    usuario_id, chave = lido
+
+    versao = calendario.versao_calendario(usuario_id, chave)
+    if versao is None:
+        # Chave renovada: o link foi revogado
+        return HttpResponseNotFound()
+    etag = calendario.etag_calendario(usuario_id, versao)
+    if calendario.etag_confere(etag, request.META.get('HTTP_IF_NONE_MATCH', '')):
+        resposta = HttpResponse(status=304)
+    else:
+        resposta = HttpResponse(
+            calendario.ics_em_cache(usuario_id, versao),
+            content_type='text/calendar; charset=utf-8'
+        )
+    resposta['ETag'] = etag
+    resposta['Cache-Control'] = 'private, no-cache'
+    return resposta
@@ -1,11 +1,35 @@
+import re
+
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 
+from DevLab.admin_rapido import AdminRapidoMixin
+from usuarios.busca import filtro_prefixo, normalizar
+
 Usuario = get_user_model()
 
 @admin.register(Usuario)
-class UsuarioAdmin(admin.ModelAdmin):
+class UsuarioAdmin(AdminRapidoMixin, admin.ModelAdmin):
     list_display = ['username', 'nome', 'email', 'tipo_usuario']
     list_filter = ['tipo_usuario']
+    # Usados pelo autocomplete (ex.: líder da equipe); a busca em si é a do get_search_results
     search_fields = ['username', 'nome', 'email', 'cpf']
     ordering = ['username']
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Busca por prefixo nas colunas indexadas (as normalizadas do autocomplete
+        e o cpf) em vez de "%termo%" em todos os campos. CPF (só dígitos e
+        pontuação) vai direto no cpf e e-mail (com @) direto no email.
+        """
+        termo = search_term.strip()
+        if not termo:
+            return queryset, False
+
+        if '@' in termo:
+            filtro = filtro_prefixo(normalizar(termo), ['email_busca'], queryset.db)
+        elif re.fullmatch(r'[\d.\-]+', termo):
+            filtro = filtro_prefixo(termo, ['cpf'], queryset.db)
+        else:
+            filtro = filtro_prefixo(normalizar(termo), ['username_busca', 'nome_busca'], queryset.db)
+        return queryset.filter(filtro), False
@@ -0,0 +1,90 @@
+"""
+Busca de usuários por prefixo (autocomplete dos seletores de participante,
+líder e professor).
+
+Nome, username e e-mail são guardados também normalizados (minúsculas e sem
+acento) em colunas com índice: "joão" e "JOAO" viram "joao". Cada coluna vira
+uma faixa do índice, não uma varredura da tabela:
+
+- PostgreSQL: LIKE 'termo%' (o Django cria junto um índice varchar_pattern_ops
+  para cada coluna indexada, que atende o LIKE com prefixo);
+- SQLite: o LIKE de lá não diferencia maiúsculas e por isso não usa o índice
+  (o EXPLAIN mostra SCAN ... USING INDEX, o índice inteiro). Como as colunas já
+  estão normalizadas, a busca vira coluna >= 'termo' AND coluna < 'termp'
+  (último caractere + 1), que na comparação binária do SQLite é exatamente o
+  prefixo e usa o índice (SEARCH).
+"""
+import unicodedata
+
+from django.db import connections
+from django.db.models import Q
+
+# Campo do modelo -> coluna normalizada
+CAMPOS_BUSCA = {'nome': 'nome_busca', 'username': 'username_busca', 'email': 'email_busca'}
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: 'João Ção' -> 'joao cao'"""
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold().strip()
+
+# Campos devolvidos pelo autocomplete (sem CPF)
+CAMPOS_AUTOCOMPLETE = ('id', 'username', 'nome', 'email', 'tipo_usuario')
+
+
+def filtro_prefixo(termo, colunas=CAMPOS_BUSCA.values(), banco='default'):
+    """
+    Q de "alguma das colunas começa com o termo" na forma que usa o índice.
+    O termo tem que estar como a coluna guarda (normalizado, nas de busca).
+    """
+    filtro = Q()
+    if not termo:
+        return filtro
+    if connections[banco].vendor == 'sqlite':
+        fim = termo[:-1] + chr(ord(termo[-1]) + 1)
+        for coluna in colunas:
+            filtro |= Q(**{f'{coluna}__gte': termo, f'{coluna}__lt': fim})
+    else:
+        for coluna in colunas:
+            filtro |= Q(**{f'{coluna}__startswith': termo})
+    return filtro
+
+
+def consultar_usuarios(termo, tipos=None, projeto_id=None, fora_do_projeto_id=None):
+    """
+    Queryset dos usuários cujo nome, username ou e-mail começa com o termo,
+    em ordem de nome (None se o termo ficar vazio). Filtros opcionais: tipos
+    de usuário, participantes ativos de um projeto, ou quem ainda não
+    participa de um projeto.
+    """
+    from django.contrib.auth import get_user_model
+    from django.db.models import Exists, OuterRef
+    from projetos.models import ParticipacaoProjeto
+
+    termo = normalizar(termo)
+    if not termo:
+        return None
+
+    usuarios = get_user_model().objects.all()
+    usuarios = usuarios.filter(filtro_prefixo(termo, banco=usuarios.db))
+
+    if tipos:
+        usuarios = usuarios.filter(tipo_usuario__in=tipos)
+    if projeto_id is not None:
+        usuarios = usuarios.filter(Exists(ParticipacaoProjeto.objects.filter(
+            projeto_id=projeto_id, usuario=OuterRef('pk'), ativo=True
+        )))
+    if fora_do_projeto_id is not None:
+        usuarios = usuarios.exclude(Exists(ParticipacaoProjeto.objects.filter(
+            projeto_id=fora_do_projeto_id, usuario=OuterRef('pk')
+        )))
+
+    return usuarios.order_by('nome_busca', 'id')
+
+
+def buscar_usuarios(termo, tipos=None, projeto_id=None, fora_do_projeto_id=None, limite=10):
+    """Até `limite` resultados de consultar_usuarios, só com os campos do autocomplete"""
+    usuarios = consultar_usuarios(termo, tipos, projeto_id, fora_do_projeto_id)
+    if usuarios is None:
+        return []
+    return list(usuarios.values(*CAMPOS_AUTOCOMPLETE)[:limite])
@@ -0,0 +1,200 @@
+"""
+Importação de turma (roster) em lote.
+
+Recebe as linhas já lidas do CSV/JSON, valida tudo de uma vez (unicidade
+contra o banco com consultas por conjunto, não uma por usuário), gera os hashes
+das senhas num pool de processos e cria os usuários com bulk_create. Se vier um
+projeto, os estudantes importados já entram como participantes na mesma transação.
+"""
+import csv
+import io
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+Usuario = get_user_model()
+
+CAMPOS_OBRIGATORIOS = ['username', 'nome', 'email', 'cpf', 'tipo_usuario']
+CAMPOS_UNICOS = ['username', 'email', 'cpf']
+TIPOS_VALIDOS = {tipo for tipo, _ in Usuario.TIPO_USUARIO}
+# O bulk_create não valida nada: tamanho e formato dos campos são checados aqui
+# com os validadores do próprio modelo (clean_fields, sem consulta ao banco)
+CAMPOS_FORA_DO_CLEAN = [
+    campo.name for campo in Usuario._meta.fields if campo.name not in ('username', 'nome', 'email', 'cpf')
+]
+
+
+def ler_csv(conteudo):
+    """Lê o CSV (aceita ',' ou ';' como separador) e devolve uma lista de dicts"""
+    if isinstance(conteudo, bytes):
+        conteudo = conteudo.decode('utf-8-sig')
+    try:
+        dialeto = csv.Sniffer().sniff(conteudo.splitlines()[0] if conteudo else '', delimiters=',;')
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.DictReader(io.StringIO(conteudo), dialect=dialeto)
+    return [
+        {(chave or '').strip(): (valor or '').strip() for chave, valor in linha.items()}
+        for linha in leitor
+    ]
+
+
+def validar_linhas(linhas):
+    """
+    Valida as linhas e devolve a lista de erros (vazia se estiver tudo certo).
+    Cada erro tem o número da linha (começando em 1) e a mensagem. Além dos
+    obrigatórios e da unicidade, valida formato e tamanho (e-mail, cpf com até
+    14 caracteres, username) como o modelo faria.
+    """
+    erros = []
+    vistos = {campo: {} for campo in CAMPOS_UNICOS}
+
+    for numero, linha in enumerate(linhas, start=1):
+        faltando = [campo for campo in CAMPOS_OBRIGATORIOS if not linha.get(campo)]
+        if faltando:
+            erros.append({'linha': numero, 'erro': f'Campos obrigatórios ausentes: {", ".join(faltando)}'})
+            continue
+
+        if linha['tipo_usuario'] not in TIPOS_VALIDOS:
+            erros.append({'linha': numero, 'erro': f'tipo_usuario inválido: {linha["tipo_usuario"]}'})
+
+        usuario = Usuario(username=linha['username'], nome=linha['nome'], email=linha['email'], cpf=linha['cpf'])
+        try:
+            usuario.clean_fields(exclude=CAMPOS_FORA_DO_CLEAN)
+        except ValidationError as erro:
+            for campo, mensagens in erro.message_dict.items():
+                erros.append({'linha': numero, 'erro': f'{campo}: {" ".join(mensagens)}'})
+
+        for campo in CAMPOS_UNICOS:
+            valor = linha[campo]
+            if valor in vistos[campo]:
+                erros.append({
+                    'linha': numero,
+                    'erro': f'{campo} "{valor}" repetido no arquivo (linha {vistos[campo][valor]})'
+                })
+            else:
+                vistos[campo][valor] = numero
+
+    # Uma consulta por campo único para o arquivo inteiro
+    for campo in CAMPOS_UNICOS:
+        valores = list(vistos[campo])
+        if not valores:
+            continue
+        existentes = set(
+            Usuario.objects.filter(**{f'{campo}__in': valores}).values_list(campo, flat=True)
+        )
+        for valor in existentes:
+            erros.append({'linha': vistos[campo][valor], 'erro': f'{campo} "{valor}" já cadastrado'})
+
+    return sorted(erros, key=lambda erro: erro['linha'])
+
+
+def _inicializar_processo():
+    # Com fork o Django já vem configurado; com spawn/forkserver precisa do setup
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def gerar_hashes(senhas):
+    """
+    Gera os hashes das senhas. O PBKDF2 é caro de propósito, então acima de um
+    limite o trabalho é dividido entre processos (threads não ajudam por causa do GIL).
+    """
+    if len(senhas) < settings.IMPORTACAO_LIMIAR_PROCESSOS:
+        return [make_password(senha) for senha in senhas]
+
+    processos = settings.IMPORTACAO_PROCESSOS or os.cpu_count() or 1
+    chunksize = max(1, len(senhas) // (processos * 4))
+    with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo) as executor:
+        return list(executor.map(make_password, senhas, chunksize=chunksize))
+
+
+def separar_senhas(linhas):
+    """
+    Tira o `password` em texto puro das linhas. Devolve (linhas sem senha,
+    {username: senha}). Usado antes de enfileirar a importação: os parâmetros
+    do job ficam gravados no banco, as senhas vão nos segredos do job (apagados
+    quando ele termina) e o hash é feito no worker.
+    """
+    senhas = {linha['username']: linha['password'] for linha in linhas if linha.get('password')}
+    sem_senha = [{chave: valor for chave, valor in linha.items() if chave != 'password'} for linha in linhas]
+    return sem_senha, senhas
+
+
+def juntar_senhas(linhas, senhas):
+    """Inverso do separar_senhas, no worker"""
+    return [
+        {**linha, 'password': senhas[linha['username']]} if linha['username'] in senhas else linha
+        for linha in linhas
+    ]
+
+
+def importar_usuarios(linhas, projeto=None):
+    """
+    Cria os usuários das linhas (já validadas) e, se houver projeto, matricula os
+    estudantes nele. Linhas sem `password` recebem uma senha temporária, que é
+    devolvida no resultado para o coordenador repassar.
+    """
+    from projetos.models import ParticipacaoProjeto, Projeto
+
+    senhas_temporarias = {}
+    senhas = []
+    for linha in linhas:
+        senha = linha.get('password')
+        if not senha:
+            senha = secrets.token_urlsafe(9)
+            senhas_temporarias[linha['username']] = senha
+        senhas.append(senha)
+
+    # O hash é feito antes de abrir a transação pra não segurar o banco enquanto isso
+    hashes = gerar_hashes(senhas)
+
+    with transaction.atomic():
+        novos = [
+            Usuario(
+                username=linha['username'],
+                nome=linha['nome'],
+                email=linha['email'],
+                cpf=linha['cpf'],
+                tipo_usuario=linha['tipo_usuario'],
+                password=hash_senha,
+            )
+            for linha, hash_senha in zip(linhas, hashes)
+        ]
+        # O bulk_create não chama o save(): as colunas do autocomplete são preenchidas aqui
+        for usuario in novos:
+            usuario.preencher_busca()
+        usuarios = Usuario.objects.bulk_create(novos, batch_size=500)
+
+        matriculados = 0
+        if projeto is not None:
+            # Mesma regra do add_participante: só estudantes participam do projeto
+            participacoes = ParticipacaoProjeto.objects.bulk_create(
+                [
+                    ParticipacaoProjeto(projeto=projeto, usuario=usuario, ativo=True)
+                    for usuario in usuarios
+                    if usuario.tipo_usuario == 'estudante'
+                ],
+                batch_size=500,
+            )
+            matriculados = len(participacoes)
+            if matriculados:
+                # O bulk_create não dispara o post_save que toca o projeto (sincronizacao/sinais.py):
+                # sem isso quem sincroniza com ?updated_since= não vê os participantes novos
+                Projeto.objects.filter(pk=projeto.pk).update(updated_at=timezone.now())
+
+    return {
+        'usuarios': usuarios,
+        'matriculados': matriculados,
+        'senhas_temporarias': senhas_temporarias,
+    }
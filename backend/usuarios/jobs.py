@@ -0,0 +1,35 @@
+"""Jobs da fila (fila/fila.py) do app de usuários"""
+from fila.fila import registrar_job
+from usuarios.importacao import validar_linhas, importar_usuarios, juntar_senhas
+
+
+@registrar_job('importar_usuarios')
+def job_importar_usuarios(job, linhas, projeto_id=None, usuario_id=None):
+    from projetos.models import Projeto
+
+    # Revalida: entre o enfileiramento e a execução alguém pode ter cadastrado os mesmos dados
+    erros = validar_linhas(linhas)
+    if erros:
+        return {'detail': 'Nenhum usuário foi importado.', 'erros': erros}
+    job.atualizar_progresso(10, 'Gerando as senhas')
+
+    projeto = Projeto.objects.filter(pk=projeto_id).first() if projeto_id else None
+    # Senhas informadas na planilha: vieram nos segredos de entrada (ver separar_senhas)
+    senhas = (job.segredos or {}).get('senhas', {})
+    resultado = importar_usuarios(juntar_senhas(linhas, senhas), projeto=projeto)
+    if projeto is not None and resultado['matriculados']:
+        from atividades.buffer import registrar_atividade
+        from atividades.models import Atividade
+        registrar_atividade(
+            Atividade.TIPO_PARTICIPANTES_IMPORTADOS, usuario=usuario_id,
+            projeto_id=projeto.id, total=resultado['matriculados']
+        )
+    return {
+        'detail': f'{len(resultado["usuarios"])} usuário(s) importado(s).',
+        'total': len(resultado['usuarios']),
+        'matriculados': resultado['matriculados'],
+        # O resultado fica no banco até a retenção: nada de dados pessoais (cpf, e-mail)
+        'usuarios': [{'id': usuario.id, 'username': usuario.username} for usuario in resultado['usuarios']],
+        # Fora do resultado: entregues uma vez só em GET /api/jobs/{id}/ (ver fila/fila.py)
+        'segredos': {'senhas_temporarias': resultado['senhas_temporarias']},
+    }
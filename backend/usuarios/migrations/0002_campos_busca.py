@@ -0,0 +1,44 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:16
+
+from django.db import migrations, models
+
+from usuarios.busca import CAMPOS_BUSCA, normalizar
+
+
+def preencher_busca(apps, schema_editor):
+    Usuario = apps.get_model('usuarios', 'Usuario')
+    usuarios = []
+    for usuario in Usuario.objects.only('id', *CAMPOS_BUSCA).iterator(chunk_size=1000):
+        for campo, coluna in CAMPOS_BUSCA.items():
+            setattr(usuario, coluna, normalizar(getattr(usuario, campo))[:Usuario._meta.get_field(coluna).max_length])
+        usuarios.append(usuario)
+        if len(usuarios) >= 1000:
+            Usuario.objects.bulk_update(usuarios, list(CAMPOS_BUSCA.values()))
+            usuarios = []
+    Usuario.objects.bulk_update(usuarios, list(CAMPOS_BUSCA.values()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuario',
+            name='email_busca',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='usuario',
+            name='nome_busca',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='usuario',
+            name='username_busca',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(preencher_busca, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+import usuarios.models
+
+
+def gerar_chaves(apps, schema_editor):
+    # O AddField grava o mesmo default em todas as linhas: cada usuário ganha a sua
+    Usuario = apps.get_model('usuarios', 'Usuario')
+    lote = []
+    for usuario in Usuario.objects.only('id').iterator(chunk_size=1000):
+        usuario.calendario_chave = usuarios.models.nova_chave_calendario()
+        lote.append(usuario)
+        if len(lote) >= 1000:
+            Usuario.objects.bulk_update(lote, ['calendario_chave'])
+            lote = []
+    Usuario.objects.bulk_update(lote, ['calendario_chave'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0002_campos_busca'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuario',
+            name='calendario_chave',
+            field=models.CharField(default=usuarios.models.nova_chave_calendario, editable=False, max_length=32),
+        ),
+        migrations.RunPython(gerar_chaves, migrations.RunPython.noop),
+    ]
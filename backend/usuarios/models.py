@@ -1,6 +1,15 @@
+import secrets
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from usuarios.busca import CAMPOS_BUSCA, normalizar
+
+
+def nova_chave_calendario():
+    return secrets.token_hex(16)
+
+
 class Usuario(AbstractUser):
     TIPO_USUARIO = (
         ('coordenador', 'Coordenador'),
@@ -13,5 +22,29 @@ class Usuario(AbstractUser):
     cpf = models.CharField(max_length=14, unique=True)
     email = models.EmailField(unique=True)
 
+    # Cópias normalizadas (minúsculas, sem acento) para o autocomplete (usuarios/busca.py)
+    nome_busca = models.CharField(max_length=100, db_index=True, editable=False, default='')
+    username_busca = models.CharField(max_length=150, db_index=True, editable=False, default='')
+    email_busca = models.CharField(max_length=254, db_index=True, editable=False, default='')
+
+    # Vai assinada no link do calendário (.ics); trocar a chave revoga os links antigos
+    calendario_chave = models.CharField(max_length=32, editable=False, default=nova_chave_calendario)
+
     def __str__(self):
         return f"{self.nome} ({self.tipo_usuario})"
+
+    def preencher_busca(self):
+        """Atualiza as colunas de busca (chamado no save; o bulk_create precisa chamar antes)"""
+        for campo, coluna in CAMPOS_BUSCA.items():
+            limite = self._meta.get_field(coluna).max_length
+            setattr(self, coluna, normalizar(getattr(self, campo))[:limite])
+
+    def save(self, *args, **kwargs):
+        self.preencher_busca()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # Ex.: o login salva só o last_login; as colunas de busca só vão junto dos campos delas
+            colunas = {CAMPOS_BUSCA[campo] for campo in update_fields if campo in CAMPOS_BUSCA}
+            if colunas:
+                kwargs['update_fields'] = {*update_fields, *colunas}
+        super().save(*args, **kwargs)
@@ -26,4 +26,4 @@ class CanViewOwnProjectsOnly(permissions.BasePermission):
             return True
         
         # Verifica se o usuário participa do projeto relacionado à equipe
-        return obj.projeto.participantes.filter(id=request.user.id).exists()
+        return obj.projeto.tem_participante(request.user.id)
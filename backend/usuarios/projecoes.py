@@ -0,0 +1,28 @@
+"""Projeções de listagem (ver DevLab/projecao.py) para usuários"""
+from DevLab.projecao import Projecao
+
+# Campos do UsuarioSerializer e do UsuarioResumoSerializer, na mesma ordem
+CAMPOS_USUARIO = ('id', 'username', 'nome', 'email', 'cpf', 'tipo_usuario')
+CAMPOS_USUARIO_RESUMO = ('id', 'username', 'nome', 'tipo_usuario')
+
+
+def usuario_de_linha(linha, prefixo, campos=CAMPOS_USUARIO):
+    """
+    Monta o usuário a partir das colunas com prefixo (ex.: 'responsavel__')
+    de uma linha do .values(). None quando o relacionamento é nulo.
+    """
+    if linha[f'{prefixo}id'] is None:
+        return None
+    return {campo: linha[f'{prefixo}{campo}'] for campo in campos}
+
+
+def colunas_usuario(prefixo, campos=CAMPOS_USUARIO):
+    return tuple(f'{prefixo}{campo}' for campo in campos)
+
+
+class ProjecaoUsuario(Projecao):
+    """Mesma saída do UsuarioSerializer"""
+    colunas = CAMPOS_USUARIO
+
+    def montar(self, linhas):
+        return [{campo: linha[campo] for campo in CAMPOS_USUARIO} for linha in linhas]
@@ -1,3 +1,236 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from DevLab.orcamento_consultas import ListagemRapidaMixin, OrcamentoConsultasMixin, rota
+from projetos.models import ParticipacaoProjeto, Projeto
+from usuarios.busca import consultar_usuarios
+from usuarios.models import Usuario
+from usuarios.throttles import _baldes_locais, usar_cache
+
+
+class ListagemRapidaUsuariosTest(ListagemRapidaMixin, TestCase):
+
+    urls_listagem = ['/api/usuarios/']
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, tipo in enumerate(['coordenador', 'professor', 'estudante', 'visitante', 'estudante']):
+            Usuario.objects.create_user(
+                f'user{5 - i}', f'user{i}@devlab.com', 'senha', nome=f'Usuário "{i}" ção',
+                cpf=f'333.333.333-{i:02d}', tipo_usuario=tipo
+            )
+        cls.usuario_listagem = Usuario.objects.first()
+
+
+class OrcamentoConsultasUsuariosTest(OrcamentoConsultasMixin, TestCase):
+    """Consultas por rota de usuários, atividades e jobs (DevLab/orcamento_consultas.py)"""
+
+    rotas = [
+        rota('get', '/api/usuarios/', 2),
+        rota('get', '/api/usuarios/', 2, LISTAGEM_RAPIDA=False),
+        rota('get', '/api/usuarios/{estudante}/', 1),
+        rota('get', '/api/usuarios/perfil/', 0),
+        rota('get', '/api/usuarios/autocomplete/?q=est', 1),
+        rota('patch', '/api/usuarios/editar-perfil/', 3, {'nome': 'Novo nome'}),
+        rota('put', '/api/usuarios/editar-perfil/', 4, {'nome': 'Novo nome', 'email': 'novo-email@devlab.com'}),
+        rota('post', '/api/usuarios/importar/', 8, {'usuarios': [
+            {'username': f'orc-imp{i}', 'nome': f'Importado {i}', 'email': f'orc-imp{i}@devlab.com',
+             'cpf': f'orc-imp{i}', 'tipo_usuario': 'estudante'}
+            for i in range(3)
+        ]}),
+        rota('post', '/api/usuarios/importar/', 11, {'projeto_id': '{projeto}', 'usuarios': [
+            {'username': f'orc-imp{i}', 'nome': f'Importado {i}', 'email': f'orc-imp{i}@devlab.com',
+             'cpf': f'orc-imp{i}', 'tipo_usuario': 'estudante'}
+            for i in range(3)
+        ]}),
+        rota('post', '/api/usuarios/registro/', 5, {
+            'username': 'orc-registro', 'email': 'orc-registro@devlab.com', 'password': 'Senha-Forte-1',
+            'nome': 'Registro', 'cpf': 'orc-registro',
+        }, usuario=None),
+        rota('post', '/api/token/', 3, {'username': 'orc-coord', 'password': 'senha'}, usuario=None),
+        rota('post', '/api/token/refresh/', 3, {'refresh': '{refresh}'}, usuario=None),
+        rota('get', '/api/instrumentacao/', 1),
+        rota('get', '/api/atividades/usuarios/{coordenador}/', 1),
+        rota('get', '/api/jobs/', 1),
+        rota('get', '/api/jobs/{job}/', 1),
+    ]
+
+
+@override_settings(
+    DEVLAB_THROTTLE_BACKEND='local',
+    DEVLAB_THROTTLE_TAXAS={'login_ip': '2/min', 'login_usuario': '100/min', 'relatorios': '1/min', 'importacao': '10/h'},
+)
+class ThrottleTest(TestCase):
+    """Token bucket (usuarios/throttles.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.coordenador = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='000.000.000-00', tipo_usuario='coordenador'
+        )
+
+    def setUp(self):
+        _baldes_locais.clear()
+        cache.clear()
+
+    def login(self, username='coord', **extra):
+        return self.client.post('/api/token/', {'username': username, 'password': 'errada'}, **extra).status_code
+
+    def test_x_forwarded_for_ignorado_sem_proxy(self):
+        # Um X-Forwarded-For inventado por tentativa não dá um balde novo
+        status = [self.login(HTTP_X_FORWARDED_FOR=f'10.0.0.{i}') for i in range(3)]
+        self.assertEqual(status, [401, 401, 429])
+
+    def test_com_proxy_vale_a_entrada_do_proxy(self):
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            status = [self.login(HTTP_X_FORWARDED_FOR=f'10.0.0.{i}, 200.1.1.1') for i in range(3)]
+            self.assertEqual(status, [401, 401, 429])
+            self.assertEqual(self.login(HTTP_X_FORWARDED_FOR='10.0.0.1, 200.1.1.2'), 401)
+
+    @override_settings(DEVLAB_THROTTLE_TAXAS={'login_ip': '100/min', 'login_usuario': '2/min'})
+    def test_login_por_usuario_de_varios_ips(self):
+        status = [self.login(REMOTE_ADDR=f'10.0.0.{i}') for i in range(3)]
+        self.assertEqual(status, [401, 401, 429])
+        self.assertEqual(self.login('outro', REMOTE_ADDR='10.0.0.9'), 401)
+
+    @override_settings(DEVLAB_THROTTLE_BACKEND='cache')
+    def test_backend_cache_vale_entre_workers(self):
+        self.assertEqual([self.login(), self.login()], [401, 401])
+        # Outro worker: a memória do processo é outra, o cache é o mesmo
+        _baldes_locais.clear()
+        self.assertEqual(self.login(), 429)
+
+    @override_settings(DEVLAB_THROTTLE_BACKEND='auto')
+    def test_auto_usa_o_cache_so_se_for_compartilhado(self):
+        self.assertFalse(usar_cache())
+        banco = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'devlab_cache'}}
+        with override_settings(CACHES=banco):
+            self.assertTrue(usar_cache())
+
+    def test_escopo_por_rota(self):
+        cliente = APIClient()
+        cliente.force_authenticate(self.coordenador)
+        resposta = cliente.get('/api/projetos/relatorios/series/')
+        self.assertEqual(resposta.status_code, 200)
+        resposta = cliente.get('/api/projetos/relatorios/')
+        self.assertEqual(resposta.status_code, 429)
+        self.assertIn('Retry-After', resposta)
+        # Outras rotas não têm o escopo
+        self.assertEqual(cliente.get('/api/usuarios/').status_code, 200)
+
+
+class ImportacaoTest(TestCase):
+    """Validação das linhas da importação de turma (usuarios/importacao.py)"""
+
+    def setUp(self):
+        coordenador = Usuario.objects.create_user(
+            'coord', 'coord@devlab.com', 'senha', nome='Coordenação', cpf='000.000.000-00', tipo_usuario='coordenador'
+        )
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(coordenador)
+
+    def linha(self, i, **campos):
+        return {
+            'username': f'aluno{i}', 'nome': f'Aluno {i}', 'email': f'aluno{i}@devlab.com',
+            'cpf': f'111.111.111-{i:02d}', 'tipo_usuario': 'estudante', **campos,
+        }
+
+    def importar(self, linhas):
+        return self.cliente.post('/api/usuarios/importar/', {'usuarios': linhas}, format='json')
+
+    def test_campos_invalidos_viram_erro_de_linha(self):
+        resposta = self.importar([
+            self.linha(1),
+            self.linha(2, email='sem-arroba'),
+            self.linha(3, cpf='1' * 15),
+            self.linha(4, username='u' * 151),
+            self.linha(5, username='com espaço'),
+            self.linha(6, nome='n' * 101),
+            self.linha(7, tipo_usuario='admin'),
+        ])
+        self.assertEqual(resposta.status_code, 400)
+        erros = {(erro['linha'], erro['erro'].split(':')[0]) for erro in resposta.data['erros']}
+        self.assertEqual(erros, {
+            (2, 'email'), (3, 'cpf'), (4, 'username'), (5, 'username'), (6, 'nome'), (7, 'tipo_usuario inválido'),
+        })
+        # Nada é importado se alguma linha tem erro
+        self.assertFalse(Usuario.objects.filter(username='aluno1').exists())
+
+    def test_repetidos_e_ja_cadastrados(self):
+        resposta = self.importar([self.linha(1), self.linha(2, email='aluno1@devlab.com'), self.linha(3, cpf='000.000.000-00')])
+        self.assertEqual(resposta.status_code, 400)
+        self.assertEqual([erro['linha'] for erro in resposta.data['erros']], [2, 3])
+
+    def test_importacao_valida(self):
+        resposta = self.importar([self.linha(1), self.linha(2, password='Senha-Forte-2')])
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(list(resposta.data['senhas_temporarias']), ['aluno1'])
+        self.assertTrue(Usuario.objects.get(username='aluno2').check_password('Senha-Forte-2'))
+        self.assertEqual(Usuario.objects.get(username='aluno1').nome_busca, 'aluno 1')
+
+
+class BuscaTest(TestCase):
+    """Autocomplete por prefixo (usuarios/busca.py) e a paginação de /api/usuarios/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        def criar(username, nome, tipo, email=None):
+            return Usuario.objects.create_user(
+                username, email or f'{username}@devlab.com', 'senha', nome=nome, cpf=f'cpf-{username}',
+                tipo_usuario=tipo
+            )
+
+        cls.coordenador = criar('coord', 'Coordenação', 'coordenador')
+        cls.joao = criar('jsilva', 'João Silva', 'estudante')
+        cls.joana = criar('joana', 'Joana Lima', 'professor')
+        cls.jonas = criar('jonas', 'Jonas Ávila', 'estudante', email='avila@devlab.com')
+        cls.projeto = Projeto.objects.create(nome='P', descricao='D', created_by=cls.coordenador)
+        ParticipacaoProjeto.objects.create(projeto=cls.projeto, usuario=cls.joao)
+        ParticipacaoProjeto.objects.create(projeto=cls.projeto, usuario=cls.jonas, ativo=False)
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.coordenador)
+
+    def buscar(self, **params):
+        resposta = self.cliente.get('/api/usuarios/autocomplete/', params)
+        self.assertEqual(resposta.status_code, 200)
+        return [usuario['username'] for usuario in resposta.data]
+
+    def test_sem_diferenciar_acento_e_maiusculas(self):
+        self.assertEqual(self.buscar(q='JOÃO'), ['jsilva'])
+        self.assertEqual(self.buscar(q='joao'), ['jsilva'])
+        self.assertEqual(self.buscar(q='Jo'), ['joana', 'jsilva', 'jonas'])
+        # Username e e-mail também contam; só prefixo, não meio do texto
+        self.assertEqual(self.buscar(q='jsil'), ['jsilva'])
+        self.assertEqual(self.buscar(q='ÁVILA'), ['jonas'])
+        self.assertEqual(self.buscar(q='silva'), [])
+        self.assertEqual(self.buscar(q='  '), [])
+
+    def test_filtros(self):
+        self.assertEqual(self.buscar(q='jo', tipo_usuario='estudante'), ['jsilva', 'jonas'])
+        self.assertEqual(self.buscar(q='jo', tipo_usuario='professor,coordenador'), ['joana'])
+        # Só participantes ativos
+        self.assertEqual(self.buscar(q='jo', projeto=self.projeto.id), ['jsilva'])
+        # Quem não tem participação nenhuma (nem inativa)
+        self.assertEqual(self.buscar(q='jo', fora_do_projeto=self.projeto.id), ['joana'])
+        self.assertEqual(self.buscar(q='jo', limite=1), ['joana'])
+        self.assertEqual(self.cliente.get('/api/usuarios/autocomplete/', {'projeto': 'x'}).status_code, 400)
+
+    def test_usa_faixa_do_indice(self):
+        plano = consultar_usuarios('jo').explain()
+        self.assertIn('SEARCH', plano)
+        self.assertNotIn('SCAN usuarios_usuario', plano)
+
+    def test_paginacao_da_listagem(self):
+        resposta = self.cliente.get('/api/usuarios/', {'tamanho': 2})
+        self.assertEqual(resposta.data['count'], 4)
+        self.assertEqual([u['username'] for u in resposta.data['results']], ['coord', 'jsilva'])
+        self.assertIsNotNone(resposta.data['next'])
+
+        segunda = self.cliente.get('/api/usuarios/', {'tamanho': 2, 'page': 2})
+        self.assertEqual([u['username'] for u in segunda.data['results']], ['joana', 'jonas'])
+        self.assertIsNone(segunda.data['next'])
+        self.assertEqual(len(self.cliente.get('/api/usuarios/').data['results']), 4)
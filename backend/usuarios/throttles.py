@@ -0,0 +1,156 @@
+"""
+Throttling por token bucket.
+
+Cada chave (escopo + IP ou username) tem um balde com `capacidade` fichas que
+se repõe continuamente. Cada requisição gasta uma ficha; sem ficha, o DRF
+devolve 429 antes de executar a view (no login isso acontece antes do hash da
+senha, que é a parte cara).
+
+As taxas ficam em settings.DEVLAB_THROTTLE_TAXAS, no formato "N/periodo"
+(periodo: s, min, h, dia). O estado fica na memória do processo ("local") ou no
+cache do Django ("cache"). Com "auto" (padrão) o cache é usado quando ele é
+compartilhado entre os workers (CACHE_BANCO=True); na memória do processo cada
+worker teria o próprio balde e o limite real seria multiplicado pelo número
+de workers.
+
+O IP do cliente é o get_ident do DRF: o X-Forwarded-For só vale com
+REST_FRAMEWORK['NUM_PROXIES'] configurado (variável NUM_PROXIES), e aí só a
+entrada colocada pelo nosso proxy. Sem isso, um cliente que inventa um
+X-Forwarded-For por requisição ganharia um balde novo a cada tentativa.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from DevLab.cache import cache_compartilhado
+
+PERIODOS = {'s': 1, 'seg': 1, 'min': 60, 'h': 3600, 'hora': 3600, 'dia': 86400, 'd': 86400}
+MAX_CHAVES_LOCAIS = 10000
+
+_baldes_locais = OrderedDict()
+_lock = threading.Lock()
+_rejeicoes = defaultdict(int)
+
+
+def interpretar_taxa(taxa):
+    """'10/min' -> (10, 10/60 fichas por segundo)"""
+    quantidade, periodo = taxa.split('/')
+    quantidade = int(quantidade)
+    return quantidade, quantidade / PERIODOS[periodo]
+
+
+def _consumir(tokens, atualizado_em, capacidade, reposicao, agora):
+    tokens = min(capacidade, tokens + (agora - atualizado_em) * reposicao)
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, (1 - tokens) / reposicao
+
+
+def _consumir_local(chave, capacidade, reposicao):
+    agora = time.monotonic()
+    with _lock:
+        tokens, atualizado_em = _baldes_locais.pop(chave, (capacidade, agora))
+        permitido, tokens, espera = _consumir(tokens, atualizado_em, capacidade, reposicao, agora)
+        _baldes_locais[chave] = (tokens, agora)
+        # Limita a memória: descarta os baldes usados há mais tempo
+        while len(_baldes_locais) > MAX_CHAVES_LOCAIS:
+            _baldes_locais.popitem(last=False)
+    return permitido, espera
+
+
+def _consumir_cache(chave, capacidade, reposicao):
+    # get/set não é atômico: em rajadas simultâneas o limite é aproximado,
+    # o que basta para segurar tempestades de login entre workers
+    agora = time.time()
+    chave = f'throttle:{chave}'
+    tokens, atualizado_em = cache.get(chave, (capacidade, agora))
+    permitido, tokens, espera = _consumir(tokens, atualizado_em, capacidade, reposicao, agora)
+    cache.set(chave, (tokens, agora), timeout=int(capacidade / reposicao) + 1)
+    return permitido, espera
+
+
+def usar_cache():
+    backend = settings.DEVLAB_THROTTLE_BACKEND
+    if backend == 'auto':
+        return cache_compartilhado()
+    return backend == 'cache'
+
+
+def estatisticas_throttle():
+    return {'rejeicoes': dict(_rejeicoes), 'baldes_locais': len(_baldes_locais)}
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle base. O escopo vem do atributo `escopo` da classe; a chave padrão
+    é o IP do cliente.
+    """
+    escopo = None
+
+    def get_escopo(self, view):
+        return self.escopo
+
+    def get_chave(self, request, view):
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        self.espera = None
+        escopo = self.get_escopo(view)
+        taxa = settings.DEVLAB_THROTTLE_TAXAS.get(escopo) if escopo else None
+        if not taxa:
+            return True
+
+        chave = self.get_chave(request, view)
+        if chave is None:
+            return True
+
+        capacidade, reposicao = interpretar_taxa(taxa)
+        if usar_cache():
+            permitido, espera = _consumir_cache(f'{escopo}:{chave}', capacidade, reposicao)
+        else:
+            permitido, espera = _consumir_local(f'{escopo}:{chave}', capacidade, reposicao)
+
+        if not permitido:
+            _rejeicoes[escopo] += 1
+            self.espera = espera
+        return permitido
+
+    def wait(self):
+        return self.espera
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    """Limita tentativas de login por IP"""
+    escopo = 'login_ip'
+
+
+class LoginUsuarioThrottle(TokenBucketThrottle):
+    """Limita tentativas de login por username (protege uma conta atacada de vários IPs)"""
+    escopo = 'login_usuario'
+
+    def get_chave(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not username:
+            return None
+        return str(username).strip().lower()
+
+
+class RotaThrottle(TokenBucketThrottle):
+    """Throttle de rotas caras, por usuário (ou IP, se anônimo). As subclasses definem o escopo"""
+
+    def get_chave(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'usuario:{request.user.pk}'
+        return self.get_ident(request)
+
+
+class RelatoriosThrottle(RotaThrottle):
+    escopo = 'relatorios'
+
+
+class ImportacaoThrottle(RotaThrottle):
+    escopo = 'importacao'
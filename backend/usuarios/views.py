@@ -3,11 +3,26 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import UsuarioSerializer
+from .projecoes import ProjecaoUsuario
+from .importacao import ler_csv, validar_linhas, importar_usuarios, separar_senhas
+from .busca import buscar_usuarios
+from .throttles import ImportacaoThrottle, LoginIPThrottle, LoginUsuarioThrottle
+from fila.fila import enfileirar
+from fila.views import resposta_job
+from DevLab.projecao import ListagemRapidaMixin
 
 Usuario = get_user_model()
 
+# Login (JWT) com limite de tentativas por IP e por username.
+# O throttle roda antes da view, então requisições em excesso nem chegam no hash da senha
+class TokenObtainPairProtegidoView(TokenObtainPairView):
+    throttle_classes = [LoginIPThrottle, LoginUsuarioThrottle]
+
 # View para registro de novos usuários
 class RegistroUsuarioView(APIView):
     permission_classes = [AllowAny]
@@ -66,11 +81,49 @@ class PerfilUsuarioView(APIView):
         serializer = UsuarioSerializer(request.user)
         return Response(serializer.data)
 
+class UsuarioPaginacao(PageNumberPagination):
+    # Diretório de usuários em páginas (os seletores usam o autocomplete)
+    page_size = 50
+    page_size_query_param = 'tamanho'
+    max_page_size = 200
+
+
+# Máximo de sugestões do autocomplete (?limite=)
+LIMITE_AUTOCOMPLETE = 50
+
 # ViewSet para listar todos os usuários (rota /api/usuarios/)
-class UsuarioViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Usuario.objects.all()
+class UsuarioViewSet(ListagemRapidaMixin, viewsets.ReadOnlyModelViewSet):
+    # Ordem fixa: a listagem rápida seleciona menos colunas e o banco poderia devolver em outra ordem
+    queryset = Usuario.objects.order_by('id')
     serializer_class = UsuarioSerializer
+    projecao_listagem = ProjecaoUsuario
     permission_classes = [IsAuthenticated]
+    pagination_class = UsuarioPaginacao
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Sugestões para os seletores: ?q= (prefixo do nome, username ou e-mail,
+        sem diferenciar acento e maiúsculas). Filtros opcionais:
+        ?tipo_usuario=estudante,professor  ?projeto=<id> (participantes ativos)
+        ?fora_do_projeto=<id> (quem ainda não participa)  ?limite= (padrão 10)
+        """
+        params = request.query_params
+        try:
+            limite = min(int(params.get('limite', 10)), LIMITE_AUTOCOMPLETE)
+            projeto_id = int(params['projeto']) if params.get('projeto') else None
+            fora_do_projeto_id = int(params['fora_do_projeto']) if params.get('fora_do_projeto') else None
+        except ValueError:
+            return Response(
+                {'detail': 'limite, projeto e fora_do_projeto devem ser números.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        tipos = [tipo for tipo in params.get('tipo_usuario', '').split(',') if tipo]
+
+        return Response(buscar_usuarios(
+            params.get('q', ''), tipos=tipos, projeto_id=projeto_id,
+            fora_do_projeto_id=fora_do_projeto_id, limite=max(limite, 1)
+        ))
 
     @action(detail=False, methods=['put', 'patch'], url_path='editar-perfil')
     def editar_perfil(self, request):
@@ -122,3 +175,85 @@ class UsuarioViewSet(viewsets.ReadOnlyModelViewSet):
             'detail': 'Perfil atualizado com sucesso.',
             'usuario': serializer.data
         })
+
+    @action(detail=False, methods=['post'], url_path='importar',
+            parser_classes=[JSONParser, MultiPartParser, FormParser],
+            throttle_classes=[ImportacaoThrottle])
+    def importar(self, request):
+        """
+        Importa uma turma inteira de uma vez (apenas coordenadores).
+        Aceita um arquivo CSV no campo "arquivo" ou JSON no formato:
+        {
+            "usuarios": [{"username": ..., "nome": ..., "email": ..., "cpf": ..., "tipo_usuario": ...}],
+            "projeto_id": <opcional, matricula os estudantes no projeto>
+        }
+        Com ?assincrono=1 a importação vai para a fila e a resposta é 202 com o job.
+        """
+        if request.user.tipo_usuario != 'coordenador':
+            return Response(
+                {'detail': 'Apenas coordenadores podem importar usuários.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        arquivo = request.FILES.get('arquivo')
+        if arquivo:
+            linhas = ler_csv(arquivo.read())
+        else:
+            linhas = request.data.get('usuarios') if hasattr(request.data, 'get') else request.data
+        if not isinstance(linhas, list) or not linhas:
+            return Response(
+                {'detail': 'Envie um arquivo CSV em "arquivo" ou uma lista em "usuarios".'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        linhas = [
+            {chave: str(valor).strip() for chave, valor in linha.items() if valor is not None}
+            for linha in linhas if isinstance(linha, dict)
+        ]
+
+        projeto = None
+        projeto_id = request.data.get('projeto_id') if hasattr(request.data, 'get') else None
+        if projeto_id:
+            from projetos.models import Projeto
+            try:
+                projeto = Projeto.objects.get(pk=projeto_id)
+            except (Projeto.DoesNotExist, ValueError):
+                return Response(
+                    {'detail': 'Projeto não encontrado.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            if projeto.created_by_id != request.user.id:
+                return Response(
+                    {'detail': 'Apenas o coordenador que criou o projeto pode gerenciá-lo.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+        erros = validar_linhas(linhas)
+        if erros:
+            return Response({'detail': 'Nenhum usuário foi importado.', 'erros': erros},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get('assincrono') in ('1', 'true'):
+            # Os parâmetros do job ficam no banco: as senhas vão nos segredos, e o hash é feito no worker
+            sem_senha, senhas = separar_senhas(linhas)
+            job = enfileirar(
+                'importar_usuarios', usuario=request.user, segredos={'senhas': senhas} if senhas else None,
+                linhas=sem_senha, projeto_id=projeto.pk if projeto else None,
+                usuario_id=request.user.pk
+            )
+            return Response(resposta_job(request, job), status=status.HTTP_202_ACCEPTED)
+
+        resultado = importar_usuarios(linhas, projeto=projeto)
+        if projeto is not None and resultado['matriculados']:
+            from atividades.buffer import registrar_atividade
+            from atividades.models import Atividade
+            registrar_atividade(
+                Atividade.TIPO_PARTICIPANTES_IMPORTADOS, usuario=request.user,
+                projeto_id=projeto.id, total=resultado['matriculados']
+            )
+        return Response({
+            'detail': f'{len(resultado["usuarios"])} usuário(s) importado(s).',
+            'total': len(resultado['usuarios']),
+            'matriculados': resultado['matriculados'],
+            'usuarios': UsuarioSerializer(resultado['usuarios'], many=True).data,
+            'senhas_temporarias': resultado['senhas_temporarias'],
+        }, status=status.HTTP_201_CREATED)
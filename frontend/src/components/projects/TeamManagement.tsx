@@ -2,6 +2,7 @@ import { useState, useEffect } from "react";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
+import { Input } from "@/components/ui/input";
 import {
   Select,
   SelectContent,
@@ -50,7 +51,10 @@ export default function TeamManagement({
   onUpdate,
 }: TeamManagementProps) {
   const [participantes, setParticipantes] = useState<any[]>([]);
-  const [usuarios, setUsuarios] = useState<Usuario[]>([]);
+  const [professores, setProfessores] = useState<Usuario[]>([]);
+  const [usuariosDisponiveis, setUsuariosDisponiveis] = useState<Usuario[]>([]);
+  const [buscaProfessor, setBuscaProfessor] = useState("");
+  const [buscaParticipante, setBuscaParticipante] = useState("");
   const [equipes, setEquipes] = useState<Equipe[]>([]);
   const [selectedProfessor, setSelectedProfessor] = useState<string>("");
   const [selectedParticipante, setSelectedParticipante] = useState<string>("");
@@ -59,11 +63,44 @@ export default function TeamManagement({
   useEffect(() => {
     fetchParticipantes();
     fetchEquipes();
-    if (canManage) {
-      fetchUsuarios();
-    }
   }, [projetoId, canManage]);
 
+  // Busca no servidor enquanto digita (autocomplete), em vez de baixar todos os usuários
+  useEffect(() => {
+    if (!canManage || !buscaProfessor.trim()) {
+      setProfessores([]);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        setProfessores(await usuariosService.autocomplete(buscaProfessor, { tipo_usuario: ["professor"] }));
+      } catch (error) {
+        console.error("Erro ao buscar professores:", error);
+      }
+    }, 250);
+    return () => clearTimeout(timer);
+  }, [buscaProfessor, canManage]);
+
+  useEffect(() => {
+    if (!canManage || !buscaParticipante.trim()) {
+      setUsuariosDisponiveis([]);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        setUsuariosDisponiveis(
+          await usuariosService.autocomplete(buscaParticipante, {
+            tipo_usuario: ["estudante"],
+            fora_do_projeto: projetoId,
+          })
+        );
+      } catch (error) {
+        console.error("Erro ao buscar usuários:", error);
+      }
+    }, 250);
+    return () => clearTimeout(timer);
+  }, [buscaParticipante, projetoId, canManage]);
+
   const fetchParticipantes = async () => {
     try {
       const data = await projetosService.getParticipantes(projetoId);
@@ -82,15 +119,6 @@ export default function TeamManagement({
     }
   };
 
-  const fetchUsuarios = async () => {
-    try {
-      const data = await usuariosService.list();
-      setUsuarios(data);
-    } catch (error) {
-      console.error("Erro ao carregar usuários:", error);
-    }
-  };
-
   const handleDefinirProfessor = async () => {
     if (!selectedProfessor) {
       toast.error("Selecione um professor");
@@ -121,6 +149,7 @@ export default function TeamManagement({
       await projetosService.addParticipante(projetoId, parseInt(selectedParticipante));
       toast.success("Participante adicionado com sucesso!");
       setSelectedParticipante("");
+      setBuscaParticipante("");
       fetchParticipantes();
       onUpdate();
     } catch (error: any) {
@@ -130,11 +159,6 @@ export default function TeamManagement({
     }
   };
 
-  const professores = usuarios.filter((u) => u.tipo_usuario === "professor");
-  const usuariosDisponiveis = usuarios.filter(
-    (u) => !participantes.find((p) => p.id === u.id) && u.tipo_usuario === "estudante"
-  );
-
   return (
     <div className="space-y-6">
       {/* Professor Orientador */}
@@ -159,6 +183,12 @@ export default function TeamManagement({
 
           {canManage && (
             <div className="flex gap-2">
+              <Input
+                className="flex-1"
+                placeholder="Buscar professor..."
+                value={buscaProfessor}
+                onChange={(e) => setBuscaProfessor(e.target.value)}
+              />
               <Select value={selectedProfessor} onValueChange={setSelectedProfessor}>
                 <SelectTrigger className="flex-1">
                   <SelectValue placeholder="Selecione um professor" />
@@ -264,6 +294,12 @@ export default function TeamManagement({
           {canManage && (
             <div className="pt-4 border-t space-y-2">
               <div className="flex gap-2">
+                <Input
+                  className="flex-1"
+                  placeholder="Buscar estudante..."
+                  value={buscaParticipante}
+                  onChange={(e) => setBuscaParticipante(e.target.value)}
+                />
                 <Select
                   value={selectedParticipante}
                   onValueChange={setSelectedParticipante}
@@ -18,6 +18,12 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    // Escritas levam uma Idempotency-Key; como ela fica no config, a repetição
+    // da mesma requisição reaproveita a chave e o backend não executa de novo
+    const metodo = (config.method || 'get').toLowerCase();
+    if (['post', 'put', 'patch'].includes(metodo) && !config.headers['Idempotency-Key']) {
+      config.headers['Idempotency-Key'] = crypto.randomUUID();
+    }
     return config;
   },
   (error) => {
@@ -60,6 +66,11 @@ api.interceptors.response.use(
   }
 );
 
+// Envia a versão conhecida do objeto no If-Match: se alguém alterou antes,
+// o backend responde 412 em vez de sobrescrever a alteração do outro
+const ifMatch = (versao?: number) =>
+  versao !== undefined ? { headers: { 'If-Match': `"${versao}"` } } : undefined;
+
 // ============================================
 // AUTENTICAÇÃO
 // ============================================
@@ -101,7 +112,11 @@ export const authService = {
     cpf?: string;
     tipo_usuario?: string;
   }): Promise<User> {
-    const response = await axios.post(`${API_BASE_URL}/usuarios/registro/`, userData);
+    // Fora da instância `api` (sem token), então a Idempotency-Key vai aqui:
+    // um duplo clique ou a repetição da requisição não cadastra duas vezes
+    const response = await axios.post(`${API_BASE_URL}/usuarios/registro/`, userData, {
+      headers: { 'Idempotency-Key': crypto.randomUUID() },
+    });
     return response.data;
   },
 
@@ -139,6 +154,7 @@ export interface Projeto {
   data_inicio: string;
   data_fim_prevista?: string;
   status: 'nao_iniciado' | 'em_andamento' | 'concluido' | 'cancelado';
+  versao?: number;
   participantes?: number[];
   professor?: number;
   created_by?: number;
@@ -185,7 +201,7 @@ export const projetosService = {
   },
 
   async update(id: number, projeto: Partial<Projeto>): Promise<Projeto> {
-    const response = await api.patch(`/projetos/${id}/`, projeto);
+    const response = await api.patch(`/projetos/${id}/`, projeto, ifMatch(projeto.versao));
     return response.data;
   },
 
@@ -235,6 +251,30 @@ export const projetosService = {
     return response.data;
   },
 
+  // Série diária das contagens do relatório (arrays paralelos: data[], projetos_total[], ...)
+  async getRelatoriosSeries(params?: { inicio?: string; fim?: string }) {
+    const response = await api.get('/projetos/relatorios/series/', { params });
+    return response.data;
+  },
+
+  // Forma equipes equilibradas com os participantes sem equipe; simular=true só devolve o plano
+  async formarEquipes(
+    projetoId: number,
+    dados: { quantidade: number; juntos?: number[][]; separados?: number[][]; prefixo?: string },
+    simular = false,
+  ) {
+    const response = await api.post(`/projetos/${projetoId}/formar-equipes/`, dados, {
+      params: simular ? { simular: 1 } : undefined,
+    });
+    return response.data;
+  },
+
+  // Carga dos estudantes; com projeto traz os candidatos menos carregados
+  async getCargaEstudantes(params?: { projeto?: number; para?: 'participante' | 'equipe'; limite?: number }) {
+    const response = await api.get('/relatorios/carga/', { params });
+    return response.data;
+  },
+
   async listPublic(): Promise<Projeto[]> {
     const response = await axios.get(`${API_BASE_URL}/projetos/publicos/`);
     return response.data.results || response.data;
@@ -265,6 +305,7 @@ export interface Equipe {
     tipo_usuario: string;
   }>;
   data_criacao: string;
+  versao?: number;
 }
 
 // ============================================
@@ -281,6 +322,7 @@ export interface Tarefa {
   data_fim: string;
   equipe?: number;
   responsavel?: number;
+  versao?: number;
 }
 
 export const tarefasService = {
@@ -305,7 +347,7 @@ export const tarefasService = {
   },
 
   async update(id: number, tarefa: Partial<Tarefa>): Promise<Tarefa> {
-    const response = await api.patch(`/tarefas/${id}/`, tarefa);
+    const response = await api.patch(`/tarefas/${id}/`, tarefa, ifMatch(tarefa.versao));
     return response.data;
   },
 
@@ -320,10 +362,10 @@ export const tarefasService = {
     return response.data;
   },
 
-  async changeStatus(id: number, status: string): Promise<Tarefa> {
+  async changeStatus(id: number, status: string, versao?: number): Promise<Tarefa> {
     const response = await api.post(`/tarefas/${id}/change_status/`, {
       status,
-    });
+    }, ifMatch(versao));
     return response.data;
   },
 };
@@ -333,8 +375,31 @@ export const tarefasService = {
 // ============================================
 
 export const usuariosService = {
-  async list(): Promise<User[]> {
-    const response = await api.get('/usuarios/');
+  // Diretório paginado (50 por página); para seletores use autocomplete()
+  async list(page = 1): Promise<User[]> {
+    const response = await api.get('/usuarios/', { params: { page } });
+    return response.data.results || response.data;
+  },
+
+  // Até `limite` usuários cujo nome, username ou e-mail começa com `q` (sem acento/maiúsculas)
+  async autocomplete(
+    q: string,
+    filtros: {
+      tipo_usuario?: User['tipo_usuario'][];
+      projeto?: number;
+      fora_do_projeto?: number;
+      limite?: number;
+    } = {}
+  ): Promise<User[]> {
+    const response = await api.get('/usuarios/autocomplete/', {
+      params: {
+        q,
+        tipo_usuario: filtros.tipo_usuario?.join(','),
+        projeto: filtros.projeto,
+        fora_do_projeto: filtros.fora_do_projeto,
+        limite: filtros.limite,
+      },
+    });
     return response.data;
   },
 
@@ -382,7 +447,7 @@ export const equipesService = {
   },
 
   async update(id: number, data: Partial<Equipe>): Promise<Equipe> {
-    const response = await api.put(`/equipes/${id}/`, data);
+    const response = await api.put(`/equipes/${id}/`, data, ifMatch(data.versao));
     return response.data;
   },
 